@@ -0,0 +1,345 @@
+# This is file benchmark.py
+
+# This is a benchmark script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# benchmark.py builds a series of drawing sheets ("workloads") with
+# eights, timing each stage of the construction of each sheet
+# separately: create_it, put_it_in, every call of addsingleview (one
+# per view), every recompute of the document, and every closing of a
+# document.  With the Drawing toolbox, a view's hidden-line removal is
+# done in addsingleview, but TechDraw does it when the document is
+# recomputed (and, in recent versions of FreeCAD, in the background,
+# so it may not be in any of these times); --hlr also times the
+# hidden-line removal for each view on its own, with
+# eights.projected_edges, outside the timing of the sheet.  The
+# workloads are the shapes of the example scripts in
+# ../EXAMPLES, plus two scalable series: a growing number of parts on
+# one sheet, and a single part with a growing number of faces.  The
+# results are written as JSON (to standard output, or to the file
+# named by --output), together with the FreeCAD version, and hence
+# which of the Drawing (before 0.19) and TechDraw (0.19 onwards) code
+# paths was timed; to benchmark both, run the script under one
+# FreeCAD of each kind.  It must be run by a Python interpreter that
+# can import FreeCAD, e.g.
+#
+#     FreeCADCmd benchmark.py
+#
+# or
+#
+#     PYTHONPATH=/usr/lib/freecad/lib python3 benchmark.py --repeat 3
+
+import sys
+import os
+import json
+import time
+import hashlib
+import platform
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import FreeCAD
+import Part
+import eights
+
+# All distances in millimetres
+
+pagesize = 'A3'
+pageorientation = 'Landscape'
+conelargediameter = 15.0
+conesmalldiameter = 7.5
+drawingviewspacing = 5.0
+symbolviewspacing = drawingviewspacing/3.0
+
+# The timings of the run in progress, by stage.
+
+timings = {}
+
+def timed(owner, name, stage, describe=None):
+
+        # Replaces the function or method "name" of "owner" (a class or
+        # module) with one that does the same, but adds the time it
+        # took to timings[stage], along with a description of the call
+        # made by "describe" from its arguments, if given.
+
+        original = getattr(owner, name)
+
+        def wrapper(*args, **kwargs):
+                starttime = time.time()
+                try:
+                        return original(*args, **kwargs)
+                finally:
+                        entry = {"seconds": time.time()-starttime}
+                        if (describe is not None):
+                                entry.update(describe(*args, **kwargs))
+                        timings.setdefault(stage, []).append(entry)
+
+        setattr(owner, name, wrapper)
+
+# The document recompute is done by recompute_unless_batched, which
+# also closes any dummy documents afterwards, or, inside a batch, by
+# the end of the batch, which does the same.  So the "recompute" times
+# include the "closeDocument" times of the dummy documents; the latter
+# are also listed separately.  Inside a batch, recompute_unless_batched
+# does nothing, and its entries are marked "batched".
+
+timed(eights.create_eights_drawing_sheet, "create_it", "create_it")
+timed(eights.add_first_angle_projection_symbol, "put_it_in", "put_it_in")
+timed(eights.add_third_angle_projection_symbol, "put_it_in", "put_it_in")
+timed(eights.eitherone, "addsingleview", "addsingleview",
+      lambda self, versionnumber, legend, *rest:
+      {"part": self.title, "view": legend.strip()})
+timed(eights, "recompute_unless_batched", "recompute",
+      lambda document, afterwards=None:
+      {"batched": document.Name in eights.batches_in_progress})
+timed(eights.batch, "__exit__", "recompute",
+      lambda self, *exception: {"batch": True})
+timed(FreeCAD, "closeDocument", "closeDocument",
+      lambda name: {"document": name})
+
+def example_workloads():
+
+        # The shapes, scales and positions of the example scripts.
+
+        box = Part.makeBox(100.0, 100.0, 100.0, FreeCAD.Vector(0.0,0.0,0.0))
+        sphere = Part.makeSphere(50.0, FreeCAD.Vector(50.0,50.0,50.0))
+        yield ("Single_part", {}, 2, [("C1", box, 100.0, 40.0)])
+        yield ("Anisotropic_part", {}, 2,
+               [("C1", Part.makeBox(50.0, 100.0, 150.0,
+                                    FreeCAD.Vector(0.0,0.0,0.0)),
+                 100.0, 40.0)])
+        yield ("Two_parts", {}, 5, [("C2", box, 50.0, 40.0),
+                                    ("S1", sphere, 300.0, 40.0)])
+        for name, centre, xpos, ypos in\
+            [("Assembly", (50.0, 50.0, 150.0), 100.0, 40.0),
+             ("Assembly_back", (50.0, 150.0, 50.0), 30.0, 15.0),
+             ("Assembly_side", (150.0, 50.0, 50.0), 50.0, 40.0)]:
+                theshape = box.fuse(Part.makeSphere(50.0,
+                                                    FreeCAD.Vector(*centre)))
+                yield (name, {}, 2, [("Assembly", theshape, xpos, ypos)])
+
+def holed_box(holes):
+
+        # A 100 mm cube with a square grid of holes^2 vertical
+        # through-holes, so that the number of faces grows with holes.
+
+        theshape = Part.makeBox(100.0, 100.0, 100.0,
+                                FreeCAD.Vector(0.0,0.0,0.0))
+        if (holes > 0):
+                pitch = 100.0/holes
+                cylinders = [Part.makeCylinder(0.3*pitch, 100.0,
+                                               FreeCAD.Vector((i+0.5)*pitch,
+                                                              (j+0.5)*pitch,
+                                                              0.0))
+                             for i in range(holes) for j in range(holes)]
+                theshape = theshape.cut(Part.makeCompound(cylinders))
+        return theshape
+
+def scalable_workloads(partcounts, holecounts):
+
+        # N parts per sheet (laid out by eights.lay_out_projections),
+        # and one part with an increasing number of faces.
+
+        inversescale = 10
+        for count in partcounts:
+                shapes = [Part.makeBox(100.0, 100.0, 100.0,
+                                       FreeCAD.Vector(0.0,0.0,0.0))
+                          for i in range(count)]
+                layout = eights.lay_out_projections(
+                        pagesize, pageorientation,
+                        [(theshape, drawingviewspacing, 1.0/inversescale)
+                         for theshape in shapes])
+                positions = layout.lay_them_out('putanyoldrubbishhere')
+                parts = [("P%d" % (i+1), theshape, position[0], position[1])
+                         for i, (theshape, position)
+                         in enumerate(zip(shapes, positions))
+                         if (position is not None)]
+                yield ("parts_per_sheet", {"parts": len(parts)},
+                       inversescale, parts)
+        for holes in holecounts:
+                theshape = holed_box(holes)
+                yield ("faces_per_part", {"faces": len(theshape.Faces)}, 2,
+                       [("H%d" % holes, theshape, 100.0, 40.0)])
+
+def add_sheet(thedocument, parts, inversescale, thirdangle, scratch=None):
+
+        # Adds one sheet to thedocument, as the example scripts do,
+        # with the scratch document "scratch", if given, shared by the
+        # symbol and all the parts.
+
+        page_creator = eights.create_eights_drawing_sheet(thedocument,
+                                                          "benchmark",
+                                                          pagesize,
+                                                          pageorientation,
+                                                          'benchmark.py',
+                                                          'Benchmark',
+                                                          'nobody',
+                                                          'nobody',
+                                                          'benchmark',
+                                                          'benchmark',
+                                                          1, 1,
+                                                          inversescale,
+                                                          ",".join([thepart[0]
+                                                                    for thepart
+                                                                    in parts]),
+                                                          'BENCH', 2020, 1,
+                                                          1, 'A')
+        thepage = page_creator.create_it('putanyoldrubbishhere')
+        if (thirdangle):
+                symbolclass = eights.add_third_angle_projection_symbol
+                partclass = eights.third_angle_projection
+        else:
+                symbolclass = eights.add_first_angle_projection_symbol
+                partclass = eights.first_angle_projection
+        symbolxposition, symbolyposition\
+                = eights.symbol_position(pagesize, pageorientation,
+                                         conelargediameter,
+                                         symbolviewspacing)
+        symbol_adder = symbolclass(conelargediameter, conesmalldiameter,
+                                   symbolviewspacing, symbolxposition,
+                                   symbolyposition, thepage, scratch)
+        symbol_adder.put_it_in('putanyoldrubbishhere')
+        for partnum, theshape, xpos, ypos in parts:
+                drawings_adder = partclass(partnum, theshape,
+                                           drawingviewspacing, xpos, ypos,
+                                           1.0/inversescale, thepage,
+                                           scratch)
+                if (thirdangle):
+                        drawings_adder.tap('putanyoldrubbishhere')
+                else:
+                        drawings_adder.fap('putanyoldrubbishhere')
+
+def hlr_timings(parts, versionnumber):
+
+        # Times the hidden-line removal, by eights.projected_edges, for
+        # each of the six views of each part, one view at a time.
+
+        entries = []
+        for partnum, theshape, xpos, ypos in parts:
+                for coefficients\
+                    in eights.projection_view_coefficients["first"]:
+                        legend = coefficients[0]
+                        direction = FreeCAD.Vector(*coefficients[1])
+                        starttime = time.time()
+                        eights.projected_edges(theshape, direction,
+                                               versionnumber)
+                        entries.append({"seconds": time.time()-starttime,
+                                        "part": partnum,
+                                        "view": legend.strip()})
+        return entries
+
+def run_workload(parts, inversescale, thirdangle, batched, shared):
+
+        # Builds one sheet in a new document (with a scratch document
+        # shared by all its parts, if "shared" is true), and closes the
+        # document.
+
+        thedocument = FreeCAD.newDocument("benchmark")
+        scratch = None
+        if (shared):
+                scratch = eights.scratch_document()
+        if (batched):
+                with eights.batch(thedocument):
+                        add_sheet(thedocument, parts, inversescale,
+                                  thirdangle, scratch)
+        else:
+                add_sheet(thedocument, parts, inversescale, thirdangle,
+                          scratch)
+        if (scratch is not None):
+                scratch.release_it('putanyoldrubbishhere')
+        FreeCAD.closeDocument(thedocument.Name)
+
+def main(argv=None):
+        parser = argparse.ArgumentParser(
+                description="Time each stage of building drawing sheets "
+                "with eights, and write the timings as JSON.")
+        parser.add_argument("--output", default=None,
+                            help="file to write the JSON results to "
+                            "(default: standard output)")
+        parser.add_argument("--repeat", type=int, default=1,
+                            help="number of times to build each sheet")
+        parser.add_argument("--parts", default="1,2,4,8,16",
+                            help="comma-separated numbers of parts per "
+                            "sheet for the parts_per_sheet series")
+        parser.add_argument("--holes", default="0,2,4,8",
+                            help="comma-separated numbers of holes per "
+                            "side for the faces_per_part series")
+        parser.add_argument("--third", action="store_true",
+                            help="use third angle projection")
+        parser.add_argument("--batch", action="store_true",
+                            help="build each sheet inside eights.batch, "
+                            "so the document is recomputed once")
+        parser.add_argument("--scratch", action="store_true",
+                            help="share one scratch document between the "
+                            "symbol and all the parts of each sheet")
+        parser.add_argument("--hlr", action="store_true",
+                            help="also time the hidden-line removal for "
+                            "each view on its own")
+        parser.add_argument("--no-examples", action="store_true",
+                            help="skip the shapes of the example scripts")
+        arguments, unknown = parser.parse_known_args(argv)
+        partcounts = [int(n) for n in arguments.parts.split(",") if n]
+        holecounts = [int(n) for n in arguments.holes.split(",") if n]
+        versionnumber = float(FreeCAD.Version()[0])\
+                +0.01*float(FreeCAD.Version()[1])
+        with open(eights.__file__.replace(".pyc", ".py"), "rb") as thefile:
+                eightsdigest = hashlib.sha1(thefile.read()).hexdigest()
+        results = {"freecad": list(FreeCAD.Version()[0:3]),
+                   "toolbox": ("Drawing" if (versionnumber < 0.19)
+                               else "TechDraw"),
+                   "python": platform.python_version(),
+                   "platform": platform.platform(),
+                   "eights": eightsdigest,
+                   "projection": ("third" if arguments.third else "first"),
+                   "batch": arguments.batch,
+                   "scratch": arguments.scratch,
+                   "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "runs": []}
+        workloads = []
+        if (not arguments.no_examples):
+                workloads = list(example_workloads())
+        workloads = workloads+list(scalable_workloads(partcounts,
+                                                      holecounts))
+        for name, parameters, inversescale, parts in workloads:
+                for repeat in range(arguments.repeat):
+                        timings.clear()
+                        starttime = time.time()
+                        run_workload(parts, inversescale, arguments.third,
+                                     arguments.batch, arguments.scratch)
+                        run = {"workload": name, "repeat": repeat,
+                               "seconds": time.time()-starttime,
+                               "stages": dict(timings)}
+                        run.update(parameters)
+                        if (arguments.hlr):
+                                run["stages"]["hlr"]\
+                                        = hlr_timings(parts, versionnumber)
+                        results["runs"].append(run)
+                        sys.stderr.write("%s %s %.3f s\n"
+                                         % (name, json.dumps(parameters),
+                                            run["seconds"]))
+        if (arguments.output is None):
+                json.dump(results, sys.stdout, indent=1)
+                sys.stdout.write("\n")
+        else:
+                with open(arguments.output, "w") as thefile:
+                        json.dump(results, thefile, indent=1)
+        return 0
+
+if __name__ == "__main__":
+        sys.exit(main())
@@ -37,8 +37,35 @@
 # Daniel Hatton can be contacted on <dan.hatton@physics.org>
 
 import sys
-import FreeCAD
-import Part
+import os
+import json
+import csv
+import time
+import hashlib
+import math
+import shutil
+import subprocess
+import tempfile
+import threading
+import re
+import zipfile
+import socket
+import socketserver
+import stat
+import ipaddress
+import collections
+import warnings
+
+# FreeCAD is needed for everything except the few parts of this module
+# that work on saved FCStd files directly (see patch_eights_file), so
+# the module can still be imported without it, for the sake of those.
+
+try:
+        import FreeCAD
+        import Part
+except ImportError:
+        FreeCAD = None
+        Part = None
 
 # As of FreeCAD version 0.16, the Drawing toolbox has been deprecated,
 # and replaced by a toolbox called TechDraw.  However, it's not until
@@ -48,12 +75,422 @@ import Part
 # FreeCAD version number is less than 0.19, it's in order to decide
 # whether to use the Drawing toolbox or the TechDraw toolbox.
 
-versionnumber = float(FreeCAD.Version()[0])\
-        +0.01*float(FreeCAD.Version()[1])
-if(versionnumber < 0.19):
-        import Drawing
-else:
-        import TechDraw
+if (FreeCAD is not None):
+        versionnumber = float(FreeCAD.Version()[0])\
+                +0.01*float(FreeCAD.Version()[1])
+        if(versionnumber < 0.19):
+                import Drawing
+        else:
+                import TechDraw
+
+# NumPy is needed only for the tessellation-based projection engine
+# (see tessellated_edges), so the module works without it otherwise.
+
+try:
+        import numpy
+except ImportError:
+        numpy = None
+
+# The trace being recorded, if any (see tracing).
+
+current_trace = None
+
+class tracing:
+
+        # The purpose of this class is to record how long each stage
+        # of sheet construction takes, by enclosing the construction
+        # in a "with eights.tracing(filename):" block.  Inside the
+        # block, each sheet (create_it), symbol (put_it_in), part (fap
+        # or tap), copy of a shape into a dummy document, view
+        # (addsingleview) and recompute is recorded as a timed span,
+        # with attributes such as the title of the part and the
+        # direction of the view; the spans nest in the obvious way.
+        # With the Drawing toolbox, a view's hidden-line removal is
+        # part of its "view" span, but TechDraw removes hidden lines
+        # when the document is recomputed, so on TechDraw it's part of
+        # the "recompute" span that follows (or, in recent versions of
+        # FreeCAD, which do it in the background, of neither), and
+        # can't be told apart view by view.
+        # On leaving the block, the spans are written to "filename"
+        # (if given) as a Chrome trace, which can be opened in
+        # chrome://tracing or <https://ui.perfetto.dev>.  Outside any
+        # such block, nothing is recorded, and the instrumentation
+        # costs no more than a test of current_trace.
+
+        def __init__(self, filename_in=None):
+                self.filename = filename_in
+                self.events = []
+                self.previous = None
+                self.started = None
+
+        def __enter__(self):
+                global current_trace
+                self.previous = current_trace
+                current_trace = self
+                self.started = time.time()
+                return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+                global current_trace
+                current_trace = self.previous
+                self.previous = None
+                if (self.filename is not None):
+                        self.write_it(self.filename)
+                return False
+
+        def write_it(self, filename):
+
+                # Writes the spans recorded so far to "filename", in
+                # the Chrome trace event format: one complete ("X")
+                # event per span, with times in microseconds from the
+                # start of the trace.
+
+                with open(filename, "w") as thefile:
+                        json.dump({"traceEvents": self.events,
+                                   "displayTimeUnit": "ms"}, thefile)
+
+class trace_span:
+
+        # One timed span of a trace, to be used as a context manager;
+        # see span.
+
+        def __init__(self, trace_in, name_in, attributes_in):
+                self.trace = trace_in
+                self.name = name_in
+                self.attributes = attributes_in
+                self.started = None
+
+        def __enter__(self):
+                self.started = time.time()
+                return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+                finished = time.time()
+                event = {"name": self.name, "cat": "eights", "ph": "X",
+                         "ts": 1.0e6*(self.started-self.trace.started),
+                         "dur": 1.0e6*(finished-self.started),
+                         "pid": os.getpid(),
+                         "tid": threading.current_thread().ident,
+                         "args": self.attributes}
+                if (exc_type is not None):
+                        event["args"] = dict(self.attributes,
+                                             error=exc_type.__name__)
+                self.trace.events.append(event)
+                return False
+
+class no_trace_span:
+
+        # A span that records nothing, for use when no trace is being
+        # recorded.  Only one is ever needed (no_span).
+
+        def __enter__(self):
+                return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+                return False
+
+no_span = no_trace_span()
+
+def span(name, attributes=None):
+
+        # Returns a context manager that records the time spent inside
+        # it as a span called "name", with the given dict of
+        # attributes, in the trace in progress, or does nothing if
+        # there isn't one.
+
+        if (current_trace is None):
+                return no_span
+        if (attributes is None):
+                attributes = {}
+        return trace_span(current_trace, name, attributes)
+
+def traced(name, attributes=None):
+
+        # Returns a decorator which makes a method record each call to
+        # it as a span called "name" in the trace in progress, if
+        # there is one.  "attributes", if given, is called with the
+        # same arguments as the method (including self, and any
+        # keyword arguments) and returns the dict of attributes of
+        # the span.
+
+        def decorate(method):
+                def wrapper(self, *args, **kwargs):
+                        if (current_trace is None):
+                                return method(self, *args, **kwargs)
+                        if (attributes is None):
+                                theattributes = {}
+                        else:
+                                theattributes = attributes(self, *args,
+                                                           **kwargs)
+                        with trace_span(current_trace, name, theattributes):
+                                return method(self, *args, **kwargs)
+                wrapper.__name__ = method.__name__
+                return wrapper
+        return decorate
+
+# Batches of sheet construction operations currently in progress,
+# keyed by the name of the FreeCAD document they apply to.
+
+batches_in_progress = {}
+
+class batch:
+
+        # The purpose of this class is to allow several sheet
+        # construction operations (create_it, put_it_in, fap, tap) on
+        # the same FreeCAD document to share a single recompute of
+        # that document, rather than each ending with a recompute of
+        # its own, by enclosing them in a "with eights.batch(doc):"
+        # block.  Inside the block, the recompute that each operation
+        # would have done is skipped, and anything that has to wait
+        # until after that recompute (such as releasing a dummy
+        # document) is queued; on leaving the block, the document is
+        # recomputed once and the queued work is done.  Nested blocks
+        # for the same document are merged into the outermost one.
+
+        def __init__(self, document_in):
+                self.document = document_in
+                self.deferred = []
+                self.outermost = False
+                self.measuring = False
+
+        def __enter__(self):
+                if (self.document.Name not in batches_in_progress):
+                        batches_in_progress[self.document.Name] = self
+                        self.outermost = True
+                return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+                if (self.outermost):
+                        del batches_in_progress[self.document.Name]
+                        self.outermost = False
+                        with span("recompute",
+                                  {"document": self.document.Name}):
+                                self.document.recompute()
+                        if (current_memory_manager is not None):
+                                current_memory_manager.recomputed(
+                                        self.document)
+                        deferred = self.deferred
+                        self.deferred = []
+                        for afterwards in deferred:
+                                afterwards()
+                return False
+
+def recompute_unless_batched(document, afterwards=None):
+
+        # Recomputes "document", then calls "afterwards" (if given),
+        # unless a batch is in progress for that document, in which
+        # case both are left until the end of the batch.
+
+        thebatch = batches_in_progress.get(document.Name)
+        if (thebatch is not None):
+                if (afterwards is not None):
+                        thebatch.deferred.append(afterwards)
+                return
+        with span("recompute", {"document": document.Name}):
+                document.recompute()
+        if (afterwards is not None):
+                afterwards()
+
+def sheet_template(document, pagesize, orientation):
+
+        # Returns a new TechDraw::DrawSVGTemplate object in "document"
+        # for a sheet of the given size and orientation.  Templates
+        # aren't shared between sheets: the title block texts are
+        # held by the template object, so each sheet needs one of its
+        # own, which FreeCAD reads and parses from the template file
+        # when it's first recomputed.  The caller keeps the object
+        # itself rather than its name, which FreeCAD makes unique
+        # ("Standard001" and so on) on the second and later sheets.
+
+        # BS 8888:2011 inherits most of its style requirements for
+        # drawing sheets from ISO7200, so FreeCAD's built-in ISO7200
+        # templates are a good starting point.  The "TD" version of
+        # the TechDraw template has a title block that better matches
+        # the examples in BS 8888:2011 than the "Pep" version.
+
+        thetemplate = document.addObject("TechDraw::DrawSVGTemplate",
+                                         "Standard")
+        thetemplate.Template = FreeCAD.getResourceDir()\
+                +"Mod/TechDraw/Templates/"+pagesize+"_"+orientation\
+                +"_ISO7200TD.svg"
+        return thetemplate
+
+def new_sheet(document, shorttitle, pagesize, orientation, versionnumber):
+
+        # Adds to "document", and returns, an empty TechDraw::DrawPage
+        # (FreeCAD 0.19 onwards) or Drawing::FeaturePage (earlier
+        # versions) object named "shorttitle", on the ISO7200 template
+        # for the given paper size and orientation, with the title
+        # block not yet filled in.
+
+        if (versionnumber < 0.19):
+                thesheet = document.addObject("Drawing::FeaturePage",
+                                              shorttitle)
+                # BS 8888:2011 inherits most of its style requirements
+                # for drawing sheets from ISO7200, so FreeCAD's
+                # built-in ISO7200 templates are a good starting
+                # point.
+                thesheet.Template = FreeCAD.getResourceDir()\
+                        +"Mod/Drawing/Templates/"+pagesize+"_"+orientation\
+                        +"_ISO7200.svg"
+        else:
+                thesheet = document.addObject("TechDraw::DrawPage",
+                                              shorttitle)
+                thetemplate = sheet_template(document, pagesize,
+                                             orientation)
+                # (The template is referred to by the object itself,
+                # not by name, because on the second and later sheets
+                # of a document, FreeCAD will have named it
+                # "Standard001" and so on.)
+                thesheet.Template = thetemplate
+                # TechDraw's view frames are incompatible with BS
+                # 8888:2011.  (When FreeCAD is running without its
+                # GUI, there is no ViewObject, and no frames are drawn
+                # anyway.)
+                if (thesheet.ViewObject is not None):
+                        thesheet.ViewObject.ShowFrames = False
+        return thesheet
+
+def title_block_texts(versionnumber, record):
+
+        # Returns the title block texts for one sheet, in the form the
+        # "EditableTexts" property takes for the given FreeCAD
+        # version: a list for FreeCAD versions earlier than 0.19, a
+        # dictionary for later versions.  "record" is a dictionary
+        # with the same members as the title block fields of a sheet
+        # record in a manifest (see the "Batch mode" section of
+        # README.md): "creator", "longtitle", "legalowner",
+        # "approver", "doctype", "docstatus", "pagesize", "sheetnum",
+        # "totalsheets", "inversescale", "partlist", "drawingnum",
+        # "year", "month", "day" and "revision".  Any of these
+        # that are missing from "record" give None in place of the
+        # text (both "sheetnum" and "totalsheets" are needed for the
+        # sheet number, and all of "year", "month" and "day" for the
+        # date), which write_title_block takes to mean "leave that
+        # text as it is".
+
+        # There are several fields listed in BS 8888:2011 as
+        # "mandatory" for inclusion in a title block, which are not
+        # present by default in the FreeCAD ISO7200 title block
+        # template.  This function includes them using three of the
+        # the six "supplementary information" fields in the FreeCAD
+        # template.
+
+        # Unfortunately, the mapping of actual title block fields to
+        # array element numbers in the "EditableTexts" property of a
+        # Drawing::FeaturePage object is different between different
+        # versions of FreeCAD, so it's necessary to do things
+        # differently depending on the FreeCAD version number here.
+        # In addition, the TechDraw::DrawPage class doesn't directly
+        # have an "EditableTexts" property, it only has it as a
+        # sub-property of the "Templates" property, and treats it as a
+        # hash, not a straightforward list.  Not only that, the Python
+        # "unicode" function has been renamed to "str" as of Python 3,
+        # so it's necessary to detect the (major part of the) Python
+        # version number as well.
+
+        pythonversionnumber = float(sys.version_info.major)
+
+        if (pythonversionnumber > 2.5):
+                def unicode(firstarg,secondarg):
+                        return str(firstarg)
+
+        def text(fields, makeit):
+                if (not all([(field in record) for field in fields])):
+                        return None
+                return unicode(makeit(*[record[field] for field in fields]),
+                               'utf-8')
+
+        creator = text(["creator"], lambda creator: creator)
+        longtitle = text(["longtitle"], lambda longtitle: longtitle)
+        legalowner = text(["legalowner"],
+                          lambda legalowner: 'Legal owner: '+legalowner)
+        approver = text(["approver"],
+                        lambda approver: 'To be approved by: '+approver)
+        doctype = text(["doctype"],
+                       lambda doctype: 'Document type: '+doctype)
+        docstatus = text(["docstatus"],
+                         lambda docstatus: 'Document status: '+docstatus)
+        pagesize = text(["pagesize"], lambda pagesize: pagesize)
+        sheets = text(["sheetnum", "totalsheets"],
+                      lambda sheetnum, totalsheets:
+                      '%d' % (int(sheetnum))+' / '+'%d' % (int(totalsheets)))
+        scale = text(["inversescale"],
+                     lambda inversescale: '1 : '+'%d' % (int(inversescale)))
+        partlist = text(["partlist"], lambda partlist: partlist)
+        drawingnum = text(["drawingnum"], lambda drawingnum: drawingnum)
+        date = text(["year", "month", "day"],
+                    lambda year, month, day: '%04d' % (int(year))+'-'
+                    +'%02d' % (int(month))+'-'+'%02d' % (int(day)))
+        revision = text(["revision"], lambda revision: revision)
+        if (versionnumber < 0.155):
+                return [creator, longtitle, legalowner, approver, doctype,
+                        docstatus, pagesize, sheets, scale, partlist,
+                        drawingnum, date, revision]
+        elif(versionnumber < 0.19):
+                return [creator, longtitle, legalowner, approver, doctype,
+                        docstatus, unicode(' ', 'utf-8'),
+                        unicode(' ', 'utf-8'), pagesize, sheets, scale,
+                        partlist, drawingnum, date, revision]
+        else:
+                return {"AUTHOR_NAME": creator,
+                        "DRAWING_TITLE": longtitle,
+                        "SI-1": legalowner,
+                        "SI-2": approver,
+                        "FreeCAD_DRAWING": doctype,
+                        "SI-4": docstatus,
+                        "FC-SI": pagesize,
+                        "FC-SH": sheets,
+                        "FC-SC": scale,
+                        "PN": partlist,
+                        "DN": drawingnum,
+                        "FC-DATE": date,
+                        "FC-REV": revision}
+
+def write_title_block(thesheet, versionnumber, texts):
+
+        # Puts the title block texts returned by title_block_texts
+        # into the sheet "thesheet".  Texts given as None, and (in
+        # FreeCAD 0.19 onwards) the other editable texts of the
+        # template, are left as they are.
+
+        if (versionnumber < 0.19):
+                if (None in texts):
+                        oldtexts = list(thesheet.EditableTexts)\
+                                +['']*len(texts)
+                        texts = [(oldtexts[index] if (text is None)
+                                  else text)
+                                 for index, text in enumerate(texts)]
+                thesheet.EditableTexts = texts
+        else:
+                alltexts = thesheet.Template.EditableTexts
+                for key in texts:
+                        if (texts[key] is not None):
+                                alltexts[key] = texts[key]
+                thesheet.Template.EditableTexts = alltexts
+
+def update_title_block(thesheet, record):
+
+        # Rewrites the title block of an existing sheet, "thesheet",
+        # with the title block fields in "record" (as for
+        # title_block_texts; fields missing from "record" are left as
+        # they are), and recomputes only the object holding the title
+        # block: the template in FreeCAD 0.19 onwards, the sheet
+        # itself in earlier versions, which only gathers up the
+        # drawings its views already hold.  None of the views is
+        # recomputed, so no hidden-line removal is done again.
+        # Returns the sheet.
+
+        versionnumber = float(FreeCAD.Version()[0])\
+                +0.01*float(FreeCAD.Version()[1])
+        write_title_block(thesheet, versionnumber,
+                          title_block_texts(versionnumber, record))
+        with span("recompute", {"title block": thesheet.Name}):
+                if (versionnumber < 0.19):
+                        thesheet.recompute()
+                else:
+                        thesheet.Template.recompute()
+        return thesheet
 
 class create_eights_drawing_sheet:
 
@@ -90,320 +527,181 @@ class create_eights_drawing_sheet:
                self.day = day_in
                self.revision = revision_in 
 
+        def titleblock(self):
+
+                # The title block fields of this sheet, in the form
+                # title_block_texts takes.
+
+                return {"creator": self.creator,
+                        "longtitle": self.longtitle,
+                        "legalowner": self.legalowner,
+                        "approver": self.approver,
+                        "doctype": self.doctype,
+                        "docstatus": self.docstatus,
+                        "pagesize": self.pagesize,
+                        "sheetnum": self.sheetnum,
+                        "totalsheets": self.totalsheets,
+                        "inversescale": self.inverse_scale,
+                        "partlist": self.partlist,
+                        "drawingnum": self.drawingnum,
+                        "year": self.year,
+                        "month": self.month,
+                        "day": self.day,
+                        "revision": self.revision}
+
+        @traced("sheet", lambda self, dummy: {"sheet": self.shorttitle,
+                                              "pagesize": self.pagesize})
         def create_it(self,dummy):
                 versionnumber = float(FreeCAD.Version()[0])\
                         +0.01*float(FreeCAD.Version()[1])
-                if (versionnumber < 0.19):
-                        thesheet =\
-                                self.document.addObject("Drawing::FeaturePage",
-                                                        self.shorttitle)
-                        # BS 8888:2011 inherits most of its style
-                        # requirements for drawing sheets from
-                        # ISO7200, so FreeCAD's built-in ISO7200
-                        # templates are a good starting point.
-                        thesheet.Template = FreeCAD.getResourceDir()\
-                                +"Mod/Drawing/Templates/"+self.pagesize\
-                                +"_"+self.orientation+"_ISO7200.svg"
-                else:
-                        thesheet =\
-                                self.document.addObject("TechDraw::DrawPage",
-                                                        self.shorttitle)
-                        thetemplate =\
-                                self.document.addObject\
-                                ("TechDraw::DrawSVGTemplate","Standard")
-                        # BS 8888:2011 inherits most of its style
-                        # requirements for drawing sheets from
-                        # ISO7200, so FreeCAD's built-in ISO7200
-                        # templates are a good starting point.  The
-                        # "TD" version of the TechDraw template has a
-                        # title block that better matches the examples
-                        # in BS 8888:2011 than the "Pep" version.
-                        thetemplate.Template = FreeCAD.getResourceDir()\
-                                +"Mod/TechDraw/Templates/"+self.pagesize\
-                                +"_"+self.orientation+"_ISO7200TD.svg"
-                        thesheet.Template = self.document.Standard
-                        # TechDraw's view frames are incompatible with
-                        # BS 8888:2011
-                        thesheet.ViewObject.ShowFrames = False
-                
-                # However, there are several fields listed in BS
-                # 8888:2011 as "mandatory" for inclusion in a title
-                # block, which are not present by default in the
-                # FreeCAD ISO7200 title block template.  This method
-                # includes them using three of the the six
-                # "supplementary information" fields in the FreeCAD
-                # template.
-
-                # Unfortunately, the mapping of actual title block
-                # fields to array element numbers in the
-                # "EditableTexts" property of a Drawing::FeaturePage
-                # object is different between different versions of
-                # FreeCAD, so it's necessary to do things differently
-                # depending on the FreeCAD version number here.  In
-                # addition, the TechDraw::DrawPage class doesn't
-                # directly have an "EditableTexts" property, it only
-                # has it as a sub-property of the "Templates"
-                # property, and treats it as a hash, not a
-                # straightforward list.  Not only that, the Python
-                # "unicode" function has been renamed to "str" as of
-                # Python 3, so it's necessary to detect the (major
-                # part of the) Python version number as well.
-
-                pythonversionnumber = float(sys.version_info.major)
-
-                if (pythonversionnumber > 2.5):
-                        def unicode(firstarg,secondarg):
-                                return str(firstarg)
-                
-                if (versionnumber < 0.155):
-                        thesheet.EditableTexts\
-                                = [unicode(self.creator, 'utf-8'),
-                                   unicode(self.longtitle, 'utf-8'),
-                                   unicode('Legal owner: '+self.legalowner,
-                                           'utf-8'),
-                                   unicode('To be approved by: '+self.approver,
-                                           'utf-8'),
-                                   unicode('Document type: '+self.doctype,
-                                           'utf-8'),
-                                   unicode('Document status: '
-                                           +self.docstatus, 'utf-8'),
-                                   unicode(self.pagesize, 'utf-8'),
-                                   unicode('%d' % (self.sheetnum)+' / '
-                                           +'%d' % (self.totalsheets),
-                                           'utf-8'),
-                                   unicode('1 : '+'%d' % (self.inverse_scale),
-                                           'utf-8'),
-                                   unicode(self.partlist, 'utf-8'),
-                                   unicode(self.drawingnum, 'utf-8'),
-                                   unicode('%04d' % (self.year)+'-'
-                                           +'%02d' % (self.month)
-                                           +'-'+'%02d' % (self.day), 'utf-8'),
-                                   unicode(self.revision, 'utf-8'),]
-                elif(versionnumber < 0.19):
-                        thesheet.EditableTexts\
-                                = [unicode(self.creator, 'utf-8'),
-                                   unicode(self.longtitle, 'utf-8'),
-                                   unicode('Legal owner: '+self.legalowner,
-                                           'utf-8'),
-                                   unicode('To be approved by: '+self.approver,
-                                           'utf-8'),
-                                   unicode('Document type: '+self.doctype,
-                                           'utf-8'),
-                                   unicode('Document status: '
-                                           +self.docstatus, 'utf-8'),
-                                   unicode(' ', 'utf-8'),
-                                   unicode(' ', 'utf-8'),
-                                   unicode(self.pagesize, 'utf-8'),
-                                   unicode('%d' % (self.sheetnum)+' / '
-                                           +'%d' % (self.totalsheets),
-                                           'utf-8'),
-                                   unicode('1 : '+'%d' % (self.inverse_scale),
-                                           'utf-8'),
-                                   unicode(self.partlist, 'utf-8'),
-                                   unicode(self.drawingnum, 'utf-8'),
-                                   unicode('%04d' % (self.year)+'-'
-                                           +'%02d' % (self.month)
-                                           +'-'+'%02d' % (self.day), 'utf-8'),
-                                   unicode(self.revision, 'utf-8'),]
-                else:
-                        texts = thesheet.Template.EditableTexts
-                        texts["AUTHOR_NAME"]\
-                                = unicode(self.creator, 'utf-8')
-                        texts["DRAWING_TITLE"]\
-                                = unicode(self.longtitle, 'utf-8')
-                        texts["SI-1"]\
-                                = unicode('Legal owner: '+self.legalowner,
-                                          'utf-8')
-                        texts["SI-2"]\
-                                = unicode('To be approved by: '+self.approver,
-                                          'utf-8')
-                        texts["FreeCAD_DRAWING"]\
-                                = unicode('Document type: '+self.doctype,
-                                          'utf-8')
-                        texts["SI-4"]\
-                                = unicode('Document status: '
-                                          +self.docstatus, 'utf-8')
-                        texts["FC-SI"]\
-                                = unicode(self.pagesize, 'utf-8')
-                        texts["FC-SH"]\
-                                = unicode('%d' % (self.sheetnum)+' / '
-                                          +'%d' % (self.totalsheets),
-                                          'utf-8')
-                        texts["FC-SC"]\
-                                = unicode('1 : '+'%d' % (self.inverse_scale),
-                                          'utf-8')
-                        texts["PN"]\
-                                = unicode(self.partlist, 'utf-8')
-                        texts["DN"]\
-                                = unicode(self.drawingnum, 'utf-8')
-                        texts["FC-DATE"]\
-                                = unicode('%04d' % (self.year)+'-'
-                                          +'%02d' % (self.month)
-                                          +'-'+'%02d' % (self.day), 'utf-8')
-                        texts["FC-REV"]\
-                                = unicode(self.revision, 'utf-8')
-                        thesheet.Template.EditableTexts =  texts
-                self.document.recompute()
+                thesheet = new_sheet(self.document, self.shorttitle,
+                                     self.pagesize, self.orientation,
+                                     versionnumber)
+                write_title_block(thesheet, versionnumber,
+                                  title_block_texts(versionnumber,
+                                                    self.titleblock()))
+                if (current_memory_manager is not None):
+                        current_memory_manager.sheet_started(thesheet)
+                recompute_unless_batched(self.document)
+                return thesheet
 
-class eitherone:
+        def update_it(self,thesheet):
 
-        # A parent class defining a method that's needed in both
-        # the add_first_angle_projection_symbol class and the
-        # first_angle_projection class.
+                # Rewrites the title block of "thesheet", a sheet made
+                # earlier by create_it (perhaps in an earlier session,
+                # and saved), with this object's title block fields,
+                # without recomputing any of its views; see
+                # update_title_block.
 
-        def __init__():
+                return update_title_block(thesheet, self.titleblock())
 
-                pass
+class create_eights_drawing_sheets:
 
-        def addsingleview(self,versionnumber,legend,featurepart,viewdirection,
-                          width,depth,height,imgcountxdo,imgcountxwo,
-                          gapcountxo,imgcountydo,imgcountyho,gapcounty,
-                          imgcountxdn,imgcountxwn,gapcountxn,imgcountydn,
-                          imgcountyhn,rotationo,rotationn,thick,thin):
-                
-                if(versionnumber < 0.19):
-                        theview\
-                                = self.drawing_page.Document.addObject("Drawing::FeatureViewPart",
-                                                                       self.title
-                                                                       +legend)
-                else:
-                        theview\
-                                = self.drawing_page.Document.addObject("TechDraw::DrawViewPart",
-                                                                       self.title
-                                                                       +legend) 
-                theview.Source = featurepart
-                theview.Direction = viewdirection
+        # The purpose of this class is to provide the method
+        # "create_them", which does the same job as create_it in
+        # create_eights_drawing_sheet, but for a whole table of sheets
+        # at once, adding them all to one existing FreeCAD document in
+        # a single pass, with a single recompute of the document at
+        # the end (which saves the recomputes, but not the reading of
+        # one template file per sheet; see sheet_template).  The
+        # table, records_in, is a list with one dictionary per sheet,
+        # whose members are "shorttitle", "orientation" and the title
+        # block fields taken by title_block_texts (so rows read by
+        # csv.DictReader will do, the numeric fields being converted
+        # as needed); "sheetnum" and "totalsheets" may be left out, in
+        # which case the sheets are numbered in the order of the
+        # table, out of the number of rows in it.
 
-                # BS 8888:2011 does not specify the exact spacing
-                # between the individual views, so that spacing is
-                # taken from user input; similarly for the position on
-                # the sheet of the overall set of views.
+        def __init__(self, document_in, records_in):
+               self.document = document_in
+               self.records = records_in
 
-                if(versionnumber < 0.19):
-                        
-                        # The "addView" method of a TechDraw::DrawPage
-                        # object appears to change the "X" and "Y"
-                        # properties of the TechDraw::DrawViewPart
-                        # object that's being added, so it's only when
-                        # the Drawing toolbox, rather than the
-                        # TechDraw toolbox, is being used that there's
-                        # any point setting the "X" and "Y" properties
-                        # (of the Drawing::FeatureViewPart object) here.
-                        # In any case, the "X" and "Y" properties have
-                        # to take different values when the TechDraw
-                        # toolbox is in use, since the TechDraw toolbox
-                        # measures Y in the opposite direction from the
-                        # Drawing toolbox, and the TechDraw toolbox
-                        # measures X and Y at the centre of a
-                        # DrawViewPart object, whereas the Drawing
-                        # toolbox measures X and Y at one corner of a
-                        # FeatureViewPart object.
-                        theview.X = self.xpos+imgcountxdo*depth\
-                                +imgcountxwo*width+gapcountxo*self.spacing
-                        theview.Y = self.ypos\
-                                +imgcountydo*depth+imgcountyho*height\
-                                +gapcounty*self.spacing
-                else:
-                        theview.ScaleType = u"Custom"
-                theview.Scale = self.scale
-                if(versionnumber < 0.19):
-                        theview.Rotation = rotationo
-                        theview.ShowHiddenLines = True
-                        theview.LineWidth = thick
-                        theview.HiddenWidth = thin
-                        self.drawing_page.addObject(theview)
-                else:
-                        theview.Rotation = rotationn
-                        theview.HardHidden = True
-                        theview.ViewObject.LineWidth = thick
-                        theview.ViewObject.HiddenWidth = thin
-                        theview.Label = ""
-                        self.drawing_page.addView(theview)
-                        theview.X = self.xpos+imgcountxdn*depth\
-                                +imgcountxwn*width+gapcountxn*self.spacing
-                        theview.Y = float(self.drawing_page.Template.Height)\
-                                -self.ypos-(imgcountydn*depth
-                                            +imgcountyhn*height)\
-                                -gapcounty*self.spacing
-                return theview
+        @traced("sheets", lambda self, dummy: {"sheets":
+                                               len(self.records)})
+        def create_them(self,dummy):
 
-class add_first_angle_projection_symbol(eitherone):
+                # Returns the list of sheets, in the same order as the
+                # table.
 
-        # The purpose of this class is to provide the method
-        # "put_it_in", which adds the standard BS 8888:2011 symbol,
-        # indicating that a set of drawings are in first angle
-        # projection ("the symbol"), to an existing TechDraw::DrawPage
-        # or Drawing::FeaturePage object ("the sheet").  The method
-        # put_it_in also creates a new FreeCAD Document ("the dummy
-        # document"), containing various objects that are created as
-        # intermediate steps on the way to adding the symbol to the
-        # sheet, but which do not need to exist in the same document
-        # as the sheet.  The method put_it_in also modifies the parent
-        # document of the sheet, by adding to it two
-        # TechDraw::DrawViewPart or Drawing::FeatureViewPart objects,
-        # which are intermediate steps on the way to adding the symbol
-        # to the sheet, and which have to exist _in the same document
-        # as the sheet_ in order to add the symbol to the sheet.
+                versionnumber = float(FreeCAD.Version()[0])\
+                        +0.01*float(FreeCAD.Version()[1])
+                totalsheets = len(self.records)
+                sheets = []
+                with batch(self.document):
+                        for sheetnum, record in enumerate(self.records):
+                                if (("sheetnum" not in record)
+                                    or ("totalsheets" not in record)):
+                                        record = dict(record)
+                                        record.setdefault("sheetnum",
+                                                          sheetnum+1)
+                                        record.setdefault("totalsheets",
+                                                          totalsheets)
+                                thesheet = new_sheet(self.document,
+                                                     record["shorttitle"],
+                                                     record["pagesize"],
+                                                     record["orientation"],
+                                                     versionnumber)
+                                write_title_block(thesheet, versionnumber,
+                                                  title_block_texts(
+                                                          versionnumber,
+                                                          record))
+                                if (current_memory_manager is not None):
+                                        current_memory_manager\
+                                                .sheet_started(thesheet)
+                                sheets.append(thesheet)
+                return sheets
 
-        def __init__(self, H_in, h_in, d_in, xpos_in, ypos_in,
-                     drawing_page_in):
-                self.H = H_in
-                self.h = h_in
-                self.d = d_in
-                self.xpos = xpos_in
-                self.ypos = ypos_in
-                self.drawing_page = drawing_page_in
+class scratch_document:
 
-        def put_it_in(self,dummy):
-                self.title = "first_angle_projection_symbol"
-                thick = 0.7 # The wider of the two line widths suggested in\
-                             # BS 8888:2011
-                thin = 0.35 # The narrower of the two line widths suggested\
-                            # in BS 8888:2011
+        # The purpose of this class is to manage a single FreeCAD
+        # Document ("the scratch document") to hold the Part::Feature
+        # objects which the classes below need as the "Source" of
+        # their views, but which do not need to exist in the same
+        # document as the sheet.  Previously, every call to put_it_in,
+        # fap or tap created and closed its own dummy document; an
+        # instance of this class, passed to the constructors of those
+        # classes, lets all the parts on a sheet (or in a whole
+        # session) share one scratch document, which is created the
+        # first time it's needed and released exactly once, by
+        # "release_it" (or on leaving a "with" block).
 
-                # BS 8888:2011 does not specify the exact dimensions
-                # of the truncated cone, axonometric projections of
-                # which form the symbol, so those dimensions are taken
-                # from user input.
+        def __init__(self, name_in="Dummy"):
+                self.name = name_in
+                self.document = None
+                self.features = []
+                self.released = False
+
+        def __enter__(self):
+                return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+                self.release_it('putanyoldrubbishhere')
+                return False
+
+        def feature_for(self, title, shape):
+
+                # Returns a Part::Feature in the scratch document
+                # whose Shape is "shape", reusing an existing feature
+                # if the same shape has already been added (as
+                # happens, for instance, with the cone from which a
+                # projection symbol is drawn).  Features are never
+                # re-pointed at a different shape, because the views
+                # already on the sheet still refer to them.
+
+                if (self.document is None):
+                        self.document = FreeCAD.newDocument(self.name)
+                        self.released = False
+                for feature in self.features:
+                        try:
+                                if (feature.Shape.isSame(shape)):
+                                        return feature
+                        except Exception:
+                                pass
+                feature = self.document.addObject("Part::Feature", title)
+                feature.Shape = shape
+                self.features.append(feature)
+                return feature
+
+        def clear_it(self,dummy):
+
+                # Removes every feature from the scratch document,
+                # without closing it.  This is only safe once the views
+                # that use the features have been recomputed, and, for
+                # the same reasons as in release_it, is only done if
+                # the FreeCAD version is 0.18.4 or later.
 
-                base_radius = 0.5*self.h
-                top_radius = 0.5*self.H
-                self.spacing = 3.0*self.d
-                depth = self.H
-                height = self.H
-                width = self.H
-                top_centre = FreeCAD.Vector(top_radius,0.0,top_radius)
-                depth_wise_direction = FreeCAD.Vector(0.0,1.0,0.0)
-                part = Part.makeCone(base_radius,top_radius,self.H,
-                                     top_centre,depth_wise_direction)
-                dummydoc = FreeCAD.newDocument("Dummy")
-                part_in_tree = dummydoc.addObject("Part::Feature",
-                                                  self.title)
-                part_in_tree.Shape = part
-                featurepart = dummydoc.getObject(self.title)
                 versionnumber = float(FreeCAD.Version()[0])\
                         +0.01*float(FreeCAD.Version()[1])
-                self.scale = 1.0
-                
-                plusxview = self.addsingleview(versionnumber,
-                                               " from positive x",
-                                               featurepart,
-                                               FreeCAD.Vector(1.0,0.0,0.0),
-                                               width,depth,height,0.0,0.0,
-                                               0.0,0.0,0.0,0.0,0.5,
-                                               0.0,0.0,0.0,0.0,270.0,0.0,thick,
-                                               thin)
-                minusyview = self.addsingleview(versionnumber,
-                                                " from negative y",
-                                                featurepart,
-                                                FreeCAD.Vector(0.0,-1.0,0.0),
-                                                width,depth,height,1.0,0.0,
-                                                1.0,0.0,0.0,0.0,1.0,
-                                                0.5,1.0,0.0,0.0,90.0,0.0,thick,
-                                                thin)
-                self.drawing_page.Document.recompute()
+                if ((self.document is not None) and (versionnumber >= 0.184)):
+                        for feature in self.features:
+                                self.document.removeObject(feature.Name)
+                        self.features = []
 
-                # Leaving the dummy document open is a waste of RAM
+        @traced("release dummy document",
+                lambda self, dummy: {"document": self.name})
+        def release_it(self,dummy):
+
+                # Leaving the scratch document open is a waste of RAM
                 # and clutters up the GUI, so ideally, one would like
                 # to close it.  Unfortunately, attempting to close the
                 # dummy document causes a segfault, at least under
@@ -411,73 +709,1749 @@ class add_first_angle_projection_symbol(eitherone):
                 # 0.16 on Fedora 28, so the following command operates
                 # only if the FreeCAD version is 0.18.4 or later.
                 # (I've checked, and the segfault doesn't happen under
-                # FreeCAD 0.18.4 on Ubuntu 20.04.)
+                # FreeCAD 0.18.4 on Ubuntu 20.04.)  On earlier
+                # versions, the scratch document is left open, but at
+                # least there's only one of it.  The document is
+                # closed by its actual name, which FreeCAD may have
+                # changed from self.name (to "Dummy001", say) if a
+                # document of that name already existed.
 
+                if ((self.document is None) or self.released):
+                        return
+                versionnumber = float(FreeCAD.Version()[0])\
+                        +0.01*float(FreeCAD.Version()[1])
                 if (versionnumber >= 0.184):
-                        FreeCAD.closeDocument("Dummy")
+                        FreeCAD.closeDocument(self.document.Name)
+                        self.document = None
+                        self.features = []
+                self.released = True
 
-class add_third_angle_projection_symbol(eitherone):
+def memory_in_use():
 
-        # The purpose of this class is to provide the method
-        # "put_it_in", which adds the standard BS 8888:2011 symbol,
-        # indicating that a set of drawings are in third angle
-        # projection ("the symbol"), to an existing TechDraw::DrawPage
-        # or Drawing::FeaturePage object ("the sheet").  The method
-        # put_it_in also creates a new FreeCAD Document ("the dummy
-        # document"), containing various objects that are created as
-        # intermediate steps on the way to adding the symbol to the
-        # sheet, but which do not need to exist in the same document
-        # as the sheet.  The method put_it_in also modifies the parent
-        # document of the sheet, by adding to it two
-        # TechDraw::DrawViewPart or Drawing::FeatureViewPart objects,
-        # which are intermediate steps on the way to adding the symbol
-        # to the sheet, and which have to exist _in the same document
-        # as the sheet_ in order to add the symbol to the sheet.
+        # Returns the resident set size of this process in bytes, or
+        # None if it can't be found out (it's read from /proc, so
+        # this works on Linux only).
 
-        def __init__(self, H_in, h_in, d_in, xpos_in, ypos_in,
-                     drawing_page_in):
-                self.H = H_in
-                self.h = h_in
-                self.d = d_in
-                self.xpos = xpos_in
-                self.ypos = ypos_in
-                self.drawing_page = drawing_page_in
+        try:
+                with open("/proc/self/statm") as thefile:
+                        pages = int(thefile.read().split()[1])
+                return pages*os.sysconf("SC_PAGE_SIZE")
+        except (IOError, OSError, ValueError, AttributeError):
+                return None
 
-        def put_it_in(self,dummy):
-                self.title = "third_angle_projection_symbol"
-                thick = 0.7 # The wider of the two line widths suggested in\
-                             # BS 8888:2011
-                thin = 0.35 # The narrower of the two line widths suggested\
-                            # in BS 8888:2011
+def memory_high_water():
 
-                # BS 8888:2011 does not specify the exact dimensions
-                # of the truncated cone, axonometric projections of
-                # which form the symbol, so those dimensions are taken
-                # from user input.
+        # Returns the largest resident set size this process has had,
+        # in bytes, since it started or since the last call of
+        # reset_memory_high_water that succeeded, or None if it can't
+        # be found out.
 
-                base_radius = 0.5*self.h
-                top_radius = 0.5*self.H
-                self.spacing = 3.0*self.d
-                depth = self.H
-                height = self.H
-                width = self.H
-                top_centre = FreeCAD.Vector(top_radius,0.0,top_radius)
-                depth_wise_direction = FreeCAD.Vector(0.0,1.0,0.0)
-                part = Part.makeCone(base_radius,top_radius,self.H,
-                                     top_centre,depth_wise_direction)
-                dummydoc = FreeCAD.newDocument("Dummy")
-                part_in_tree = dummydoc.addObject("Part::Feature",
-                                                  self.title)
-                part_in_tree.Shape = part
-                featurepart = dummydoc.getObject(self.title)
-                versionnumber = float(FreeCAD.Version()[0])\
-                        +0.01*float(FreeCAD.Version()[1])
-                self.scale = 1.0
-                
-                plusxview = self.addsingleview(versionnumber,
-                                               " from positive x",
-                                               featurepart,
-                                               FreeCAD.Vector(1.0,0.0,0.0),
+        try:
+                with open("/proc/self/status") as thefile:
+                        for line in thefile:
+                                if (line.startswith("VmHWM:")):
+                                        return 1024*int(line.split()[1])
+        except (IOError, OSError, ValueError):
+                pass
+        try:
+                import resource
+        except ImportError:
+                return None
+
+        # ru_maxrss is in kilobytes, except on macOS, where it's in
+        # bytes.
+
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if (sys.platform == "darwin"):
+                return maxrss
+        return 1024*maxrss
+
+def reset_memory_high_water():
+
+        # Asks the (Linux) kernel to start measuring this process's
+        # largest resident set size afresh, so that the high-water
+        # mark of each sheet can be told apart.  Returns whether it
+        # could.
+
+        try:
+                with open("/proc/self/clear_refs", "w") as thefile:
+                        thefile.write("5")
+                return True
+        except (IOError, OSError):
+                return False
+
+# The memory_manager in charge, if any.
+
+current_memory_manager = None
+
+class memory_manager:
+
+        # The purpose of this class is to keep the memory used by a
+        # long session of sheet construction under control, by
+        # enclosing the construction in a "with eights.memory_manager():"
+        # block.  Inside the block:
+        #
+        # - every document, sheet, template and view that eights
+        #   creates is recorded;
+        # - put_it_in, fap and tap use a single dummy document,
+        #   belonging to the memory_manager, unless given a scratch
+        #   document of their own, rather than each making one of its
+        #   own (which, on FreeCAD versions earlier than 0.18.4, can't
+        #   be closed);
+        # - if release_shapes_in is true (the default), fap and tap let
+        #   go of the shape they were given once its views have been
+        #   added, and the dummy document is emptied after each
+        #   recompute, so that the shapes can be freed;
+        # - the high-water mark of the process's memory use while each
+        #   sheet was being built, including the recompute in which
+        #   TechDraw does the hidden-line removal, is recorded (see
+        #   statistics); and
+        # - if ceiling_in is a number of bytes, then whenever the
+        #   process's memory use exceeds it, every document passed to
+        #   finish_it is saved (to the file name given to finish_it, or
+        #   to directory_in) and closed; finish_it refuses a document
+        #   that would have nowhere to be saved, rather than let it be
+        #   closed unsaved.
+        #
+        # The memory_manager's dummy document is released on leaving
+        # the block.
+
+        def __init__(self, ceiling_in=None, directory_in=None,
+                     release_shapes_in=True):
+                self.ceiling = ceiling_in
+                self.directory = directory_in
+                self.release_shapes = release_shapes_in
+                self.scratch = scratch_document()
+                self.documents = []
+                self.objects = {}
+                self.sheets = {}
+                self.finished = []
+                self.closed = []
+                self.previous = None
+
+        def __enter__(self):
+                global current_memory_manager
+                self.previous = current_memory_manager
+                current_memory_manager = self
+                return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+                global current_memory_manager
+                current_memory_manager = self.previous
+                self.previous = None
+                self.scratch.release_it('putanyoldrubbishhere')
+                return False
+
+        def track(self, theobject):
+
+                # Records a document object created by eights.
+
+                document = theobject.Document.Name
+                if (document not in self.objects):
+                        self.documents.append(document)
+                        self.objects[document] = []
+                self.objects[document].append(theobject.Name)
+
+        def sheet_started(self, thesheet):
+
+                # Called by create_it with each new sheet.
+
+                # The sheets built in one eights.batch share its
+                # recompute, which is where most of the memory is
+                # used, so their memory use can't be told apart: the
+                # high-water mark is only reset for the first of them,
+                # and each is given the peak of the whole batch.
+
+                self.track(thesheet)
+                if (hasattr(thesheet.Template, "Document")):
+                        self.track(thesheet.Template)
+                thebatch = batches_in_progress.get(thesheet.Document.Name)
+                if ((thebatch is None) or (not thebatch.measuring)):
+                        reset_memory_high_water()
+                if (thebatch is not None):
+                        thebatch.measuring = True
+                self.sheets[(thesheet.Document.Name, thesheet.Name)]\
+                        = {"document": thesheet.Document.Name,
+                           "sheet": thesheet.Name, "views": 0,
+                           "started": memory_in_use(),
+                           "peak": memory_in_use(),
+                           "batched": thebatch is not None,
+                           "pending": thebatch is not None}
+
+        def views_added(self, thesheet, views):
+
+                # Called by put_it_in, fap and tap with the views they
+                # added to a sheet.
+
+                for theview in views:
+                        self.track(theview)
+                key = (thesheet.Document.Name, thesheet.Name)
+                if (key not in self.sheets):
+                        self.sheets[key] = {"document": key[0],
+                                            "sheet": key[1], "views": 0,
+                                            "started": None, "peak": None,
+                                            "batched": False,
+                                            "pending": False}
+                record = self.sheets[key]
+                record["views"] = record["views"]+len(views)
+                if (key[0] in batches_in_progress):
+                        record["batched"] = True
+                        record["pending"] = True
+                self.sample_peak(record)
+                self.enforce_ceiling()
+
+        def recomputed(self, document):
+
+                # Called by an eights.batch after its recompute of
+                # "document", which is when the views added inside the
+                # batch are actually drawn: gives every sheet of the
+                # document with views waiting for that recompute the
+                # high-water mark reached by then.
+
+                for key in sorted(self.sheets):
+                        record = self.sheets[key]
+                        if ((record["document"] == document.Name)
+                            and record["pending"]):
+                                self.sample_peak(record)
+                                record["pending"] = False
+                self.enforce_ceiling()
+
+        def sample_peak(self, record):
+                for sample in [memory_high_water(), memory_in_use()]:
+                        if ((sample is not None)
+                            and ((record["peak"] is None)
+                                 or (sample > record["peak"]))):
+                                record["peak"] = sample
+
+        def finish_it(self, document, filename=None):
+
+                # Marks "document" as finished, so that it may be
+                # saved (to "filename", or to a file named after the
+                # document in the memory_manager's directory) and
+                # closed if memory runs short.  Raises ValueError if
+                # there is neither, since the document could then only
+                # be closed without being saved.
+
+                if (filename is None):
+                        if (self.directory is None):
+                                raise ValueError("memory_manager can't"
+                                                 " finish document %s:"
+                                                 " no file name given and"
+                                                 " no directory to save"
+                                                 " it in"
+                                                 % (document.Name))
+                        filename = os.path.join(self.directory,
+                                                document.Name+".FCStd")
+                self.finished.append((document, filename))
+                self.enforce_ceiling()
+
+        def enforce_ceiling(self):
+                if ((self.ceiling is None) or (not self.finished)):
+                        return
+                inuse = memory_in_use()
+                if ((inuse is None) or (inuse <= self.ceiling)):
+                        return
+                simplified_shapes.clear()
+                finished = self.finished
+                self.finished = []
+                for document, filename in finished:
+                        document.saveAs(filename)
+                        name = document.Name
+                        FreeCAD.closeDocument(name)
+                        if (name in self.objects):
+                                self.documents.remove(name)
+                                del self.objects[name]
+                        self.closed.append({"document": name,
+                                            "file": filename})
+
+        def statistics(self):
+
+                # Returns the documents eights has created that are
+                # still open, with the number of objects in each, the
+                # high-water mark of memory use (in bytes) while each
+                # sheet was built (or, for a sheet whose "batched"
+                # member is true, while the whole eights.batch it was
+                # built in was), the documents closed to stay under
+                # the ceiling, and the current and peak memory use of
+                # the process.
+
+                return {"documents": dict([(name, len(self.objects[name]))
+                                           for name in self.documents]),
+                        "sheets": [dict([(field, self.sheets[key][field])
+                                         for field in self.sheets[key]
+                                         if (field != "pending")])
+                                   for key in sorted(self.sheets)],
+                        "closed": list(self.closed),
+                        "inuse": memory_in_use(),
+                        "peak": memory_high_water()}
+
+# SVG drawings of the projection symbols, keyed by the parameters
+# from which they're generated, so that each distinct symbol is
+# generated only once per session.
+
+projection_symbol_assets = {}
+
+def projection_symbol_svg(angle, H, h, d, standalone):
+
+        # Returns the SVG drawing of the BS 8888:2011 projection symbol
+        # for "first" or "third" angle projection: the same two views
+        # of a truncated cone (large diameter H, small diameter h, with
+        # the views 3d apart) that put_it_in would otherwise obtain by
+        # hidden-line projection, laid out in the same places relative
+        # to the symbol position.  Being a cone, the views are simply
+        # a trapezium (small end on the left, in both projections) and
+        # a pair of concentric circles, so they can be written down
+        # directly.  Coordinates are in millimetres, from the top left
+        # of the symbol.  If "standalone" is true, the result is a
+        # complete SVG document (as TechDraw::DrawViewSymbol needs),
+        # otherwise it is a bare group (as Drawing::FeatureViewSymbol,
+        # which inserts it into the page as-is, needs).
+
+        key = (angle, H, h, d, standalone)
+        if (key in projection_symbol_assets):
+                return projection_symbol_assets[key]
+        thick = 0.7 # The wider of the two line widths suggested in\
+                    # BS 8888:2011
+        spacing = 3.0*d
+        if (angle == "first"):
+                conecentre = 0.5*H
+                circlecentre = 1.5*H+spacing
+        else:
+                conecentre = 1.5*H+spacing
+                circlecentre = 0.5*H
+        middle = 0.5*H
+        group = ('<g fill="none" stroke="#000000" stroke-width="%.6g" '
+                 'stroke-linecap="round" stroke-linejoin="round">'
+                 '<path d="M %.6g %.6g L %.6g %.6g L %.6g %.6g L %.6g %.6g Z"/>'
+                 '<circle cx="%.6g" cy="%.6g" r="%.6g"/>'
+                 '<circle cx="%.6g" cy="%.6g" r="%.6g"/>'
+                 '</g>')\
+                 % (thick,
+                    conecentre-0.5*H, middle-0.5*h,
+                    conecentre+0.5*H, middle-0.5*H,
+                    conecentre+0.5*H, middle+0.5*H,
+                    conecentre-0.5*H, middle+0.5*h,
+                    circlecentre, middle, 0.5*H,
+                    circlecentre, middle, 0.5*h)
+        if (standalone):
+                width = 2.0*H+spacing+thick
+                height = H+thick
+                thesvg = ('<svg xmlns="http://www.w3.org/2000/svg" '
+                          'width="%.6gmm" height="%.6gmm" '
+                          'viewBox="%.6g %.6g %.6g %.6g">%s</svg>')\
+                          % (width, height, -0.5*thick, -0.5*thick, width,
+                             height, group)
+        else:
+                thesvg = group
+        projection_symbol_assets[key] = thesvg
+        return thesvg
+
+def mesh_topology(part):
+
+        # Returns the vertices and triangles of "part", as a (points,
+        # facets) pair, if it's a Mesh.Mesh object or already such a
+        # pair (as the tessellation-based engine accepts), or None if
+        # it's a shape.
+
+        if (hasattr(part, "Topology")):
+                return part.Topology
+        if (isinstance(part, tuple)):
+                return part
+        return None
+
+def shape_fingerprint(shape):
+
+        # Returns a string identifying the geometry of "shape" by its
+        # content (a hash of its BREP representation or, for a mesh,
+        # of its vertices and triangles), so that two
+        # separately-constructed but identical shapes, or the same
+        # shape in two different FreeCAD sessions, have the same
+        # fingerprint.
+
+        topology = mesh_topology(shape)
+        if (topology is None):
+                return hashlib.sha256(shape.exportBrepToString()
+                                      .encode("utf-8")).hexdigest()
+        (points, facets) = topology
+        return hashlib.sha256(repr(([(float(point[0]), float(point[1]),
+                                      float(point[2]))
+                                     for point in points],
+                                    [tuple(int(index) for index in facet)
+                                     for facet in facets])).encode("utf-8"))\
+                                     .hexdigest()
+
+def part_bound_box(part):
+
+        # Returns the bounding box of "part" (or at least something
+        # with its XLength, YLength and ZLength): its BoundBox, if it
+        # has one, otherwise (for a (points, facets) pair) a
+        # planned_part with the extents of its vertices.
+
+        if (hasattr(part, "BoundBox")):
+                return part.BoundBox
+        (points, facets) = mesh_topology(part)
+        if (len(points) == 0):
+                return planned_part(0.0, 0.0, 0.0)
+        extents = [max([float(point[axis]) for point in points])
+                   -min([float(point[axis]) for point in points])
+                   for axis in range(3)]
+        return planned_part(*extents)
+
+def projected_edges(shape, viewdirection, versionnumber, tolerance=0.01):
+
+        # Carries out hidden-line removal on "shape", viewed from
+        # "viewdirection", using the same projection algorithm as the
+        # TechDraw or Drawing toolbox (depending on the FreeCAD
+        # version number), and returns the resulting edges as plain
+        # data: a dictionary whose "visible" and "hidden" members are
+        # lists of polylines, each polyline being a list of [x, y]
+        # points in the projection plane, in model units (not yet
+        # scaled), with y upwards.  Curved edges are approximated by
+        # polylines that deviate from them by no more than
+        # "tolerance".  Of the edge sets the projection algorithm
+        # returns, the sharp edges and the outlines are used, as the
+        # views added by addsingleview show by default.
+
+        if(versionnumber < 0.19):
+                groups = Drawing.projectEx(shape, viewdirection)
+        else:
+                groups = TechDraw.projectEx(shape, viewdirection)
+        edges = {"visible": [], "hidden": []}
+        for (kind, indices) in (("visible", (0, 3)), ("hidden", (5, 8))):
+                for index in indices:
+                        if ((groups[index] is None)
+                            or groups[index].isNull()):
+                                continue
+                        for edge in groups[index].Edges:
+                                points = edge.discretize(Deflection=tolerance)
+                                edges[kind].append([[point.x, point.y]
+                                                    for point in points])
+        return edges
+
+def projected_edges_svg(edges, scale, thick, thin, standalone, rotation=0.0):
+
+        # Returns an SVG drawing of a set of edges of the form returned
+        # by projected_edges, at the given scale, with visible edges
+        # as continuous lines of width "thick" and hidden edges as
+        # dashed lines of width "thin" (dash and gap lengths 12 and 3
+        # line widths, as in ISO 128), turned clockwise (as seen on
+        # the sheet) by "rotation" degrees.  Coordinates are in
+        # millimetres on the sheet, with y downwards and the origin at
+        # the projection of the model origin.  If "standalone" is
+        # true, the result is a complete SVG document whose view box
+        # just encloses the edges (as TechDraw::DrawViewSymbol, which
+        # centres it on the view position, needs), otherwise it is a
+        # bare group (as Drawing::FeatureViewSymbol needs).
+
+        cosine = math.cos(math.radians(rotation))
+        sine = math.sin(math.radians(rotation))
+        paths = []
+        xs = []
+        ys = []
+        for (kind, attributes) in\
+            (("visible", 'stroke-width="%.6g"' % (thick)),
+             ("hidden", 'stroke-width="%.6g" stroke-dasharray="%.6g,%.6g"'
+              % (thin, 12.0*thin, 3.0*thin))):
+                for polyline in edges[kind]:
+                        points = [(scale*(x*cosine+y*sine),
+                                   scale*(x*sine-y*cosine))
+                                  for (x, y) in polyline]
+                        xs.extend([x for (x, y) in points])
+                        ys.extend([y for (x, y) in points])
+                        paths.append('<path %s d="M %s"/>'
+                                     % (attributes,
+                                        " L ".join(["%.4f %.4f" % point
+                                                    for point in points])))
+        group = ('<g fill="none" stroke="#000000" stroke-linecap="round" '
+                 'stroke-linejoin="round">%s</g>') % ("".join(paths))
+        if (not standalone):
+                return group
+        if (len(xs) == 0):
+                xs = [0.0]
+                ys = [0.0]
+        return ('<svg xmlns="http://www.w3.org/2000/svg" '
+                'width="%.6gmm" height="%.6gmm" '
+                'viewBox="%.6g %.6g %.6g %.6g">%s</svg>')\
+                % (max(xs)-min(xs)+thick, max(ys)-min(ys)+thick,
+                   min(xs)-0.5*thick, min(ys)-0.5*thick,
+                   max(xs)-min(xs)+thick, max(ys)-min(ys)+thick, group)
+
+# Shapes simplified by simplified_shape, keyed by the fingerprint of
+# the original shape, the scale and the threshold, least recently used
+# first.  Only the most recently used simplified_shapes_limit of them
+# are kept, since each holds a whole OpenCASCADE shape (and a
+# memory_manager that has to close documents to stay under its ceiling
+# empties it altogether).
+
+simplified_shapes = collections.OrderedDict()
+simplified_shapes_limit = 16
+
+def simplified_shape(shape, scale, threshold, fingerprint=None):
+
+        # Returns "shape" without the faces too small to show when it's
+        # drawn at "scale": those whose bounding box, scaled, has its
+        # second longest side shorter than "threshold" mm on the sheet
+        # (small fillets, chamfers, holes, threads, engraved text and
+        # so on).  The faces are removed by defeaturing (which needs
+        # FreeCAD 0.20 or later), and the faces left that had been
+        # split by the removed ones are merged again with
+        # removeSplitter.  If defeaturing isn't available, or fails,
+        # or would remove every face, or gives an invalid shape, the
+        # original shape is returned instead.  The result is kept in
+        # simplified_shapes, so a shape drawn again soon afterwards at
+        # the same scale and threshold isn't simplified again.
+
+        if (fingerprint is None):
+                fingerprint = shape_fingerprint(shape)
+        key = (fingerprint, scale, threshold)
+        if (key in simplified_shapes):
+                simplified_shapes.move_to_end(key)
+                return simplified_shapes[key]
+        small = []
+        for face in shape.Faces:
+                sides = sorted([face.BoundBox.XLength, face.BoundBox.YLength,
+                                face.BoundBox.ZLength])
+                if (sides[1]*scale < threshold):
+                        small.append(face)
+        result = shape
+        if (small and (len(small) < len(shape.Faces))):
+                try:
+                        candidate = shape.defeaturing(small).removeSplitter()
+                        if ((not candidate.isNull()) and candidate.isValid()):
+                                result = candidate
+                except Exception:
+                        pass
+        simplified_shapes[key] = result
+        while (len(simplified_shapes) > simplified_shapes_limit):
+                simplified_shapes.popitem(last=False)
+        return result
+
+def line_width_tolerance(scale, thin):
+
+        # Returns the distance, in model units, by which an
+        # approximation of a curve may deviate from the curve without
+        # the deviation showing on the sheet, at the given scale: half
+        # the width of the thinner line.
+
+        return 0.5*thin/scale
+
+def view_axes(viewdirection):
+
+        # Returns the directions, in model space, of the x and y axes
+        # of the projection plane for a view from "viewdirection",
+        # chosen by the same rule as OpenCASCADE uses when it's given
+        # only a view direction (as it is by projected_edges), so that
+        # tessellated_edges lays views out the same way.
+
+        (a, b, c) = viewdirection
+        if ((abs(b) <= abs(a)) and (abs(b) <= abs(c))):
+                if (abs(a) > abs(c)):
+                        xaxis = (-c, 0.0, a)
+                else:
+                        xaxis = (c, 0.0, -a)
+        elif ((abs(a) <= abs(b)) and (abs(a) <= abs(c))):
+                if (abs(b) > abs(c)):
+                        xaxis = (0.0, -c, b)
+                else:
+                        xaxis = (0.0, c, -b)
+        else:
+                if (abs(a) > abs(b)):
+                        xaxis = (-b, a, 0.0)
+                else:
+                        xaxis = (b, -a, 0.0)
+        length = (xaxis[0]**2+xaxis[1]**2+xaxis[2]**2)**0.5
+        xaxis = (xaxis[0]/length, xaxis[1]/length, xaxis[2]/length)
+        yaxis = (b*xaxis[2]-c*xaxis[1], c*xaxis[0]-a*xaxis[2],
+                 a*xaxis[1]-b*xaxis[0])
+        return (xaxis, yaxis)
+
+def tessellation_arrays(part, tolerance):
+
+        # Returns a triangulation of "part" as a pair of NumPy arrays:
+        # the vertex coordinates (one row per vertex) and the
+        # triangles (one row of three vertex indices per triangle).
+        # "part" may be anything that can be assigned to the Shape
+        # property of a Part::Feature (which is tessellated to within
+        # "tolerance"), a Mesh.Mesh object, or a (points, triangles)
+        # pair.  Coincident vertices are merged, since a shape's
+        # tessellation repeats the vertices along the boundaries
+        # between its faces, and the boundaries would otherwise all
+        # look like open edges.
+
+        if (numpy is None):
+                raise RuntimeError("the tessellation-based projection"
+                                   " engine needs NumPy")
+        topology = mesh_topology(part)
+        if (topology is None):
+                topology = part.tessellate(tolerance)
+        (points, facets) = topology
+        points = numpy.array([[point[0], point[1], point[2]]
+                              for point in points], dtype=float)
+        triangles = numpy.array(facets, dtype=int).reshape(-1, 3)
+        if (len(points) == 0):
+                return (points.reshape(-1, 3), triangles)
+        extent = (points.max(axis=0)-points.min(axis=0)).max()
+        quantum = max(1.0e-9*extent, 1.0e-12)
+        (merged, first, inverse)\
+                = numpy.unique(numpy.round(points/quantum), axis=0,
+                               return_index=True, return_inverse=True)
+        points = points[first]
+        triangles = inverse.reshape(-1)[triangles]
+        triangles = triangles[(triangles[:, 0] != triangles[:, 1])
+                              & (triangles[:, 1] != triangles[:, 2])
+                              & (triangles[:, 2] != triangles[:, 0])]
+        return (points, triangles)
+
+def chained_polylines(segments, coordinates):
+
+        # Joins line segments (pairs of vertex indices) that meet end
+        # to end into polylines, and returns each polyline as a list
+        # of [x, y] points taken from "coordinates".
+
+        ends = {}
+        for (number, (start, finish)) in enumerate(segments):
+                ends.setdefault(start, []).append(number)
+                ends.setdefault(finish, []).append(number)
+        used = [False]*len(segments)
+        polylines = []
+        for number in range(len(segments)):
+                if (used[number]):
+                        continue
+                used[number] = True
+                chain = list(segments[number])
+                for forwards in (True, False):
+                        while True:
+                                tip = chain[-1] if forwards else chain[0]
+                                following = [other for other in ends[tip]
+                                             if not used[other]]
+                                if (len(following) == 0):
+                                        break
+                                used[following[0]] = True
+                                (start, finish) = segments[following[0]]
+                                if (start == tip):
+                                        onward = finish
+                                else:
+                                        onward = start
+                                if (forwards):
+                                        chain.append(onward)
+                                else:
+                                        chain.insert(0, onward)
+                polylines.append([[float(coordinates[vertex][0]),
+                                   float(coordinates[vertex][1])]
+                                  for vertex in chain])
+        return polylines
+
+def tessellated_edges(tessellation, viewdirection, featureangle=30.0):
+
+        # An alternative to projected_edges, much faster for complex
+        # shapes and usable for meshes, at the cost of drawing curves
+        # as polylines.  Given a tessellation (as returned by
+        # tessellation_arrays), returns the edges of the view from
+        # "viewdirection", in the same form as projected_edges.  The
+        # edges drawn are those of the tessellation that are open,
+        # shared by more than two triangles, creases (where the
+        # triangles either side meet at more than "featureangle"
+        # degrees) or silhouettes (where one of the triangles either
+        # side faces the viewer and the other doesn't).  Each edge is
+        # classed as visible or hidden by testing whether any
+        # triangle lies in front of its mid-point, all the tests for
+        # a batch of mid-points being done at once.
+
+        if (numpy is None):
+                raise RuntimeError("the tessellation-based projection"
+                                   " engine needs NumPy")
+        (points, triangles) = tessellation
+        view = numpy.array([viewdirection.x, viewdirection.y,
+                            viewdirection.z], dtype=float)
+        view = view/numpy.linalg.norm(view)
+        (xaxis, yaxis) = view_axes(tuple(view))
+        projected = numpy.column_stack([points.dot(xaxis), points.dot(yaxis),
+                                        points.dot(view)])
+        corners = points[triangles]
+        normals = numpy.cross(corners[:, 1]-corners[:, 0],
+                              corners[:, 2]-corners[:, 0])
+        lengths = numpy.linalg.norm(normals, axis=1)
+        triangles = triangles[lengths > 0.0]
+        normals = normals[lengths > 0.0]/lengths[lengths > 0.0, None]
+        facing = normals.dot(view) > 0.0
+        count = len(triangles)
+        edges = numpy.sort(numpy.concatenate([triangles[:, [0, 1]],
+                                              triangles[:, [1, 2]],
+                                              triangles[:, [2, 0]]]), axis=1)
+        owners = numpy.tile(numpy.arange(count), 3)
+        if (len(edges) == 0):
+                return {"visible": [], "hidden": []}
+        (unique, inverse, counts) = numpy.unique(edges, axis=0,
+                                                 return_inverse=True,
+                                                 return_counts=True)
+        inverse = inverse.reshape(-1)
+        owners = owners[numpy.argsort(inverse, kind="stable")]
+        starts = numpy.cumsum(counts)-counts
+        first = owners[starts]
+        second = owners[numpy.where(counts > 1, starts+1, starts)]
+        drawn = (counts != 2)\
+                | ((normals[first]*normals[second]).sum(axis=1)
+                   < numpy.cos(numpy.radians(featureangle)))\
+                | (facing[first] != facing[second])
+        segments = unique[drawn]
+        span = projected[segments[:, 1], :2]-projected[segments[:, 0], :2]
+        segments = segments[(span*span).sum(axis=1) > 0.0]
+        middles = 0.5*(projected[segments[:, 0]]+projected[segments[:, 1]])
+        triangle2d = projected[triangles]
+        extent = (projected.max(axis=0)-projected.min(axis=0)).max()
+        tolerance = 1.0e-6*extent
+        u0 = triangle2d[:, 0, 0]
+        v0 = triangle2d[:, 0, 1]
+        u1 = triangle2d[:, 1, 0]
+        v1 = triangle2d[:, 1, 1]
+        u2 = triangle2d[:, 2, 0]
+        v2 = triangle2d[:, 2, 1]
+        determinant = (v1-v2)*(u0-u2)+(u2-u1)*(v0-v2)
+        usable = numpy.abs(determinant) > tolerance*tolerance
+        lowu = triangle2d[:, :, 0].min(axis=1)
+        highu = triangle2d[:, :, 0].max(axis=1)
+        lowv = triangle2d[:, :, 1].min(axis=1)
+        highv = triangle2d[:, :, 1].max(axis=1)
+        hidden = numpy.zeros(len(segments), dtype=bool)
+
+        # The mid-points are sorted into a coarse grid order, so that
+        # each batch covers a small part of the view, and only the
+        # triangles overlapping that part need testing.
+
+        cell = max(extent/32.0, tolerance)
+        order = numpy.lexsort((numpy.floor(middles[:, 0]/cell),
+                               numpy.floor(middles[:, 1]/cell)))
+        for start in range(0, len(order), 256):
+                batch = order[start:start+256]
+                pu = middles[batch, 0]
+                pv = middles[batch, 1]
+                pw = middles[batch, 2]
+                candidates = numpy.nonzero(usable
+                                           & (highu >= pu.min())
+                                           & (lowu <= pu.max())
+                                           & (highv >= pv.min())
+                                           & (lowv <= pv.max()))[0]
+                if (len(candidates) == 0):
+                        continue
+                d = determinant[candidates]
+                du = pu[:, None]-u2[candidates]
+                dv = pv[:, None]-v2[candidates]
+                l0 = ((v1-v2)[candidates]*du+(u2-u1)[candidates]*dv)/d
+                l1 = ((v2-v0)[candidates]*du+(u0-u2)[candidates]*dv)/d
+                l2 = 1.0-l0-l1
+                inside = (l0 >= 0.0) & (l1 >= 0.0) & (l2 >= 0.0)
+                depth = l0*triangle2d[candidates, 0, 2]\
+                        +l1*triangle2d[candidates, 1, 2]\
+                        +l2*triangle2d[candidates, 2, 2]
+                hidden[batch] = (inside
+                                 & (depth > pw[:, None]+tolerance)).any(axis=1)
+        return {"visible": chained_polylines([tuple(segment) for segment
+                                              in segments[~hidden]],
+                                             projected),
+                "hidden": chained_polylines([tuple(segment) for segment
+                                             in segments[hidden]],
+                                            projected)}
+
+class projection_cache:
+
+        # The purpose of this class is to keep, in a directory on disk,
+        # the results of hidden-line removal, so that drawing the same
+        # part from the same direction again (later in the same
+        # session, in another session, or in another process sharing
+        # the directory) skips the hidden-line removal altogether.
+        # Each result is stored as a JSON file, named by a hash of the
+        # part's geometry (see shape_fingerprint) and of everything
+        # else that affects the result (view direction,
+        # hidden-line settings, toolbox).  When the files in the
+        # directory exceed "maxbytes_in" in total, the least recently
+        # used are deleted.  The number of hits, misses and evictions
+        # is available from "statistics".
+
+        def __init__(self, directory_in, maxbytes_in=256*1024*1024):
+                self.directory = directory_in
+                self.maxbytes = maxbytes_in
+                self.hits = 0
+                self.misses = 0
+                self.evictions = 0
+                if (not os.path.isdir(self.directory)):
+                        os.makedirs(self.directory)
+                self.entries = {}
+                for name in os.listdir(self.directory):
+                        if (name.endswith(".json")):
+                                path = os.path.join(self.directory, name)
+                                self.entries[name] = [os.path.getsize(path),
+                                                      os.path.getmtime(path)]
+
+        def key(self, fingerprint, *settings):
+                return hashlib.sha256(repr((fingerprint,)+settings)
+                                      .encode("utf-8")).hexdigest()
+
+        def get(self, key):
+                name = key+".json"
+                path = os.path.join(self.directory, name)
+                try:
+                        with open(path) as thefile:
+                                edges = json.load(thefile)
+                except (IOError, OSError, ValueError):
+                        self.misses = self.misses+1
+                        return None
+                now = time.time()
+                try:
+                        os.utime(path, (now, now))
+                except OSError:
+                        pass
+                self.entries[name] = [os.path.getsize(path), now]
+                self.hits = self.hits+1
+                return edges
+
+        def put(self, key, edges):
+                name = key+".json"
+                path = os.path.join(self.directory, name)
+                temporarypath = "%s.%d.tmp" % (path, os.getpid())
+                with open(temporarypath, "w") as thefile:
+                        json.dump(edges, thefile)
+                if (hasattr(os, "replace")):
+                        os.replace(temporarypath, path)
+                else:
+                        if (os.path.exists(path)):
+                                os.remove(path)
+                        os.rename(temporarypath, path)
+                self.entries[name] = [os.path.getsize(path), time.time()]
+                self.evict()
+
+        def evict(self):
+
+                # Deletes least recently used entries until the total
+                # size is below nine tenths of the limit, so that
+                # eviction doesn't have to happen again on the very
+                # next store.
+
+                total = sum([entry[0] for entry in self.entries.values()])
+                if (total <= self.maxbytes):
+                        return
+                for name in sorted(self.entries,
+                                   key=lambda name: self.entries[name][1]):
+                        if (total <= 0.9*self.maxbytes):
+                                break
+                        total = total-self.entries[name][0]
+                        del self.entries[name]
+                        try:
+                                os.remove(os.path.join(self.directory, name))
+                        except OSError:
+                                pass
+                        self.evictions = self.evictions+1
+
+        def statistics(self):
+                return {"hits": self.hits, "misses": self.misses,
+                        "evictions": self.evictions,
+                        "entries": len(self.entries),
+                        "bytes": sum([entry[0]
+                                      for entry in self.entries.values()])}
+
+def projected_edges_from_brep(brep, direction, versionnumber, tolerance):
+
+        # The job done by each worker process of a parallel_projection:
+        # rebuilds a shape from its BREP text, and returns
+        # projected_edges for it, viewed from the direction given as
+        # an (x, y, z) tuple.
+
+        shape = Part.Shape()
+        shape.importBrepFromString(brep)
+        return projected_edges(shape, FreeCAD.Vector(*direction),
+                               versionnumber, tolerance)
+
+# The parallel_projection in charge, if any.
+
+current_parallel_projection = None
+
+class parallel_projection:
+
+        # The purpose of this class is to let the hidden-line removal
+        # for all the views of all the parts on a sheet (or several)
+        # run at the same time, in a pool of worker processes, by
+        # enclosing the put_it_in, fap and tap calls in a "with
+        # eights.parallel_projection():" block.  Inside the block,
+        # each view is added to its sheet straight away, as an empty
+        # TechDraw::DrawViewSymbol or Drawing::FeatureViewSymbol
+        # object in the right place, and the hidden-line removal for
+        # it (a shape, sent as BREP text, and a direction) is handed to
+        # the pool; on leaving the block, the projected edges that the
+        # workers send back are drawn into the views, in this
+        # process, and the documents concerned are recomputed (once
+        # each, or, inside an eights.batch, at the end of the batch).
+        # Views whose edges are already in a projection cache are
+        # drawn at once, and the edges computed by the workers are
+        # stored in the cache.  The number of worker processes is
+        # workers_in (if None, one per CPU core).  As with
+        # eights_manifest, the workers are started afresh (not
+        # forked), so this needs a Python interpreter that can import
+        # FreeCAD, not the FreeCAD GUI.
+
+        def __init__(self, workers_in=None):
+                self.workers = workers_in
+                self.pool = None
+                self.pending = []
+                self.breps = {}
+                self.previous = None
+
+        def __enter__(self):
+                global current_parallel_projection
+                self.previous = current_parallel_projection
+                current_parallel_projection = self
+                return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+                global current_parallel_projection
+                current_parallel_projection = self.previous
+                self.previous = None
+                try:
+                        if (exc_type is None):
+                                self.finish_it('putanyoldrubbishhere')
+                finally:
+                        if (self.pool is not None):
+                                if (exc_type is None):
+                                        self.pool.close()
+                                else:
+                                        self.pool.terminate()
+                                self.pool.join()
+                                self.pool = None
+                        self.pending = []
+                        self.breps = {}
+                return False
+
+        def submit(self, theview, featurepart, fingerprint, viewdirection,
+                   versionnumber, tolerance, cache, key, scale, thick, thin,
+                   standalone, rotation):
+
+                # Phase one: hands the hidden-line removal for one view
+                # to the pool, remembering what to do with the result.
+                # The BREP text of each shape is made only once, however
+                # many views of it there are, and kept by "fingerprint",
+                # which identifies the geometry of featurepart's shape
+                # (feature and document names are no good for that,
+                # since scratch documents and their features reuse
+                # them for different shapes).
+
+                if (self.pool is None):
+                        import multiprocessing
+                        workers = self.workers
+                        if (workers is None):
+                                workers = multiprocessing.cpu_count()
+                        context = multiprocessing.get_context("spawn")
+                        self.pool = context.Pool(max(1, workers))
+                if (fingerprint not in self.breps):
+                        self.breps[fingerprint]\
+                                = featurepart.Shape.exportBrepToString()
+                result = self.pool.apply_async(projected_edges_from_brep,
+                                               (self.breps[fingerprint],
+                                                (viewdirection.x,
+                                                 viewdirection.y,
+                                                 viewdirection.z),
+                                                versionnumber, tolerance))
+                self.pending.append((theview, result, cache, key, scale,
+                                     thick, thin, standalone, rotation))
+
+        def finish_it(self,dummy):
+
+                # Phase two: waits for every view handed to the pool,
+                # draws its edges into it, stores them in the cache (if
+                # any), and recomputes the documents concerned.
+                # Returns the number of views filled in.
+
+                pending = self.pending
+                self.pending = []
+                documents = []
+                for theview, result, cache, key, scale, thick, thin,\
+                    standalone, rotation in pending:
+                        edges = result.get()
+                        if (cache is not None):
+                                cache.put(key, edges)
+                        theview.Symbol = projected_edges_svg(edges, scale,
+                                                             thick, thin,
+                                                             standalone,
+                                                             rotation)
+                        if (theview.Document not in documents):
+                                documents.append(theview.Document)
+                for document in documents:
+                        recompute_unless_batched(document)
+                return len(pending)
+
+def releasing_scratch_on_failure(method):
+
+        # Returns a version of "method" (put_it_in, fap or tap) which,
+        # if it fails, releases any scratch documents private to the
+        # call before passing the exception on.  (When it succeeds,
+        # they're released by releasescratch, once the views drawn
+        # from them have been recomputed.)
+
+        def wrapper(self, *args, **kwargs):
+                try:
+                        return method(self, *args, **kwargs)
+                except BaseException:
+                        self.releaseprivatescratches()
+                        raise
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+class eitherone:
+
+        # A parent class defining a method that's needed in both
+        # the add_first_angle_projection_symbol class and the
+        # first_angle_projection class.
+
+        def __init__():
+
+                pass
+
+        @traced("copy shape", lambda self, shape: {"part": self.title})
+        def scratchfeature(self,shape):
+
+                # Returns a Part::Feature holding "shape", in the
+                # scratch document passed to the constructor or, if
+                # none was, in a new scratch document private to this
+                # call, which releasescratch will release.  The
+                # tessellation-based engine doesn't need one at all.
+
+                if (getattr(self, "engine", "hlr") == "numpy"):
+                        return None
+                if ((self.scratch is None)
+                    and (current_memory_manager is not None)):
+                        self.manager = current_memory_manager
+                        feature = self.manager.scratch.feature_for(self.title,
+                                                                   shape)
+                        self.manager.track(feature)
+                        return feature
+                if (self.scratch is None):
+                        privatescratch = scratch_document()
+                        self.privatescratches = getattr(self,
+                                                        "privatescratches",
+                                                        [])\
+                                +[privatescratch]
+                        return privatescratch.feature_for(self.title, shape)
+                return self.scratch.feature_for(self.title, shape)
+
+        def releasescratch(self):
+                self.releaseprivatescratches()
+                manager = getattr(self, "manager", None)
+                if ((manager is not None) and manager.release_shapes):
+                        manager.scratch.clear_it('putanyoldrubbishhere')
+                self.manager = None
+
+        def releaseprivatescratches(self):
+                for privatescratch in getattr(self, "privatescratches", []):
+                        privatescratch.release_it('putanyoldrubbishhere')
+                self.privatescratches = []
+
+        def viewsadded(self,views):
+
+                # Tells the memory_manager in charge, if any, about the
+                # views just added to the sheet, and, if it says so,
+                # lets go of the shape they were drawn from (which
+                # means that fap or tap can't be called again on this
+                # object without first setting self.part again), and of
+                # everything worked out from it.
+
+                if (current_memory_manager is None):
+                        return
+                current_memory_manager.views_added(self.drawing_page, views)
+                if (current_memory_manager.release_shapes
+                    and hasattr(self, "part")):
+                        self.part = None
+                        self.fingerprint = None
+                        self.tessellation = None
+
+        def addsymbolasset(self,versionnumber,angle):
+
+                # Adds the projection symbol to the sheet as a single
+                # TechDraw::DrawViewSymbol or Drawing::FeatureViewSymbol
+                # object, drawn from the cached SVG drawing made by
+                # projection_symbol_svg, rather than by hidden-line
+                # projection of a cone.  The symbol is placed where the
+                # two views added by put_it_in would have been: its
+                # vertical centre line at self.ypos below the top of
+                # the sheet, and its left-hand edge at self.xpos.
+
+                spacing = 3.0*self.d
+                view_index_of(self.drawing_page).add(
+                        symbol_footprint(self.H, self.d, self.xpos,
+                                         self.ypos),
+                        (self.title, " symbol"))
+                if(versionnumber < 0.19):
+                        theview\
+                                = self.drawing_page.Document.addObject("Drawing::FeatureViewSymbol",
+                                                                       self.title)
+                        theview.Symbol = projection_symbol_svg(angle, self.H,
+                                                               self.h, self.d,
+                                                               False)
+                        theview.X = self.xpos
+                        theview.Y = self.ypos-0.5*self.H
+                        self.drawing_page.addObject(theview)
+                else:
+                        theview\
+                                = self.drawing_page.Document.addObject("TechDraw::DrawViewSymbol",
+                                                                       self.title)
+                        theview.Symbol = projection_symbol_svg(angle, self.H,
+                                                               self.h, self.d,
+                                                               True)
+                        theview.Label = ""
+                        self.drawing_page.addView(theview)
+                        theview.X = self.xpos+0.5*(2.0*self.H+spacing)
+                        theview.Y = float(self.drawing_page.Template.Height)\
+                                -self.ypos
+                recompute_unless_batched(self.drawing_page.Document)
+                return [theview]
+
+        def projectedpart(self):
+
+                # Returns the shape whose views are to be drawn: the
+                # part as given or, if a simplification threshold was
+                # passed to the constructor, the part without the
+                # detail too small to see (see simplified_shape).
+
+                if ((getattr(self, "simplify", None) is None)
+                    or (not hasattr(self.part, "defeaturing"))):
+                        return self.part
+                return simplified_shape(self.part, self.scale, self.simplify,
+                                        self.partfingerprint(self.part))
+
+        def partfingerprint(self,shape):
+
+                # Returns shape_fingerprint(shape), working it out
+                # again only when "shape" isn't the shape it was last
+                # worked out for (as when self.part has been set to a
+                # new shape since).
+
+                if ((getattr(self, "fingerprint", None) is None)
+                    or (self.fingerprint[0] is not shape)):
+                        self.fingerprint = (shape, shape_fingerprint(shape))
+                return self.fingerprint[1]
+
+        def projectedfingerprint(self):
+
+                # Identifies the shape that projectedpart returns: by
+                # the fingerprint of the part as given and, if that was
+                # simplified, the settings of the simplification.
+
+                fingerprint = self.partfingerprint(self.part)
+                if ((getattr(self, "simplify", None) is not None)
+                    and (self.projectedpart() is not self.part)):
+                        return (fingerprint, "simplify", self.simplify,
+                                self.scale)
+                return (fingerprint,)
+
+        def viewsfingerprint(self,projection):
+
+                # Returns a fingerprint of everything that determines
+                # the views fap or tap adds for this part: its geometry,
+                # the projection ("first" or "third"), where and at
+                # what scale the views go on the sheet, and how they're
+                # drawn (the engine, fidelity and simplification, and
+                # whether the edges are projected by the views
+                # themselves or come ready-made from a cache or the
+                # worker processes).
+
+                projected = ((getattr(self, "cache", None) is not None)
+                             or (current_parallel_projection is not None))
+                return hashlib.sha256(repr((self.partfingerprint(self.part),
+                                            projection, self.spacing,
+                                            self.xpos, self.ypos,
+                                            self.scale,
+                                            getattr(self, "engine", "hlr"),
+                                            getattr(self, "fidelity",
+                                                    "exact"),
+                                            getattr(self, "simplify", None),
+                                            projected)).encode("utf-8"))\
+                                            .hexdigest()
+
+        def tagviews(self,views,projection):
+
+                # Records, in two extra properties of each of the views
+                # of this part, the part's title and the fingerprint
+                # returned by viewsfingerprint, so that updateviews can
+                # later tell which views belong to which part, and
+                # whether they're out of date.
+
+                fingerprint = self.viewsfingerprint(projection)
+                for theview in views:
+                        if ("EightsPart" not in theview.PropertiesList):
+                                theview.addProperty("App::PropertyString",
+                                                    "EightsPart", "Eights",
+                                                    "Part drawn in this view")
+                                theview.addProperty("App::PropertyString",
+                                                    "EightsFingerprint",
+                                                    "Eights",
+                                                    "Fingerprint of the part"
+                                                    " and its layout")
+                        theview.EightsPart = self.title
+                        theview.EightsFingerprint = fingerprint
+
+        def existingviews(self,versionnumber):
+                if(versionnumber < 0.19):
+                        views = self.drawing_page.Group
+                else:
+                        views = self.drawing_page.Views
+                return [theview for theview in views
+                        if (("EightsPart" in theview.PropertiesList)
+                            and (theview.EightsPart == self.title))]
+
+        def updateviews(self,projection,build):
+
+                # Brings the views of this part on the sheet up to date,
+                # without touching anything else on the sheet: if the
+                # sheet already has a full set of views of this part
+                # with the same fingerprint, they're left as they are;
+                # otherwise any views of this part are removed, and
+                # "build" (fap or tap) is called to add new ones.
+                # Returns the views of this part.
+
+                versionnumber = float(FreeCAD.Version()[0])\
+                        +0.01*float(FreeCAD.Version()[1])
+                fingerprint = self.viewsfingerprint(projection)
+                existing = self.existingviews(versionnumber)
+                if ((len(existing) == 6)
+                    and all([theview.EightsFingerprint == fingerprint
+                             for theview in existing])):
+                        return existing
+                document = self.drawing_page.Document
+                if(versionnumber < 0.19):
+                        self.drawing_page.Group\
+                                = [theview for theview in self.drawing_page.Group
+                                   if theview not in existing]
+                for theview in existing:
+                        if(versionnumber >= 0.19):
+                                self.drawing_page.removeView(theview)
+                        document.removeObject(theview.Name)
+                view_index_of(self.drawing_page).remove_part(self.title)
+                return build('putanyoldrubbishhere')
+
+        def planviews(self,projection):
+
+                # What fap or tap does when the object was made with
+                # dry_run_in set: adds nothing to the sheet (which may
+                # be None), but returns the plan of the views it would
+                # have added, as plain data; see plan_projection_views.
+
+                sheetheight = None
+                if (self.drawing_page is not None):
+                        sheetheight = sheet_size_of(self.drawing_page)[1]
+                return plan_projection_views(self.part, self.spacing,
+                                             self.xpos, self.ypos,
+                                             self.scale, projection,
+                                             sheetheight)
+
+        def projectiontolerance(self,thin):
+
+                # The tolerance to which projected_edges approximates
+                # curves for this part's views.
+
+                if (getattr(self, "fidelity", "exact") == "coarse"):
+                        return line_width_tolerance(self.scale, thin)
+                return 0.01
+
+        def cachekey(self,versionnumber,featurepart,viewdirection,thin):
+
+                # Returns the key under which the projected edges of a
+                # view of featurepart are kept in self.cache, and the
+                # tolerance to which they're projected.  The edges are
+                # kept as projectEx lays them out, before any turn (see
+                # addedgesview), so the view's rotation isn't part of
+                # the key.  The key is made from the fingerprint of
+                # self.part, whose shape featurepart holds (or a
+                # simplification of it), so setting self.part to a new
+                # shape gives new keys.
+
+                fingerprint = self.partfingerprint(self.part)
+                tolerance = self.projectiontolerance(thin)
+                settings = [(viewdirection.x, viewdirection.y,
+                             viewdirection.z),
+                            "HardHidden", versionnumber < 0.19, tolerance]
+
+                # The fingerprint is that of the part as given, so if
+                # it was simplified before projection, the settings of
+                # the simplification have to be part of the key too.
+
+                if ((getattr(self, "simplify", None) is not None)
+                    and (self.projectedpart() is not self.part)):
+                        settings.append(("simplify", self.simplify,
+                                         self.scale))
+                return (self.cache.key(fingerprint, *settings), tolerance)
+
+        def addparallelview(self,versionnumber,legend,featurepart,
+                            viewdirection,width,depth,height,imgcountxdo,
+                            imgcountxwo,gapcountxo,imgcountydo,imgcountyho,
+                            gapcounty,imgcountxdn,imgcountxwn,gapcountxn,
+                            imgcountydn,imgcountyhn,rotationo,rotationn,thick,
+                            thin):
+
+                # Does the same job as addcachedview, but, unless the
+                # projected edges are already in self.cache (if there
+                # is one), hands the hidden-line removal to the worker
+                # processes of the parallel_projection in charge, and
+                # adds an empty view to the sheet straight away, to be
+                # filled in with the edges when the parallel_projection
+                # finishes.
+
+                key = None
+                tolerance = self.projectiontolerance(thin)
+                if (getattr(self, "cache", None) is not None):
+                        key, tolerance = self.cachekey(versionnumber,
+                                                       featurepart,
+                                                       viewdirection,thin)
+                        edges = self.cache.get(key)
+                        if (edges is not None):
+                                return self.addedgesview(versionnumber,
+                                                         legend,edges,width,
+                                                         depth,height,
+                                                         imgcountxdo,
+                                                         imgcountxwo,
+                                                         gapcountxo,
+                                                         imgcountydo,
+                                                         imgcountyho,
+                                                         gapcounty,
+                                                         imgcountxdn,
+                                                         imgcountxwn,
+                                                         gapcountxn,
+                                                         imgcountydn,
+                                                         imgcountyhn,
+                                                         rotationo,rotationn,
+                                                         thick,thin)
+                theview = self.addedgesview(versionnumber,legend,
+                                            {"visible": [], "hidden": []},
+                                            width,depth,height,imgcountxdo,
+                                            imgcountxwo,gapcountxo,
+                                            imgcountydo,imgcountyho,
+                                            gapcounty,imgcountxdn,
+                                            imgcountxwn,gapcountxn,
+                                            imgcountydn,imgcountyhn,
+                                            rotationo,rotationn,thick,thin)
+                current_parallel_projection.submit(theview, featurepart,
+                                                   self.projectedfingerprint(),
+                                                   viewdirection,
+                                                   versionnumber, tolerance,
+                                                   getattr(self, "cache",
+                                                           None),
+                                                   key, self.scale, thick,
+                                                   thin, versionnumber >= 0.19,
+                                                   rotationo)
+                return theview
+
+        def addcachedview(self,versionnumber,legend,featurepart,
+                          viewdirection,width,depth,height,imgcountxdo,
+                          imgcountxwo,gapcountxo,imgcountydo,imgcountyho,
+                          gapcounty,imgcountxdn,imgcountxwn,gapcountxn,
+                          imgcountydn,imgcountyhn,rotationo,rotationn,thick,
+                          thin):
+
+                # Does the same job as addsingleview, but takes the
+                # projected edges from self.cache if they're there
+                # (otherwise computing them with projected_edges and
+                # storing them in self.cache), and adds them to the
+                # sheet with addedgesview.
+
+                key, tolerance = self.cachekey(versionnumber,featurepart,
+                                               viewdirection,thin)
+                edges = self.cache.get(key)
+                if (edges is None):
+                        edges = projected_edges(featurepart.Shape,
+                                                viewdirection, versionnumber,
+                                                tolerance)
+                        self.cache.put(key, edges)
+                return self.addedgesview(versionnumber,legend,edges,width,
+                                         depth,height,imgcountxdo,imgcountxwo,
+                                         gapcountxo,imgcountydo,imgcountyho,
+                                         gapcounty,imgcountxdn,imgcountxwn,
+                                         gapcountxn,imgcountydn,imgcountyhn,
+                                         rotationo,rotationn,thick,thin)
+
+        def addedgesview(self,versionnumber,legend,edges,width,depth,height,
+                         imgcountxdo,imgcountxwo,gapcountxo,imgcountydo,
+                         imgcountyho,gapcounty,imgcountxdn,imgcountxwn,
+                         gapcountxn,imgcountydn,imgcountyhn,rotationo,
+                         rotationn,thick,thin):
+
+                # Adds a set of already-projected edges, of the form
+                # returned by projected_edges, to the sheet as a
+                # TechDraw::DrawViewSymbol or Drawing::FeatureViewSymbol
+                # object, whose position on the sheet is calculated in
+                # the same way as for the view objects added by
+                # addsingleview.  The edges are laid out in the
+                # projection plane in the way the Drawing toolbox lays
+                # out a view (see view_axes), so they're turned by the
+                # Drawing toolbox's rotation, rotationo, whichever
+                # toolbox is in use, and the turn is built into the SVG
+                # drawing rather than left to the view object.
+                # (TechDraw's rotation, rotationn, is for the axes
+                # TechDraw chooses for its own views, so it would turn
+                # these edges the wrong way.)
+
+                if(versionnumber < 0.19):
+                        theview\
+                                = self.drawing_page.Document.addObject("Drawing::FeatureViewSymbol",
+                                                                       self.title
+                                                                       +legend)
+                        theview.Symbol = projected_edges_svg(edges, self.scale,
+                                                             thick, thin,
+                                                             False, rotationo)
+                        theview.X = self.xpos+imgcountxdo*depth\
+                                +imgcountxwo*width+gapcountxo*self.spacing
+                        theview.Y = self.ypos\
+                                +imgcountydo*depth+imgcountyho*height\
+                                +gapcounty*self.spacing
+                        self.drawing_page.addObject(theview)
+                else:
+                        theview\
+                                = self.drawing_page.Document.addObject("TechDraw::DrawViewSymbol",
+                                                                       self.title
+                                                                       +legend)
+                        theview.Symbol = projected_edges_svg(edges, self.scale,
+                                                             thick, thin, True,
+                                                             rotationo)
+                        theview.Label = ""
+                        self.drawing_page.addView(theview)
+                        theview.X = self.xpos+imgcountxdn*depth\
+                                +imgcountxwn*width+gapcountxn*self.spacing
+                        theview.Y = float(self.drawing_page.Template.Height)\
+                                -self.ypos-(imgcountydn*depth
+                                            +imgcountyhn*height)\
+                                -gapcounty*self.spacing
+                return theview
+
+        @traced("view", lambda self, versionnumber, legend, featurepart,
+                viewdirection, *rest: {"part": self.title,
+                                       "view": legend.strip(),
+                                       "direction": [viewdirection.x,
+                                                     viewdirection.y,
+                                                     viewdirection.z]})
+        def addsingleview(self,versionnumber,legend,featurepart,viewdirection,
+                          width,depth,height,imgcountxdo,imgcountxwo,
+                          gapcountxo,imgcountydo,imgcountyho,gapcounty,
+                          imgcountxdn,imgcountxwn,gapcountxn,imgcountydn,
+                          imgcountyhn,rotationo,rotationn,thick,thin):
+
+                # The view is entered in the sheet's view_index before
+                # anything else is done, so that the index is up to
+                # date even while the hidden-line removal is pending.
+
+                view_index_of(self.drawing_page).add(
+                        view_rectangle((viewdirection.x, viewdirection.y,
+                                        viewdirection.z),
+                                       width, depth, height, self.scale,
+                                       self.xpos+imgcountxdn*depth
+                                       +imgcountxwn*width
+                                       +gapcountxn*self.spacing,
+                                       self.ypos+imgcountydn*depth
+                                       +imgcountyhn*height
+                                       +gapcounty*self.spacing),
+                        (self.title, legend))
+                if (getattr(self, "engine", "hlr") == "numpy"):
+
+                        # The tessellation is kept with the fingerprint
+                        # of the shape it was made from, so that it's
+                        # made again if self.part is set to a new shape.
+
+                        fingerprint = self.projectedfingerprint()
+                        if ((getattr(self, "tessellation", None) is None)
+                            or (self.tessellation[0] != fingerprint)):
+                                self.tessellation\
+                                        = (fingerprint,
+                                           tessellation_arrays(
+                                                   self.projectedpart(),
+                                                   line_width_tolerance(
+                                                           self.scale,
+                                                           thin)))
+                        edges = tessellated_edges(self.tessellation[1],
+                                                  viewdirection)
+                        return self.addedgesview(versionnumber,legend,edges,
+                                                 width,depth,height,
+                                                 imgcountxdo,imgcountxwo,
+                                                 gapcountxo,imgcountydo,
+                                                 imgcountyho,gapcounty,
+                                                 imgcountxdn,imgcountxwn,
+                                                 gapcountxn,imgcountydn,
+                                                 imgcountyhn,rotationo,
+                                                 rotationn,thick,thin)
+                if (current_parallel_projection is not None):
+                        return self.addparallelview(versionnumber,legend,
+                                                    featurepart,
+                                                    viewdirection,width,
+                                                    depth,height,imgcountxdo,
+                                                    imgcountxwo,gapcountxo,
+                                                    imgcountydo,imgcountyho,
+                                                    gapcounty,imgcountxdn,
+                                                    imgcountxwn,gapcountxn,
+                                                    imgcountydn,imgcountyhn,
+                                                    rotationo,rotationn,thick,
+                                                    thin)
+                if (getattr(self, "cache", None) is not None):
+                        return self.addcachedview(versionnumber,legend,
+                                                  featurepart,viewdirection,
+                                                  width,depth,height,
+                                                  imgcountxdo,imgcountxwo,
+                                                  gapcountxo,imgcountydo,
+                                                  imgcountyho,gapcounty,
+                                                  imgcountxdn,imgcountxwn,
+                                                  gapcountxn,imgcountydn,
+                                                  imgcountyhn,rotationo,
+                                                  rotationn,thick,thin)
+                if(versionnumber < 0.19):
+                        theview\
+                                = self.drawing_page.Document.addObject("Drawing::FeatureViewPart",
+                                                                       self.title
+                                                                       +legend)
+                else:
+                        theview\
+                                = self.drawing_page.Document.addObject("TechDraw::DrawViewPart",
+                                                                       self.title
+                                                                       +legend) 
+                theview.Source = featurepart
+                theview.Direction = viewdirection
+
+                # BS 8888:2011 does not specify the exact spacing
+                # between the individual views, so that spacing is
+                # taken from user input; similarly for the position on
+                # the sheet of the overall set of views.
+
+                if(versionnumber < 0.19):
+                        
+                        # The "addView" method of a TechDraw::DrawPage
+                        # object appears to change the "X" and "Y"
+                        # properties of the TechDraw::DrawViewPart
+                        # object that's being added, so it's only when
+                        # the Drawing toolbox, rather than the
+                        # TechDraw toolbox, is being used that there's
+                        # any point setting the "X" and "Y" properties
+                        # (of the Drawing::FeatureViewPart object) here.
+                        # In any case, the "X" and "Y" properties have
+                        # to take different values when the TechDraw
+                        # toolbox is in use, since the TechDraw toolbox
+                        # measures Y in the opposite direction from the
+                        # Drawing toolbox, and the TechDraw toolbox
+                        # measures X and Y at the centre of a
+                        # DrawViewPart object, whereas the Drawing
+                        # toolbox measures X and Y at one corner of a
+                        # FeatureViewPart object.
+                        theview.X = self.xpos+imgcountxdo*depth\
+                                +imgcountxwo*width+gapcountxo*self.spacing
+                        theview.Y = self.ypos\
+                                +imgcountydo*depth+imgcountyho*height\
+                                +gapcounty*self.spacing
+                else:
+                        theview.ScaleType = u"Custom"
+                theview.Scale = self.scale
+                coarse = (getattr(self, "fidelity", "exact") == "coarse")
+                if(versionnumber < 0.19):
+                        theview.Rotation = rotationo
+                        theview.ShowHiddenLines = True
+                        theview.LineWidth = thick
+                        theview.HiddenWidth = thin
+
+                        # The Drawing toolbox has no polygonal
+                        # hidden-line removal, so the most that can be
+                        # done for a coarse view is to approximate
+                        # curves no more finely than will show.
+
+                        if (coarse):
+                                theview.Tolerance\
+                                        = line_width_tolerance(self.scale,
+                                                               thin)
+                        self.drawing_page.addObject(theview)
+                else:
+                        theview.Rotation = rotationn
+                        theview.HardHidden = True
+
+                        # A coarse view uses polygonal hidden-line
+                        # removal, which works from the triangulation
+                        # of the shape, so the shape is first
+                        # triangulated (once, however many views use
+                        # it) finely enough that the approximation
+                        # doesn't show at this scale.  What's been
+                        # triangulated is recorded by the shape's
+                        # fingerprint, not the feature's name, which
+                        # a scratch document reuses once it's been
+                        # cleared.
+
+                        if (coarse):
+                                tessellated = getattr(self, "tessellated",
+                                                      [])
+                                tessellation = (self.projectedfingerprint(),
+                                                line_width_tolerance(self.scale,
+                                                                     thin))
+                                if (tessellation not in tessellated):
+                                        featurepart.Shape.tessellate(
+                                                tessellation[1])
+                                        self.tessellated = tessellated\
+                                                +[tessellation]
+                                theview.CoarseView = True
+                        if (theview.ViewObject is not None):
+                                theview.ViewObject.LineWidth = thick
+                                theview.ViewObject.HiddenWidth = thin
+                        theview.Label = ""
+                        self.drawing_page.addView(theview)
+                        theview.X = self.xpos+imgcountxdn*depth\
+                                +imgcountxwn*width+gapcountxn*self.spacing
+                        theview.Y = float(self.drawing_page.Template.Height)\
+                                -self.ypos-(imgcountydn*depth
+                                            +imgcountyhn*height)\
+                                -gapcounty*self.spacing
+                return theview
+
+class add_first_angle_projection_symbol(eitherone):
+
+        # The purpose of this class is to provide the method
+        # "put_it_in", which adds the standard BS 8888:2011 symbol,
+        # indicating that a set of drawings are in first angle
+        # projection ("the symbol"), to an existing TechDraw::DrawPage
+        # or Drawing::FeaturePage object ("the sheet").  The method
+        # put_it_in also creates a new FreeCAD Document ("the dummy
+        # document"), unless a scratch_document is passed to the
+        # constructor to be used instead, containing various objects
+        # that are created as intermediate steps on the way to adding
+        # the symbol to the sheet, but which do not need to exist in
+        # the same document as the sheet.  The method put_it_in also
+        # modifies the parent document of the sheet, by adding to it
+        # two TechDraw::DrawViewPart or Drawing::FeatureViewPart
+        # objects, which are intermediate steps on the way to adding
+        # the symbol to the sheet, and which have to exist _in the
+        # same document as the sheet_ in order to add the symbol to
+        # the sheet.
+
+        def __init__(self, H_in, h_in, d_in, xpos_in, ypos_in,
+                     drawing_page_in, scratch_in=None, asset_in=False,
+                     fidelity_in="exact"):
+                self.H = H_in
+                self.h = h_in
+                self.d = d_in
+                self.xpos = xpos_in
+                self.ypos = ypos_in
+                self.drawing_page = drawing_page_in
+                self.scratch = scratch_in
+                self.asset = asset_in
+                self.fidelity = fidelity_in
+
+        @traced("symbol", lambda self, dummy: {"projection": "first"})
+        @releasing_scratch_on_failure
+        def put_it_in(self,dummy):
+                self.title = "first_angle_projection_symbol"
+                versionnumber = float(FreeCAD.Version()[0])\
+                        +0.01*float(FreeCAD.Version()[1])
+                if (self.asset):
+                        views = self.addsymbolasset(versionnumber, "first")
+                        self.viewsadded(views)
+                        return views
+                thick = 0.7 # The wider of the two line widths suggested in\
+                             # BS 8888:2011
+                thin = 0.35 # The narrower of the two line widths suggested\
+                            # in BS 8888:2011
+
+                # BS 8888:2011 does not specify the exact dimensions
+                # of the truncated cone, axonometric projections of
+                # which form the symbol, so those dimensions are taken
+                # from user input.
+
+                base_radius = 0.5*self.h
+                top_radius = 0.5*self.H
+                self.spacing = 3.0*self.d
+                depth = self.H
+                height = self.H
+                width = self.H
+                top_centre = FreeCAD.Vector(top_radius,0.0,top_radius)
+                depth_wise_direction = FreeCAD.Vector(0.0,1.0,0.0)
+                part = Part.makeCone(base_radius,top_radius,self.H,
+                                     top_centre,depth_wise_direction)
+                featurepart = self.scratchfeature(part)
+                self.scale = 1.0
+                
+                plusxview = self.addsingleview(versionnumber,
+                                               " from positive x",
+                                               featurepart,
+                                               FreeCAD.Vector(1.0,0.0,0.0),
+                                               width,depth,height,0.0,0.0,
+                                               0.0,0.0,0.0,0.0,0.5,
+                                               0.0,0.0,0.0,0.0,270.0,0.0,thick,
+                                               thin)
+                minusyview = self.addsingleview(versionnumber,
+                                                " from negative y",
+                                                featurepart,
+                                                FreeCAD.Vector(0.0,-1.0,0.0),
+                                                width,depth,height,1.0,0.0,
+                                                1.0,0.0,0.0,0.0,1.0,
+                                                0.5,1.0,0.0,0.0,90.0,0.0,thick,
+                                                thin)
+                recompute_unless_batched(self.drawing_page.Document,
+                                         self.releasescratch)
+                self.viewsadded([plusxview, minusyview])
+                return [plusxview, minusyview]
+
+class add_third_angle_projection_symbol(eitherone):
+
+        # The purpose of this class is to provide the method
+        # "put_it_in", which adds the standard BS 8888:2011 symbol,
+        # indicating that a set of drawings are in third angle
+        # projection ("the symbol"), to an existing TechDraw::DrawPage
+        # or Drawing::FeaturePage object ("the sheet").  The method
+        # put_it_in also creates a new FreeCAD Document ("the dummy
+        # document"), unless a scratch_document is passed to the
+        # constructor to be used instead, containing various objects
+        # that are created as intermediate steps on the way to adding
+        # the symbol to the sheet, but which do not need to exist in
+        # the same document as the sheet.  The method put_it_in also
+        # modifies the parent document of the sheet, by adding to it
+        # two TechDraw::DrawViewPart or Drawing::FeatureViewPart
+        # objects, which are intermediate steps on the way to adding
+        # the symbol to the sheet, and which have to exist _in the
+        # same document as the sheet_ in order to add the symbol to
+        # the sheet.
+
+        def __init__(self, H_in, h_in, d_in, xpos_in, ypos_in,
+                     drawing_page_in, scratch_in=None, asset_in=False,
+                     fidelity_in="exact"):
+                self.H = H_in
+                self.h = h_in
+                self.d = d_in
+                self.xpos = xpos_in
+                self.ypos = ypos_in
+                self.drawing_page = drawing_page_in
+                self.scratch = scratch_in
+                self.asset = asset_in
+                self.fidelity = fidelity_in
+
+        @traced("symbol", lambda self, dummy: {"projection": "third"})
+        @releasing_scratch_on_failure
+        def put_it_in(self,dummy):
+                self.title = "third_angle_projection_symbol"
+                versionnumber = float(FreeCAD.Version()[0])\
+                        +0.01*float(FreeCAD.Version()[1])
+                if (self.asset):
+                        views = self.addsymbolasset(versionnumber, "third")
+                        self.viewsadded(views)
+                        return views
+                thick = 0.7 # The wider of the two line widths suggested in\
+                             # BS 8888:2011
+                thin = 0.35 # The narrower of the two line widths suggested\
+                            # in BS 8888:2011
+
+                # BS 8888:2011 does not specify the exact dimensions
+                # of the truncated cone, axonometric projections of
+                # which form the symbol, so those dimensions are taken
+                # from user input.
+
+                base_radius = 0.5*self.h
+                top_radius = 0.5*self.H
+                self.spacing = 3.0*self.d
+                depth = self.H
+                height = self.H
+                width = self.H
+                top_centre = FreeCAD.Vector(top_radius,0.0,top_radius)
+                depth_wise_direction = FreeCAD.Vector(0.0,1.0,0.0)
+                part = Part.makeCone(base_radius,top_radius,self.H,
+                                     top_centre,depth_wise_direction)
+                featurepart = self.scratchfeature(part)
+                self.scale = 1.0
+                
+                plusxview = self.addsingleview(versionnumber,
+                                               " from positive x",
+                                               featurepart,
+                                               FreeCAD.Vector(1.0,0.0,0.0),
                                                width,depth,height,1.0,0.0,
                                                1.0,0.0,0.0,0.0,0.5,
                                                1.0,1.0,0.0,0.0,270.0,0.0,thick,
@@ -490,313 +2464,2605 @@ class add_third_angle_projection_symbol(eitherone):
                                                 0.0,0.0,0.0,0.0,0.0,
                                                 0.5,0.0,0.0,0.0,90.0,0.0,thick,
                                                 thin)
-                self.drawing_page.Document.recompute()
+                recompute_unless_batched(self.drawing_page.Document,
+                                         self.releasescratch)
+                self.viewsadded([plusxview, minusyview])
+                return [plusxview, minusyview]
+
+class first_angle_projection(eitherone):
+
+        # The purpose of this class is to provide the method "fap",
+        # which takes any object ("the shape") which can be assigned
+        # to the "Shape" property of a Part::Feature object, and adds
+        # a set of axonometric drawings ("the views") of the shape in
+        # first angle projection to an existing TechDraw::DrawPage or
+        # Drawing::FeaturePage object ("the sheet"), following the
+        # conventions in BS 8888:2011.  The method fap also creates a
+        # new FreeCAD Document ("the dummy document"), unless a
+        # scratch_document is passed to the constructor to be used
+        # instead, containing various objects that are created as
+        # intermediate steps on the way to adding the views to the
+        # sheet, but which do not need to exist in the same document
+        # as the sheet.  The method
+        # fap also modifies the parent document of the sheet, by
+        # adding to it six TechDraw::DrawViewPart or
+        # Drawing::FeatureViewPart objects, which are intermediate
+        # steps on the way to adding the views to the sheet, and which
+        # have to exist _in the same document as the sheet_ in order
+        # to add the views to the sheet.
+
+        def __init__(self, title_in, part_in, spacing_in, xpos_in, ypos_in,
+                     scale_in, drawing_page_in, scratch_in=None,
+                     cache_in=None, engine_in="hlr", fidelity_in="exact",
+                     simplify_in=None, dry_run_in=False):
+            self.title = title_in
+            self.part = part_in
+            self.spacing = spacing_in
+            self.xpos = xpos_in
+            self.ypos = ypos_in
+            self.scale = scale_in
+            self.drawing_page = drawing_page_in
+            self.scratch = scratch_in
+            self.cache = cache_in
+            self.engine = engine_in
+            self.fidelity = fidelity_in
+            self.simplify = simplify_in
+            self.dry_run = dry_run_in
+
+        @traced("part", lambda self, dummy: {"part": self.title,
+                                             "projection": "first"})
+        @releasing_scratch_on_failure
+        def fap(self,dummy):
+                if (self.dry_run):
+                        return self.planviews("first")
+                thick = 0.7 # The wider of the two line widths suggested in\
+                            # BS 8888:2011
+                thin = 0.35 # The narrower of the two line widths suggested\
+                            # in BS 8888:2011
+
+                # Measure the dimensions of the shape, in order to know how
+                # much space is needed on the sheet for the views.
+
+                boundbox = part_bound_box(self.part)
+                width = boundbox.XLength
+                depth = boundbox.YLength
+                height = boundbox.ZLength
+                featurepart = self.scratchfeature(self.projectedpart())
+                versionnumber = float(FreeCAD.Version()[0])\
+                        +0.01*float(FreeCAD.Version()[1])
+                minuszview = self.addsingleview(versionnumber,
+                                                " from negative z",
+                                                featurepart,
+                                                FreeCAD.Vector(0.0,0.0,-1.0),
+                                                width,depth,height,
+                                                1.0*self.scale,0.0*self.scale,
+                                                1.0,0.0*self.scale,
+                                                0.0*self.scale,0.0,
+                                                1.0*self.scale,
+                                                0.5*self.scale,1.0,
+                                                0.5*self.scale,
+                                                0.0*self.scale,180.0,0.0,thick,
+                                                thin)
+                minusxview = self.addsingleview(versionnumber,
+                                                " from negative x",
+                                                featurepart,
+                                                FreeCAD.Vector(-1.0,0.0,0.0),
+                                                width,depth,height,
+                                                2.0*self.scale,1.0*self.scale,
+                                                2.0,1.0*self.scale,
+                                                1.0*self.scale,1.0,
+                                                1.5*self.scale,
+                                                1.0*self.scale,2.0,
+                                                1.0*self.scale,
+                                                0.5*self.scale,90.0,0.0,thick,
+                                                thin)
+                minusyview = self.addsingleview(versionnumber,
+                                                " from negative y",
+                                                featurepart,
+                                                FreeCAD.Vector(0.0,-1.0,0.0),
+                                                width,depth,height,
+                                                1.0*self.scale,0.0*self.scale,
+                                                1.0,1.0*self.scale,
+                                                1.0*self.scale,1.0,
+                                                1.0*self.scale,
+                                                0.5*self.scale,1.0,
+                                                1.0*self.scale,
+                                                0.5*self.scale,90.0,0.0,thick,
+                                                thin)
+                plusxview = self.addsingleview(versionnumber,
+                                               " from positive x",
+                                               featurepart,
+                                               FreeCAD.Vector(1.0,0.0,0.0),
+                                               width,depth,height,
+                                               0.0*self.scale,0.0*self.scale,
+                                               0.0,1.0*self.scale,
+                                               1.0*self.scale,1.0,
+                                               0.5*self.scale,
+                                               0.0*self.scale,0.0,
+                                               1.0*self.scale,
+                                               0.5*self.scale,270.0,0.0,thick,
+                                               thin)
+                plusyview = self.addsingleview(versionnumber,
+                                               " from positive y",
+                                               featurepart,
+                                               FreeCAD.Vector(0.0,1.0,0.0),
+                                               width,depth,height,
+                                               2.0*self.scale,2.0*self.scale,
+                                               3.0,1.0*self.scale,
+                                               1.0*self.scale,1.0,
+                                               2.0*self.scale,
+                                               1.5*self.scale,3.0,
+                                               1.0*self.scale,
+                                               0.5*self.scale,270.0,0.0,thick,
+                                               thin)
+                pluszview = self.addsingleview(versionnumber,
+                                               " from positive z",
+                                               featurepart,
+                                               FreeCAD.Vector(0.0,0.0,1.0),
+                                               width,depth,height,
+                                               1.0*self.scale,0.0*self.scale,
+                                               1.0,2.0*self.scale,
+                                               1.0*self.scale,2.0,
+                                               1.0*self.scale,
+                                               0.5*self.scale,1.0,
+                                               1.5*self.scale,
+                                               1.0*self.scale,0.0,0.0,thick,
+                                               thin)
+                                               
+                                               
+                views = [minuszview, minusxview, minusyview, plusxview,
+                         plusyview, pluszview]
+
+                # The views are tagged before the recompute, because
+                # changing their properties afterwards would mark them
+                # as needing to be recomputed again.
+
+                self.tagviews(views, "first")
+                recompute_unless_batched(self.drawing_page.Document,
+                                         self.releasescratch)
+                self.viewsadded(views)
+                return views
+
+        def update_fap(self,dummy):
+
+                # Does the same as fap, unless the sheet already has up
+                # to date views of this part, in which case they're
+                # left alone; see updateviews.
+
+                return self.updateviews("first", self.fap)
+
+
+class third_angle_projection(eitherone):
+
+        # The purpose of this class is to provide the method "tap",
+        # which takes any object ("the shape") which can be assigned
+        # to the "Shape" property of a Part::Feature object, and adds
+        # a set of axonometric drawings ("the views") of the shape in
+        # third angle projection to an existing TechDraw::DrawPage or
+        # Drawing::FeaturePage object ("the sheet"), following the
+        # conventions in BS 8888:2011.  The method tap also creates a
+        # new FreeCAD Document ("the dummy document"), unless a
+        # scratch_document is passed to the constructor to be used
+        # instead, containing various objects that are created as
+        # intermediate steps on the way to adding the views to the
+        # sheet, but which do not need to exist in the same document
+        # as the sheet.  The method
+        # fap also modifies the parent document of the sheet, by
+        # adding to it six TechDraw::DrawViewPart or
+        # Drawing::FeatureViewPart objects, which are intermediate
+        # steps on the way to adding the views to the sheet, and which
+        # have to exist _in the same document as the sheet_ in order
+        # to add the views to the sheet.
+
+        def __init__(self, title_in, part_in, spacing_in, xpos_in, ypos_in,
+                     scale_in, drawing_page_in, scratch_in=None,
+                     cache_in=None, engine_in="hlr", fidelity_in="exact",
+                     simplify_in=None, dry_run_in=False):
+            self.title = title_in
+            self.part = part_in
+            self.spacing = spacing_in
+            self.xpos = xpos_in
+            self.ypos = ypos_in
+            self.scale = scale_in
+            self.drawing_page = drawing_page_in
+            self.scratch = scratch_in
+            self.cache = cache_in
+            self.engine = engine_in
+            self.fidelity = fidelity_in
+            self.simplify = simplify_in
+            self.dry_run = dry_run_in
+
+        @traced("part", lambda self, dummy: {"part": self.title,
+                                             "projection": "third"})
+        @releasing_scratch_on_failure
+        def tap(self,dummy):
+                if (self.dry_run):
+                        return self.planviews("third")
+                thick = 0.7 # The wider of the two line widths suggested in\
+                            # BS 8888:2011
+                thin = 0.35 # The narrower of the two line widths suggested\
+                            # in BS 8888:2011
+
+                # Measure the dimensions of the shape, in order to know how
+                # much space is needed on the sheet for the views.
+
+                boundbox = part_bound_box(self.part)
+                width = boundbox.XLength
+                depth = boundbox.YLength
+                height = boundbox.ZLength
+                featurepart = self.scratchfeature(self.projectedpart())
+                versionnumber = float(FreeCAD.Version()[0])\
+                        +0.01*float(FreeCAD.Version()[1])
+                minuszview = self.addsingleview(versionnumber,
+                                                " from negative z",
+                                                featurepart,
+                                                FreeCAD.Vector(0.0,0.0,-1.0),
+                                                width,depth,height,
+                                                1.0*self.scale,0.0*self.scale,
+                                                1.0,1.0*self.scale,
+                                                1.0*self.scale,2.0,
+                                                1.0*self.scale,
+                                                0.5*self.scale,1.0,
+                                                1.5*self.scale,
+                                                1.0*self.scale,180.0,0.0,thick,
+                                                thin)
+                minusxview = self.addsingleview(versionnumber,
+                                                " from negative x",
+                                                featurepart,
+                                                FreeCAD.Vector(-1.0,0.0,0.0),
+                                                width,depth,height,
+                                                1.0*self.scale,0.0*self.scale,
+                                                0.0,1.0*self.scale,
+                                                1.0*self.scale,1.0,
+                                                0.5*self.scale,
+                                                0.0*self.scale,0.0,
+                                                1.0*self.scale,
+                                                0.5*self.scale,
+                                                90.0,0.0,thick,
+                                                thin)
+                minusyview = self.addsingleview(versionnumber,
+                                                " from negative y",
+                                                featurepart,
+                                                FreeCAD.Vector(0.0,-1.0,0.0),
+                                                width,depth,height,
+                                                1.0*self.scale,0.0*self.scale,
+                                                1.0,1.0*self.scale,
+                                                1.0*self.scale,1.0,
+                                                1.0*self.scale,
+                                                0.5*self.scale,1.0,
+                                                1.0*self.scale,
+                                                0.5*self.scale,90.0,0.0,thick,
+                                                thin)
+                plusxview = self.addsingleview(versionnumber,
+                                               " from positive x",
+                                               featurepart,
+                                               FreeCAD.Vector(1.0,0.0,0.0),
+                                               width,depth,height,
+                                               1.0*self.scale,1.0*self.scale,
+                                               2.0,1.0*self.scale,
+                                               1.0*self.scale,1.0,
+                                               1.5*self.scale,
+                                               1.0*self.scale,2.0,
+                                               1.0*self.scale,
+                                               0.5*self.scale,
+                                               270.0,0.0,thick,
+                                               thin)
+                plusyview = self.addsingleview(versionnumber,
+                                               " from positive y",
+                                               featurepart,
+                                               FreeCAD.Vector(0.0,1.0,0.0),
+                                               width,depth,height,
+                                               2.0*self.scale,2.0*self.scale,
+                                               3.0,1.0*self.scale,
+                                               1.0*self.scale,1.0,
+                                               2.0*self.scale,
+                                               1.5*self.scale,3.0,
+                                               1.0*self.scale,
+                                               0.5*self.scale,270.0,0.0,thick,
+                                               thin)
+                pluszview = self.addsingleview(versionnumber,
+                                               " from positive z",
+                                               featurepart,
+                                               FreeCAD.Vector(0.0,0.0,1.0),
+                                               width,depth,height,
+                                               1.0*self.scale,0.0*self.scale,
+                                               1.0,1.0*self.scale,
+                                               0.0*self.scale,0.0,
+                                               1.0*self.scale,
+                                               0.5*self.scale,1.0,
+                                               0.5*self.scale,
+                                               0.0*self.scale,
+                                               0.0,0.0,thick,
+                                               thin)
+                                               
+                                               
+                views = [minuszview, minusxview, minusyview, plusxview,
+                         plusyview, pluszview]
+
+                # The views are tagged before the recompute, because
+                # changing their properties afterwards would mark them
+                # as needing to be recomputed again.
+
+                self.tagviews(views, "third")
+                recompute_unless_batched(self.drawing_page.Document,
+                                         self.releasescratch)
+                self.viewsadded(views)
+                return views
+
+        def update_tap(self,dummy):
+
+                # Does the same as tap, unless the sheet already has up
+                # to date views of this part, in which case they're
+                # left alone; see updateviews.
+
+                return self.updateviews("third", self.tap)
+
+# Sizes, in mm, of the ISO 216 sheets for which FreeCAD has ISO7200
+# templates, as (width, height) in landscape orientation; the margins
+# between the edges of the sheet and its frame in those templates (as
+# left, top, right, bottom); and the size of the title block in the
+# bottom right-hand corner of the frame, rounded up a little so that
+# views never touch it.
+
+sheet_sizes = {"A0": (1189.0, 841.0), "A1": (841.0, 594.0),
+               "A2": (594.0, 420.0), "A3": (420.0, 297.0),
+               "A4": (297.0, 210.0)}
+sheet_margins = (20.0, 10.0, 10.0, 10.0)
+title_block_size = (180.0, 60.0)
+
+def sheet_dimensions(pagesize, orientation):
+
+        # Returns the (width, height) in mm of a sheet of the given
+        # size and orientation, as named in create_eights_drawing_sheet.
+
+        width, height = sheet_sizes[pagesize]
+        if (orientation == "Portrait"):
+                return (height, width)
+        return (width, height)
+
+def projection_footprint(part, spacing, scale):
+
+        # Returns the (width, height) on the sheet, in mm, of the set
+        # of six views that fap or tap would draw of "part", measured
+        # rightwards and downwards from the (xpos, ypos) passed to
+        # them.  The arithmetic is that of the position coefficients
+        # passed to addsingleview: both projections have three columns
+        # of views (depth, width, depth and width across) separated by
+        # three gaps, and three rows (depth, height and depth down)
+        # separated by two gaps.  Only the bounding box of the part is
+        # used, so this is cheap enough to call before any hidden-line
+        # removal.
+
+        boundbox = part_bound_box(part)
+        width = boundbox.XLength
+        depth = boundbox.YLength
+        height = boundbox.ZLength
+        return (2.0*scale*(depth+width)+3.0*spacing,
+                scale*(2.0*depth+height)+2.0*spacing)
+
+def symbol_footprint(H, d, xpos, ypos):
+
+        # Returns the rectangle (x, y, width, height) on the sheet, in
+        # mm, occupied by a projection symbol with the given large
+        # diameter, spacing and position, as drawn by put_it_in.
+
+        return (xpos, ypos-0.5*H, 2.0*H+3.0*d, H)
+
+def symbol_position(pagesize, orientation, H, d, gap=5.0):
+
+        # Returns an (xpos, ypos) for a projection symbol with the given
+        # large diameter and spacing, which puts it just to the left of
+        # the title block, level with the bottom of the frame, as in
+        # EXAMPLES/Two_parts.py, or, if there isn't room for it there
+        # (on an A4 portrait sheet, say, whose title block takes up
+        # the whole width of the frame), just above the right-hand end
+        # of the title block.
+
+        sheetwidth, sheetheight = sheet_dimensions(pagesize, orientation)
+        xpos = sheetwidth-sheet_margins[2]-title_block_size[0]-gap\
+                -(2.0*H+3.0*d)
+        if (xpos >= sheet_margins[0]+gap):
+                return (xpos, sheetheight-sheet_margins[3]-gap-0.5*H)
+        return (sheetwidth-sheet_margins[2]-gap-(2.0*H+3.0*d),
+                sheetheight-sheet_margins[3]-title_block_size[1]-gap
+                -0.5*H)
+
+class lay_out_projections:
+
+        # The purpose of this class is to provide the method
+        # "lay_them_out", which chooses an (xpos, ypos) for each of a
+        # list of parts, to pass to fap or tap, such that the sets of
+        # views of the parts don't overlap each other, the title block,
+        # the projection symbol or any other reserved rectangle, and
+        # stay within the frame of the sheet.  The parts are given as a
+        # list of (part, spacing, scale) tuples; the symbol, if any, as
+        # an (H, d, xpos, ypos) tuple as passed to
+        # add_first_angle_projection_symbol; and any other reserved
+        # areas as a list of (x, y, width, height) rectangles.  gap is
+        # the clear space, in mm, to leave between neighbouring sets of
+        # views.
+
+        # The packing is greedy: the parts are taken largest first,
+        # and each is put in the topmost (and then leftmost) position
+        # where it fits, the candidate positions being the top left
+        # corner of the frame and the points just to the right of, and
+        # just below, everything already placed.  (This is the usual
+        # "bottom-left" heuristic, turned upside down because ypos is
+        # measured down from the top of the sheet.)
+
+        def __init__(self, pagesize_in, orientation_in, parts_in,
+                     symbol_in=None, reserved_in=None, gap_in=10.0):
+                self.pagesize = pagesize_in
+                self.orientation = orientation_in
+                self.parts = parts_in
+                self.symbol = symbol_in
+                self.reserved = reserved_in
+                self.gap = gap_in
+
+        def lay_them_out(self,dummy):
+
+                # Returns a list with one entry per part, in the order
+                # given: either the (xpos, ypos) chosen for the part, or
+                # None if it couldn't be fitted onto the sheet.
+
+                sheetwidth, sheetheight\
+                        = sheet_dimensions(self.pagesize, self.orientation)
+                left = sheet_margins[0]+self.gap
+                top = sheet_margins[1]+self.gap
+                right = sheetwidth-sheet_margins[2]-self.gap
+                bottom = sheetheight-sheet_margins[3]-self.gap
+                obstacles = [(sheetwidth-sheet_margins[2]-title_block_size[0],
+                              sheetheight-sheet_margins[3]
+                              -title_block_size[1],
+                              title_block_size[0], title_block_size[1])]
+                if (self.symbol is not None):
+                        obstacles.append(symbol_footprint(*self.symbol))
+                if (self.reserved is not None):
+                        obstacles = obstacles+list(self.reserved)
+
+                # Obstacles are grown by the gap all round, so that
+                # the test for overlap can be a plain one.
+
+                occupied = [(x-self.gap, y-self.gap, w+2.0*self.gap,
+                             h+2.0*self.gap) for (x, y, w, h) in obstacles]
+                footprints = [projection_footprint(part, spacing, scale)
+                              for (part, spacing, scale) in self.parts]
+                order = sorted(range(len(footprints)),
+                               key=lambda i: (-footprints[i][1],
+                                              -footprints[i][0]))
+                positions = [None]*len(footprints)
+                xs = [left]
+                ys = [top]
+                for x, y, w, h in occupied:
+                        xs.append(x+w)
+                        ys.append(y+h)
+                for i in order:
+                        w, h = footprints[i]
+                        best = None
+                        for y in sorted(set(ys)):
+                                if (y+h > bottom):
+                                        break
+                                for x in sorted(set(xs)):
+                                        if (x+w > right):
+                                                break
+                                        if (x < left or y < top):
+                                                continue
+                                        if (not self.overlaps((x, y, w, h),
+                                                              occupied)):
+                                                best = (x, y)
+                                                break
+                                if (best is not None):
+                                        break
+                        if (best is None):
+                                continue
+                        positions[i] = best
+                        occupied.append((best[0]-self.gap, best[1]-self.gap,
+                                         w+2.0*self.gap, h+2.0*self.gap))
+                        xs.append(best[0]+w+self.gap)
+                        ys.append(best[1]+h+self.gap)
+                return positions
+
+        def overlaps(self, rectangle, others):
+                x, y, w, h = rectangle
+                for ox, oy, ow, oh in others:
+                        if (x < ox+ow and ox < x+w and y < oy+oh
+                            and oy < y+h):
+                                return True
+                return False
+
+# The positions of the views of the parts drawn by fap and tap,
+# relative to the (xpos, ypos) passed to them, in units of the
+# part's scaled depth and width (across) and depth and height (down),
+# and of the spacing: for each view, its legend, view direction, the
+# coefficients of the position of its centre (the same as fap and tap
+# pass to addsingleview for TechDraw), the coefficients of the
+# position of its corner (as passed for the Drawing toolbox, whose
+# vertical gap count is the same as TechDraw's), and its rotation in
+# the Drawing toolbox and in TechDraw.
+
+projection_view_coefficients = {
+        "first": [(" from negative z", (0.0, 0.0, -1.0),
+                   1.0, 0.5, 1.0, 0.5, 0.0, 0.0,
+                   1.0, 0.0, 1.0, 0.0, 0.0,
+                   180.0, 0.0),
+                  (" from negative x", (-1.0, 0.0, 0.0),
+                   1.5, 1.0, 2.0, 1.0, 0.5, 1.0,
+                   2.0, 1.0, 2.0, 1.0, 1.0,
+                   90.0, 0.0),
+                  (" from negative y", (0.0, -1.0, 0.0),
+                   1.0, 0.5, 1.0, 1.0, 0.5, 1.0,
+                   1.0, 0.0, 1.0, 1.0, 1.0,
+                   90.0, 0.0),
+                  (" from positive x", (1.0, 0.0, 0.0),
+                   0.5, 0.0, 0.0, 1.0, 0.5, 1.0,
+                   0.0, 0.0, 0.0, 1.0, 1.0,
+                   270.0, 0.0),
+                  (" from positive y", (0.0, 1.0, 0.0),
+                   2.0, 1.5, 3.0, 1.0, 0.5, 1.0,
+                   2.0, 2.0, 3.0, 1.0, 1.0,
+                   270.0, 0.0),
+                  (" from positive z", (0.0, 0.0, 1.0),
+                   1.0, 0.5, 1.0, 1.5, 1.0, 2.0,
+                   1.0, 0.0, 1.0, 2.0, 1.0,
+                   0.0, 0.0)],
+        "third": [(" from negative z", (0.0, 0.0, -1.0),
+                   1.0, 0.5, 1.0, 1.5, 1.0, 2.0,
+                   1.0, 0.0, 1.0, 1.0, 1.0,
+                   180.0, 0.0),
+                  (" from negative x", (-1.0, 0.0, 0.0),
+                   0.5, 0.0, 0.0, 1.0, 0.5, 1.0,
+                   1.0, 0.0, 0.0, 1.0, 1.0,
+                   90.0, 0.0),
+                  (" from negative y", (0.0, -1.0, 0.0),
+                   1.0, 0.5, 1.0, 1.0, 0.5, 1.0,
+                   1.0, 0.0, 1.0, 1.0, 1.0,
+                   90.0, 0.0),
+                  (" from positive x", (1.0, 0.0, 0.0),
+                   1.5, 1.0, 2.0, 1.0, 0.5, 1.0,
+                   1.0, 1.0, 2.0, 1.0, 1.0,
+                   270.0, 0.0),
+                  (" from positive y", (0.0, 1.0, 0.0),
+                   2.0, 1.5, 3.0, 1.0, 0.5, 1.0,
+                   2.0, 2.0, 3.0, 1.0, 1.0,
+                   270.0, 0.0),
+                  (" from positive z", (0.0, 0.0, 1.0),
+                   1.0, 0.5, 1.0, 0.5, 0.0, 0.0,
+                   1.0, 0.0, 1.0, 1.0, 0.0,
+                   0.0, 0.0)]}
+
+def view_rectangle(viewdirection, width, depth, height, scale, centrex,
+                   centrey):
+
+        # Returns the rectangle (x, y, width, height) on the sheet, in
+        # mm from its top left corner, occupied by a view, from
+        # viewdirection (any object with x, y and z members, or a
+        # tuple), of a part with the given bounding box dimensions,
+        # whose centre is at (centrex, centrey).  A view along x shows
+        # the part's depth across and height down; along y, width
+        # across and height down; along z, width across and depth
+        # down.
+
+        if (abs(viewdirection[0]) > 0.5):
+                across = scale*depth
+        else:
+                across = scale*width
+        if (abs(viewdirection[2]) > 0.5):
+                down = scale*depth
+        else:
+                down = scale*height
+        return (centrex-0.5*across, centrey-0.5*down, across, down)
+
+def projection_view_rectangles(part, spacing, xpos, ypos, scale,
+                               projection="first"):
+
+        # Returns a list of (legend, rectangle) pairs, one for each of
+        # the six views that fap ("first") or tap ("third") would add
+        # for "part", working only from its bounding box, so without
+        # any hidden-line removal.
+
+        boundbox = part_bound_box(part)
+        width = boundbox.XLength
+        depth = boundbox.YLength
+        height = boundbox.ZLength
+        rectangles = []
+        for legend, direction, xd, xw, gx, yd, yh, gy, xdo, xwo, gxo, ydo,\
+            yho, rotationo, rotationn\
+            in projection_view_coefficients[projection]:
+                rectangles.append((legend,
+                                   view_rectangle(direction, width, depth,
+                                                  height, scale,
+                                                  xpos+scale*(xd*depth
+                                                              +xw*width)
+                                                  +gx*spacing,
+                                                  ypos+scale*(yd*depth
+                                                              +yh*height)
+                                                  +gy*spacing)))
+        return rectangles
+
+class planned_part:
+
+        # A stand-in for a shape of which only the bounding box is
+        # known (width, depth and height being its extents in x, y and
+        # z), which the planning functions (projection_footprint,
+        # lay_out_projections, paginate_projections,
+        # projection_view_rectangles and plan_projection_views) accept
+        # in place of the shape itself, so that sheets can be planned
+        # without FreeCAD.  It is its own BoundBox.
+
+        def __init__(self, width_in, depth_in, height_in):
+                self.XLength = float(width_in)
+                self.YLength = float(depth_in)
+                self.ZLength = float(height_in)
+                self.BoundBox = self
+
+def plan_projection_views(part, spacing, xpos, ypos, scale,
+                          projection="first", sheetheight=None):
+
+        # Returns, as plain data (ready for json.dumps), where fap
+        # ("first") or tap ("third") would put each of the six views
+        # of "part", working only from its bounding box: a list with,
+        # for each view, its "legend", view "direction", the "centre"
+        # and "rectangle" it occupies (in mm from the top left corner
+        # of the sheet, as in view_index), and the "X", "Y" and
+        # "Rotation" properties it would be given by the Drawing
+        # toolbox ("drawing") and by TechDraw ("techdraw").  TechDraw
+        # measures Y up from the bottom of the sheet, so its "Y" is
+        # given only if "sheetheight" is.
+
+        boundbox = part_bound_box(part)
+        width = boundbox.XLength
+        depth = boundbox.YLength
+        height = boundbox.ZLength
+        views = []
+        for legend, direction, xd, xw, gx, yd, yh, gy, xdo, xwo, gxo, ydo,\
+            yho, rotationo, rotationn\
+            in projection_view_coefficients[projection]:
+                centrex = xpos+scale*(xd*depth+xw*width)+gx*spacing
+                centrey = ypos+scale*(yd*depth+yh*height)+gy*spacing
+                techdraw = {"X": centrex, "Rotation": rotationn}
+                if (sheetheight is not None):
+                        techdraw["Y"] = sheetheight-centrey
+                views.append({"legend": legend.strip(),
+                              "direction": list(direction),
+                              "centre": [centrex, centrey],
+                              "rectangle": list(view_rectangle(direction,
+                                                               width, depth,
+                                                               height, scale,
+                                                               centrex,
+                                                               centrey)),
+                              "drawing": {"X": xpos+scale*(xdo*depth
+                                                           +xwo*width)
+                                          +gxo*spacing,
+                                          "Y": ypos+scale*(ydo*depth
+                                                           +yho*height)
+                                          +gy*spacing,
+                                          "Rotation": rotationo},
+                              "techdraw": techdraw})
+        return views
+
+class view_index:
+
+        # A spatial index of the rectangles occupied by the views on
+        # one sheet, in mm from the top left corner of the sheet.
+        # Each rectangle is filed under every cell of a square grid
+        # (of side cell_in mm) that it overlaps, so finding what
+        # overlaps a given rectangle only means looking at the few
+        # rectangles in the cells it covers.  Each rectangle has a
+        # label, which for views added by eights is a (part title,
+        # view legend) pair.
+
+        def __init__(self, cell_in=50.0):
+                self.cell = cell_in
+                self.entries = {}
+                self.cells = {}
+                self.count = 0
+
+        def cells_of(self, rectangle):
+                x, y, w, h = rectangle
+                firsti = int(math.floor(x/self.cell))
+                firstj = int(math.floor(y/self.cell))
+                lasti = int(math.floor((x+w)/self.cell))
+                lastj = int(math.floor((y+h)/self.cell))
+                return [(i, j) for i in range(firsti, lasti+1)
+                        for j in range(firstj, lastj+1)]
+
+        def add(self, rectangle, label):
+
+                # Adds a rectangle, and returns a key by which it can
+                # be removed.
+
+                self.count = self.count+1
+                key = self.count
+                self.entries[key] = (tuple(rectangle), label)
+                for thecell in self.cells_of(rectangle):
+                        self.cells.setdefault(thecell, []).append(key)
+                return key
+
+        def remove(self, key):
+                rectangle, label = self.entries.pop(key)
+                for thecell in self.cells_of(rectangle):
+                        self.cells[thecell].remove(key)
+
+        def remove_part(self, title):
+
+                # Removes the rectangles of every view of the part
+                # with the given title.
+
+                for key in [key for key, (rectangle, label)
+                            in self.entries.items()
+                            if (isinstance(label, tuple)
+                                and (label[0] == title))]:
+                        self.remove(key)
+
+        def query(self, rectangle):
+
+                # Returns the (rectangle, label) pairs of the
+                # rectangles that overlap "rectangle" (just touching
+                # doesn't count).
+
+                x, y, w, h = rectangle
+                keys = set()
+                for thecell in self.cells_of(rectangle):
+                        keys.update(self.cells.get(thecell, []))
+                found = []
+                for key in sorted(keys):
+                        other, label = self.entries[key]
+                        ox, oy, ow, oh = other
+                        if (x < ox+ow and ox < x+w and y < oy+oh
+                            and oy < y+h):
+                                found.append((other, label))
+                return found
+
+        def problems(self, sheetwidth, sheetheight, rectangles=None):
+
+                # Returns a list of the problems with the rectangles in
+                # the index (or, if "rectangles" is given as a list of
+                # (rectangle, label) pairs, with those, checked against
+                # each other and against the index): pairs of
+                # rectangles that overlap, and rectangles that stick
+                # out of the frame of a sheet of the given size or into
+                # its title block.  Each problem is a dict with a
+                # "problem" member ("overlap", "outside frame" or
+                # "title block") and a "labels" member.
+
+                if (rectangles is None):
+                        rectangles = [self.entries[key]
+                                      for key in sorted(self.entries)]
+                        checked = view_index(self.cell)
+                else:
+                        checked = self.copy_it('putanyoldrubbishhere')
+                left = sheet_margins[0]
+                top = sheet_margins[1]
+                right = sheetwidth-sheet_margins[2]
+                bottom = sheetheight-sheet_margins[3]
+                titleblock = (right-title_block_size[0],
+                              bottom-title_block_size[1],
+                              title_block_size[0], title_block_size[1])
+                found = []
+                for rectangle, label in rectangles:
+                        x, y, w, h = rectangle
+                        if (x < left or y < top or x+w > right
+                            or y+h > bottom):
+                                found.append({"problem": "outside frame",
+                                              "labels": [label]})
+                        elif (x < titleblock[0]+titleblock[2]
+                              and titleblock[0] < x+w
+                              and y < titleblock[1]+titleblock[3]
+                              and titleblock[1] < y+h):
+                                found.append({"problem": "title block",
+                                              "labels": [label]})
+                        for other, otherlabel in checked.query(rectangle):
+                                found.append({"problem": "overlap",
+                                              "labels": [otherlabel, label]})
+                        checked.add(rectangle, label)
+                return found
+
+        def copy_it(self,dummy):
+                thecopy = view_index(self.cell)
+                for key in sorted(self.entries):
+                        thecopy.add(*self.entries[key])
+                return thecopy
+
+# The sheet itself and its view_index, for each sheet, keyed by the
+# names of its document and of the sheet; see view_index_of.
+
+view_indexes = {}
+
+def forget_closed_documents(table):
+
+        # Drops from "table", a dict keyed by tuples whose first member
+        # is a document name, the entries for documents that are no
+        # longer open, so that tables like view_indexes don't grow
+        # without bound in a long-running process (eights_server, say)
+        # that keeps opening and closing documents.
+
+        opennames = FreeCAD.listDocuments()
+        for key in list(table):
+                if (key[0] not in opennames):
+                        del table[key]
+
+def view_index_of(thesheet):
+
+        # Returns the view_index holding the views that eights has
+        # added to "thesheet" in this session (made empty the first
+        # time it's asked for).  Document and sheet names get reused
+        # (build_eights_sheet always makes a document named "eights",
+        # for instance), so an entry is only used if it was made for
+        # this very sheet object; a new sheet of the same name in a
+        # new document of the same name starts with an empty index.
+
+        key = (thesheet.Document.Name, thesheet.Name)
+        entry = view_indexes.get(key)
+        if ((entry is None) or (entry[0] is not thesheet)):
+                forget_closed_documents(view_indexes)
+                entry = (thesheet, view_index())
+                view_indexes[key] = entry
+        return entry[1]
+
+def sheet_size_of(thesheet):
+
+        # Returns the (width, height) in mm of "thesheet", from its
+        # template.
+
+        versionnumber = float(FreeCAD.Version()[0])\
+                +0.01*float(FreeCAD.Version()[1])
+        if (versionnumber >= 0.19):
+                return (float(thesheet.Template.Width),
+                        float(thesheet.Template.Height))
+        pagesize, orientation\
+                = os.path.basename(thesheet.Template).split("_")[0:2]
+        return sheet_dimensions(pagesize, orientation)
+
+def check_projections(thesheet, parts):
+
+        # The validation pass: returns the problems (as for
+        # view_index.problems) that there would be if the sets of views
+        # of "parts" were added to "thesheet", along with the views
+        # already on it, working only from bounding boxes, so before
+        # any hidden-line removal.  "parts" is a list of (title, part,
+        # spacing, xpos, ypos, scale, projection) tuples, "projection"
+        # being "first" or "third".
+
+        planned = []
+        for title, part, spacing, xpos, ypos, scale, projection in parts:
+                for legend, rectangle\
+                    in projection_view_rectangles(part, spacing, xpos, ypos,
+                                                  scale, projection):
+                        planned.append((rectangle, (title, legend)))
+        sheetwidth, sheetheight = sheet_size_of(thesheet)
+        return view_index_of(thesheet).problems(sheetwidth, sheetheight,
+                                                planned)
+
+def plan_sheet(pagesize, orientation, parts, projection="first",
+               symbol=None):
+
+        # Returns, as plain data (ready for json.dumps), the plan of
+        # one sheet: its size, the position of the projection symbol
+        # (given, if any, as an (H, d, xpos, ypos) tuple, as for
+        # lay_out_projections), the position, footprint and views (see
+        # plan_projection_views) of each part, and the problems (as
+        # for view_index.problems) there would be with them.  "parts"
+        # is a list of (title, part, spacing, xpos, ypos, scale)
+        # tuples.  Nothing here needs FreeCAD.
+
+        sheetwidth, sheetheight = sheet_dimensions(pagesize, orientation)
+        index = view_index()
+        plan = {"pagesize": pagesize, "orientation": orientation,
+                "width": sheetwidth, "height": sheetheight,
+                "symbol": None, "parts": []}
+        if (symbol is not None):
+                H, d, symbolxpos, symbolypos = symbol
+                plan["symbol"] = {"xpos": symbolxpos, "ypos": symbolypos,
+                                  "rectangle": list(symbol_footprint(H, d,
+                                                                     symbolxpos,
+                                                                     symbolypos))}
+                index.add(plan["symbol"]["rectangle"],
+                          ("%s_angle_projection_symbol" % projection,
+                           " symbol"))
+        for title, part, spacing, xpos, ypos, scale in parts:
+                views = plan_projection_views(part, spacing, xpos, ypos,
+                                              scale, projection, sheetheight)
+                for view in views:
+                        index.add(view["rectangle"],
+                                  (title, " "+view["legend"]))
+                plan["parts"].append({"partnum": title, "xpos": xpos,
+                                      "ypos": ypos, "scale": scale,
+                                      "footprint":
+                                      list(projection_footprint(part,
+                                                                spacing,
+                                                                scale)),
+                                      "views": views})
+        plan["problems"] = index.problems(sheetwidth, sheetheight)
+        return plan
+
+def paginate_projections(pagesize, orientation, parts, symbol=None,
+                         gap=10.0):
+
+        # Shares the sets of views of a list of parts, given as for
+        # lay_out_projections, between as many sheets as are needed,
+        # each sheet being packed by lay_out_projections (with the
+        # projection symbol, if any, on every sheet).  Returns a list
+        # with one entry per sheet, each a list of (index, (xpos,
+        # ypos)) pairs, "index" being the position of the part in
+        # "parts".  Raises ValueError if some part won't fit even on a
+        # sheet of its own.
+
+        remaining = list(range(len(parts)))
+        sheets = []
+        while (remaining):
+                layout = lay_out_projections(pagesize, orientation,
+                                             [parts[i] for i in remaining],
+                                             symbol, None, gap)
+                positions = layout.lay_them_out('putanyoldrubbishhere')
+                placed = [(i, position) for i, position
+                          in zip(remaining, positions)
+                          if (position is not None)]
+                if (not placed):
+                        raise ValueError("part %d is too big for an %s "
+                                         "%s sheet" % (remaining[0],
+                                                       pagesize,
+                                                       orientation))
+                sheets.append(placed)
+                remaining = [i for i, position in zip(remaining, positions)
+                             if (position is None)]
+        return sheets
+
+class create_eights_sheet_set:
+
+        # The purpose of this class is to provide the method
+        # "build_them", which adds to an existing FreeCAD document as
+        # many drawing sheets as are needed to hold the sets of views
+        # of an arbitrary number of parts, lays the parts out on them
+        # (see paginate_projections), numbers the sheets consistently
+        # ("sheet n / total" in each title block), lists in each title
+        # block only the parts on that sheet, adds the projection
+        # symbol to each sheet, and draws every part, recomputing the
+        # document only once at the end.  The title block fields are
+        # as for create_eights_drawing_sheet, except that sheetnum,
+        # totalsheets and partlist are worked out here.  parts_in is a
+        # list of (partnum, shape, spacing) tuples, optionally with a
+        # fourth member giving the scale of that part (by default, the
+        # reciprocal of inverse_scale_in); projection_in is "first" or
+        # "third"; and symbol_in, if not None, is a (H, h, d) tuple as
+        # passed to add_first_angle_projection_symbol, optionally with
+        # a fourth member saying whether to draw the symbol from the
+        # ready-made SVG asset (by default, True).
+
+        def __init__(self, document_in, shorttitle_in, pagesize_in,
+                     orientation_in, creator_in, longtitle_in, legalowner_in,
+                     approver_in, doctype_in, docstatus_in, inverse_scale_in,
+                     drawingnum_in, year_in, month_in, day_in, revision_in,
+                     parts_in, projection_in="first", symbol_in=None,
+                     scratch_in=None, cache_in=None, fidelity_in="exact",
+                     simplify_in=None, dry_run_in=False):
+                self.document = document_in
+                self.shorttitle = shorttitle_in
+                self.pagesize = pagesize_in
+                self.orientation = orientation_in
+                self.creator = creator_in
+                self.longtitle = longtitle_in
+                self.legalowner = legalowner_in
+                self.approver = approver_in
+                self.doctype = doctype_in
+                self.docstatus = docstatus_in
+                self.inverse_scale = inverse_scale_in
+                self.drawingnum = drawingnum_in
+                self.year = year_in
+                self.month = month_in
+                self.day = day_in
+                self.revision = revision_in
+                self.parts = parts_in
+                self.projection = projection_in
+                self.symbol = symbol_in
+                self.scratch = scratch_in
+                self.cache = cache_in
+                self.fidelity = fidelity_in
+                self.simplify = simplify_in
+                self.dry_run = dry_run_in
+
+        def lay_them_out(self,dummy):
+
+                # Returns the parts as (shape, spacing, scale) tuples,
+                # the place of the symbol (as an (H, d, xpos, ypos)
+                # tuple, or None), and the placements of the parts on
+                # each sheet, as returned by paginate_projections.
+
+                scale = 1.0/self.inverse_scale
+                parts = []
+                for thepart in self.parts:
+                        if (len(thepart) > 3):
+                                parts.append((thepart[1], thepart[2],
+                                              thepart[3]))
+                        else:
+                                parts.append((thepart[1], thepart[2], scale))
+                symbolplace = None
+                if (self.symbol is not None):
+                        H, h, d = self.symbol[0:3]
+                        symbolxpos, symbolypos\
+                                = symbol_position(self.pagesize,
+                                                  self.orientation, H, d)
+                        symbolplace = (H, d, symbolxpos, symbolypos)
+                placements = paginate_projections(self.pagesize,
+                                                  self.orientation, parts,
+                                                  symbolplace)
+                return (parts, symbolplace, placements)
+
+        def plan_them(self,dummy):
+
+                # Returns the plan of each sheet (see plan_sheet) that
+                # build_them would make, with its "sheetnum",
+                # "totalsheets" and "partlist", without making any.
+
+                parts, symbolplace, placements\
+                        = self.lay_them_out('putanyoldrubbishhere')
+                plans = []
+                for sheetnum, placed in enumerate(placements):
+                        plan = plan_sheet(self.pagesize, self.orientation,
+                                          [(self.parts[i][0], parts[i][0],
+                                            parts[i][1], position[0],
+                                            position[1], parts[i][2])
+                                           for i, position in placed],
+                                          self.projection, symbolplace)
+                        plan["sheetnum"] = sheetnum+1
+                        plan["totalsheets"] = len(placements)
+                        plan["partlist"] = ",".join([self.parts[i][0]
+                                                     for i, position
+                                                     in placed])
+                        plans.append(plan)
+                return plans
+
+        def build_them(self,dummy):
+
+                # Returns the list of sheets, in order, or, if the
+                # object was made with dry_run_in set, their plans
+                # (see plan_them).
+
+                if (self.dry_run):
+                        return self.plan_them('putanyoldrubbishhere')
+                parts, symbolplace, placements\
+                        = self.lay_them_out('putanyoldrubbishhere')
+                if (self.symbol is not None):
+                        H, h, d = self.symbol[0:3]
+                        symbolxpos, symbolypos = symbolplace[2:4]
+                if (self.projection == "third"):
+                        symbolclass = add_third_angle_projection_symbol
+                        partclass = third_angle_projection
+                else:
+                        symbolclass = add_first_angle_projection_symbol
+                        partclass = first_angle_projection
+                scratch = self.scratch
+                if (scratch is None):
+                        scratch = scratch_document()
+                sheets = []
+                with batch(self.document):
+                        for sheetnum, placed in enumerate(placements):
+                                partlist = ",".join([self.parts[i][0]
+                                                     for i, position
+                                                     in placed])
+                                page_creator = create_eights_drawing_sheet(
+                                        self.document, self.shorttitle,
+                                        self.pagesize, self.orientation,
+                                        self.creator, self.longtitle,
+                                        self.legalowner, self.approver,
+                                        self.doctype, self.docstatus,
+                                        sheetnum+1, len(placements),
+                                        self.inverse_scale, partlist,
+                                        self.drawingnum, self.year,
+                                        self.month, self.day, self.revision)
+                                thepage\
+                                        = page_creator.create_it('putanyoldrubbishhere')
+                                if (self.symbol is not None):
+                                        asset = True
+                                        if (len(self.symbol) > 3):
+                                                asset = self.symbol[3]
+                                        symbol_adder = symbolclass(
+                                                H, h, d, symbolxpos,
+                                                symbolypos, thepage, scratch,
+                                                asset, self.fidelity)
+                                        symbol_adder.put_it_in('putanyoldrubbishhere')
+                                for i, position in placed:
+                                        drawings_adder = partclass(
+                                                self.parts[i][0], parts[i][0],
+                                                parts[i][1], position[0],
+                                                position[1], parts[i][2],
+                                                thepage, scratch, self.cache,
+                                                "hlr", self.fidelity,
+                                                self.simplify)
+                                        if (self.projection == "third"):
+                                                drawings_adder.tap('putanyoldrubbishhere')
+                                        else:
+                                                drawings_adder.fap('putanyoldrubbishhere')
+                                sheets.append(thepage)
+                if (self.scratch is None):
+                        scratch.release_it('putanyoldrubbishhere')
+                return sheets
+
+class export_eights_drawing_sheet:
+
+        # The purpose of this class is to provide the methods
+        # "write_svg" and "write_pdf", which write a finished
+        # TechDraw::DrawPage or Drawing::FeaturePage object ("the
+        # sheet") - template, title block, symbol and all views - to
+        # an SVG or PDF file, without needing the FreeCAD GUI.  The
+        # sheet should have been recomputed first (which is the case
+        # once create_it, put_it_in, fap or tap, or an enclosing
+        # batch, has finished).
+
+        def __init__(self, drawing_page_in):
+                self.drawing_page = drawing_page_in
+
+        def write_svg(self, filename):
+                versionnumber = float(FreeCAD.Version()[0])\
+                        +0.01*float(FreeCAD.Version()[1])
+                if (versionnumber < 0.19):
+
+                        # A Drawing::FeaturePage keeps the fully
+                        # rendered sheet, title block and views
+                        # included, in the file named by its
+                        # PageResult property.
+
+                        shutil.copyfile(self.drawing_page.PageResult,
+                                        filename)
+                        return
+
+                # TechDraw keeps the rendered template (with the title
+                # block filled in) in the PageResult file of the
+                # template object, and can write the views on their
+                # own with writeSVGPage; the two are combined here,
+                # with the views as a group on top of the template.
+
+                import xml.etree.ElementTree as ElementTree
+                for (prefix, uri) in\
+                    (("", "http://www.w3.org/2000/svg"),
+                     ("xlink", "http://www.w3.org/1999/xlink"),
+                     ("freecad", "http://www.freecadweb.org/wiki/index.php?"
+                      "title=Svg_Namespace"),
+                     ("sodipodi", "http://sodipodi.sourceforge.net/DTD/"
+                      "sodipodi-0.dtd"),
+                     ("inkscape", "http://www.inkscape.org/namespaces/"
+                      "inkscape")):
+                        ElementTree.register_namespace(prefix, uri)
+                sheet = ElementTree.parse(self.drawing_page.Template.PageResult)
+                (handle, viewsfile) = tempfile.mkstemp(suffix=".svg")
+                os.close(handle)
+                try:
+                        TechDraw.writeSVGPage(self.drawing_page, viewsfile)
+                        views = ElementTree.parse(viewsfile).getroot()
+                finally:
+                        os.remove(viewsfile)
+                group = ElementTree.SubElement(sheet.getroot(),
+                                               "{http://www.w3.org/2000/svg}g",
+                                               {"id": "eights_views"})
+                for element in list(views):
+                        group.append(element)
+                sheet.write(filename, encoding="utf-8", xml_declaration=True)
+
+        def write_pdf(self, filename):
+
+                # The sheet is written as SVG, then converted to PDF,
+                # using the cairosvg Python package if it's installed,
+                # and otherwise whichever of the rsvg-convert or
+                # Inkscape command-line programs can be found.
+
+                (handle, svgfile) = tempfile.mkstemp(suffix=".svg")
+                os.close(handle)
+                try:
+                        self.write_svg(svgfile)
+                        try:
+                                import cairosvg
+                        except ImportError:
+                                cairosvg = None
+                        if (cairosvg is not None):
+                                cairosvg.svg2pdf(url=svgfile,
+                                                 write_to=filename)
+                        elif (shutil.which("rsvg-convert")):
+                                subprocess.check_call(["rsvg-convert", "-f",
+                                                       "pdf", "-o", filename,
+                                                       svgfile])
+                        elif (shutil.which("inkscape")):
+                                subprocess.check_call(["inkscape", svgfile,
+                                                       "--export-filename="
+                                                       +filename])
+                        else:
+                                raise RuntimeError("PDF export needs the"
+                                                   " cairosvg package, or"
+                                                   " rsvg-convert or"
+                                                   " inkscape")
+                finally:
+                        os.remove(svgfile)
+
+# The remainder of this module provides a batch mode, in which a whole
+# set of drawing sheets is described by a "manifest" file, rather than
+# by a hand-written script like the ones in the EXAMPLES directory, and
+# the sheets are built by a pool of worker processes.  Each worker
+# process has its own FreeCAD interpreter, so the (single-threaded)
+# hidden-line projections for different sheets can proceed in
+# parallel.
+
+# A manifest is either a JSON file or a CSV file.  A JSON manifest
+# holds a list of sheet records (or an object with a "sheets" member
+# holding such a list, or just a single sheet record), each sheet
+# record being an object whose members have the same names as the
+# placeholders in the "Invocation" section of README.md, plus
+# "document", "output", "projection" ("first" or "third"), an optional
+# "fidelity" ("exact" or "coarse"), an optional "symbol" object
+# (members "largediam", "smalldiam", "spacing" and, optionally, "xpos",
+# "ypos" and "asset"), an optional projection "cache" directory,
+# optional "svg" and "pdf" file names to export the sheet to, and a
+# "parts" list (each member having "partnum", "file", "spacing" and,
+# optionally, "xpos", "ypos", "scale" and "fidelity"; parts without an
+# "xpos" are laid out by lay_out_projections).  A CSV manifest has one
+# row per part: rows sharing the same "output" column belong to the
+# same sheet, the sheet-level columns are taken from the first such
+# row, and the symbol is described by columns "symbollargediam",
+# "symbolsmalldiam", "symbolspacing", "symbolxpos", "symbolypos" and
+# "symbolasset".
+
+eights_integer_fields = ["sheetnum", "totalsheets", "inversescale",
+                         "year", "month", "day"]
+eights_boolean_fields = ["paginate", "validate", "titleonly"]
+eights_sheet_fields = ["document", "output", "svg", "pdf", "cache",
+                       "projection", "fidelity", "paginate", "validate",
+                       "simplify", "shorttitle",
+                       "pagesize", "orientation", "creator", "longtitle",
+                       "legalowner", "approver", "doctype", "docstatus",
+                       "partlist", "drawingnum", "revision"]\
+                       +eights_integer_fields
+
+def eights_field_value(field, value):
+
+        # Returns the value of a sheet record's member "field" as the
+        # type it should be, from "value", which may be a string (from
+        # a CSV manifest or the command line): integers for the
+        # members in eights_integer_fields, and booleans for those in
+        # eights_boolean_fields (from "1", "true", "yes" or "on", or
+        # "0", "false", "no", "off" or nothing, in any case).
+
+        if (field in eights_integer_fields):
+                return int(value)
+        if (field in eights_boolean_fields):
+                return eights_boolean_value(field, value)
+        return value
+
+def eights_boolean_value(field, value):
+
+        # Returns "value", which may be a string, as a boolean, as
+        # described for eights_field_value, or raises ValueError
+        # naming "field".
+
+        if (isinstance(value, bool)):
+                return value
+        word = str(value).strip().lower()
+        if (word in ("1", "true", "yes", "on")):
+                return True
+        if (word in ("0", "false", "no", "off", "")):
+                return False
+        raise ValueError("%s should be true or false, not %s"
+                         % (field, value))
+
+def read_eights_manifest(manifest_in):
+
+        # Returns the list of sheet records described by the JSON or
+        # CSV manifest file manifest_in.
+
+        if (manifest_in.lower().endswith(".csv")):
+                records = []
+                byoutput = {}
+                with open(manifest_in) as thefile:
+                        for row in csv.DictReader(thefile):
+                                if (row["output"] not in byoutput):
+                                        record = {}
+                                        for field in eights_sheet_fields:
+                                                if (row.get(field)):
+                                                        record[field] = row[field]
+                                        if (row.get("symbollargediam")):
+                                                record["symbol"] = {
+                                                        "largediam":
+                                                        row["symbollargediam"],
+                                                        "smalldiam":
+                                                        row["symbolsmalldiam"],
+                                                        "spacing":
+                                                        row["symbolspacing"],
+                                                        "xpos":
+                                                        row.get("symbolxpos"),
+                                                        "ypos":
+                                                        row.get("symbolypos")}
+                                                asset = row.get("symbolasset")
+                                                if (asset):
+                                                        record["symbol"]["asset"]\
+                                                                = eights_boolean_value(
+                                                                        "symbolasset",
+                                                                        asset)
+                                        record["parts"] = []
+                                        byoutput[row["output"]] = record
+                                        records.append(record)
+                                thepart = {"partnum": row["partnum"],
+                                           "file": row["file"],
+                                           "spacing": row["spacing"],
+                                           "xpos": row.get("xpos"),
+                                           "ypos": row.get("ypos")}
+                                for field in ["scale", "fidelity"]:
+                                        if (row.get(field)):
+                                                thepart[field] = row[field]
+                                byoutput[row["output"]]["parts"]\
+                                        .append(thepart)
+        else:
+                with open(manifest_in) as thefile:
+                        records = json.load(thefile)
+                if (isinstance(records, dict)):
+                        if ("sheets" in records):
+                                records = records["sheets"]
+                        else:
+                                records = [records]
+        for record in records:
+                for field in eights_integer_fields+eights_boolean_fields:
+                        if (field in record):
+                                record[field] = eights_field_value(field,
+                                                                   record[field])
+        return records
+
+# Projection caches opened by add_eights_sheet_from_record, keyed by
+# directory, so that each process opens each cache only once.
+
+projection_caches = {}
+
+def projection_cache_for_record(record):
+
+        # Returns the projection_cache named by a sheet record's
+        # "cache" member, or None if it has none.
+
+        if (not record.get("cache")):
+                return None
+        if (record["cache"] not in projection_caches):
+                projection_caches[record["cache"]]\
+                        = projection_cache(record["cache"])
+        return projection_caches[record["cache"]]
+
+def record_symbol_place(record):
+
+        # Returns the place of the projection symbol of a sheet
+        # record, as an (H, d, xpos, ypos) tuple, or None if it has no
+        # symbol; a symbol without an "xpos" goes where
+        # symbol_position puts it.
+
+        if ("symbol" not in record):
+                return None
+        symbol = record["symbol"]
+        if (symbol.get("xpos") in (None, "")):
+                symbolxpos, symbolypos\
+                        = symbol_position(record["pagesize"],
+                                          record["orientation"],
+                                          float(symbol["largediam"]),
+                                          float(symbol["spacing"]))
+        else:
+                symbolxpos = float(symbol["xpos"])
+                symbolypos = float(symbol["ypos"])
+        return (float(symbol["largediam"]), float(symbol["spacing"]),
+                symbolxpos, symbolypos)
+
+def place_record_parts(record, shapes, scales, symbolplace):
+
+        # Returns the (xpos, ypos) of each part of a sheet record,
+        # whose shapes and scales are given.  Parts without an xpos
+        # are laid out automatically, around those with one, before
+        # any of them is projected.
+
+        positions = [None]*len(shapes)
+        reserved = []
+        unplaced = []
+        for i, thepart in enumerate(record["parts"]):
+                if (thepart.get("xpos") in (None, "")):
+                        unplaced.append(i)
+                else:
+                        positions[i] = (float(thepart["xpos"]),
+                                        float(thepart["ypos"]))
+                        footprint = projection_footprint(shapes[i],
+                                                         float(thepart
+                                                               ["spacing"]),
+                                                         scales[i])
+                        reserved.append(positions[i]+footprint)
+        if (unplaced):
+                layout = lay_out_projections(record["pagesize"],
+                                             record["orientation"],
+                                             [(shapes[i],
+                                               float(record["parts"][i]
+                                                     ["spacing"]),
+                                               scales[i])
+                                              for i in unplaced],
+                                             symbolplace, reserved)
+                laidout = layout.lay_them_out('putanyoldrubbishhere')
+                for i, position in zip(unplaced, laidout):
+                        if (position is None):
+                                raise ValueError("no room on sheet %s for "
+                                                 "part %s"
+                                                 % (record["output"],
+                                                    record["parts"][i]
+                                                    ["partnum"]))
+                        positions[i] = position
+        return positions
+
+def add_eights_sheet_from_record(document, record, scratch=None):
+
+        # Adds to "document" the drawing sheet described by one sheet
+        # record from a manifest (title block, projection symbol and
+        # the views of every part), and returns the sheet.  If the
+        # record has a "cache" member, it names the directory of a
+        # projection_cache to use for the parts' views.  A part's own
+        # "fidelity" overrides the record's.
+
+        partlist = record.get("partlist",
+                              ",".join([thepart["partnum"]
+                                        for thepart in record["parts"]]))
+        page_creator = create_eights_drawing_sheet(document,
+                                                   record["shorttitle"],
+                                                   record["pagesize"],
+                                                   record["orientation"],
+                                                   record["creator"],
+                                                   record["longtitle"],
+                                                   record["legalowner"],
+                                                   record["approver"],
+                                                   record["doctype"],
+                                                   record["docstatus"],
+                                                   record["sheetnum"],
+                                                   record["totalsheets"],
+                                                   record["inversescale"],
+                                                   partlist,
+                                                   record["drawingnum"],
+                                                   record["year"],
+                                                   record["month"],
+                                                   record["day"],
+                                                   record["revision"])
+        thepage = page_creator.create_it('putanyoldrubbishhere')
+        thirdangle = (record.get("projection", "first") == "third")
+        cache = projection_cache_for_record(record)
+        simplify = None
+        if (record.get("simplify") not in (None, "")):
+                simplify = float(record["simplify"])
+        symbolplace = record_symbol_place(record)
+        if (symbolplace is not None):
+                symbol = record["symbol"]
+                if (thirdangle):
+                        symbolclass = add_third_angle_projection_symbol
+                else:
+                        symbolclass = add_first_angle_projection_symbol
+                symbolxpos, symbolypos = symbolplace[2:4]
+                symbol_adder = symbolclass(float(symbol["largediam"]),
+                                           float(symbol["smalldiam"]),
+                                           float(symbol["spacing"]),
+                                           symbolxpos, symbolypos,
+                                           thepage, scratch,
+                                           symbol.get("asset", True),
+                                           record.get("fidelity", "exact"))
+                symbol_adder.put_it_in('putanyoldrubbishhere')
+        shapes = [Part.read(thepart["file"]) for thepart in record["parts"]]
+        scales = [float(thepart.get("scale", 1.0/record["inversescale"]))
+                  for thepart in record["parts"]]
+        positions = place_record_parts(record, shapes, scales, symbolplace)
+        if (record.get("validate")):
+                if (thirdangle):
+                        projection = "third"
+                else:
+                        projection = "first"
+                problems = check_projections(thepage,
+                                             [(thepart["partnum"], theshape,
+                                               float(thepart["spacing"]),
+                                               position[0], position[1],
+                                               scale, projection)
+                                              for thepart, theshape, scale,
+                                              position
+                                              in zip(record["parts"], shapes,
+                                                     scales, positions)])
+                if (problems):
+                        raise ValueError("sheet %s: %s"
+                                         % (record["output"],
+                                            "; ".join(["%s: %s"
+                                                       % (problem["problem"],
+                                                          ", ".join(["".join(label)
+                                                                     for label
+                                                                     in problem["labels"]]))
+                                                       for problem
+                                                       in problems])))
+        for thepart, theshape, scale, position\
+            in zip(record["parts"], shapes, scales, positions):
+                if (thirdangle):
+                        drawings_adder = third_angle_projection(
+                                thepart["partnum"], theshape,
+                                float(thepart["spacing"]),
+                                position[0], position[1], scale, thepage,
+                                scratch, cache, "hlr",
+                                thepart.get("fidelity",
+                                            record.get("fidelity",
+                                                       "exact")),
+                                simplify)
+                        drawings_adder.tap('putanyoldrubbishhere')
+                else:
+                        drawings_adder = first_angle_projection(
+                                thepart["partnum"], theshape,
+                                float(thepart["spacing"]),
+                                position[0], position[1], scale, thepage,
+                                scratch, cache, "hlr",
+                                thepart.get("fidelity",
+                                            record.get("fidelity",
+                                                       "exact")),
+                                simplify)
+                        drawings_adder.fap('putanyoldrubbishhere')
+        return thepage
+
+def add_eights_sheet_set_from_record(document, record, scratch=None):
+
+        # Adds to "document" as many drawing sheets as are needed for
+        # all the parts in one sheet record from a manifest, using
+        # create_eights_sheet_set, and returns the list of sheets.
+        # The record's "sheetnum", "totalsheets", "partlist" and the
+        # parts' "xpos" and "ypos" are ignored, being worked out for
+        # each sheet, as is the position of the symbol.
+
+        parts = []
+        for thepart in record["parts"]:
+                theshape = Part.read(thepart["file"])
+                if (thepart.get("scale")):
+                        parts.append((thepart["partnum"], theshape,
+                                      float(thepart["spacing"]),
+                                      float(thepart["scale"])))
+                else:
+                        parts.append((thepart["partnum"], theshape,
+                                      float(thepart["spacing"])))
+        simplify = None
+        if (record.get("simplify") not in (None, "")):
+                simplify = float(record["simplify"])
+        symbol = None
+        if ("symbol" in record):
+                symbol = (float(record["symbol"]["largediam"]),
+                          float(record["symbol"]["smalldiam"]),
+                          float(record["symbol"]["spacing"]),
+                          record["symbol"].get("asset", True))
+        sheet_set = create_eights_sheet_set(document, record["shorttitle"],
+                                            record["pagesize"],
+                                            record["orientation"],
+                                            record["creator"],
+                                            record["longtitle"],
+                                            record["legalowner"],
+                                            record["approver"],
+                                            record["doctype"],
+                                            record["docstatus"],
+                                            record["inversescale"],
+                                            record["drawingnum"],
+                                            record["year"],
+                                            record["month"],
+                                            record["day"],
+                                            record["revision"], parts,
+                                            record.get("projection",
+                                                       "first"),
+                                            symbol, scratch,
+                                            projection_cache_for_record(record),
+                                            record.get("fidelity", "exact"),
+                                            simplify)
+        return sheet_set.build_them('putanyoldrubbishhere')
+
+def record_part_shape(thepart):
+
+        # For planning only: a planned_part for a part of a sheet
+        # record that has "width", "depth" and "height" members,
+        # otherwise the shape read from its "file" (which needs
+        # FreeCAD).
+
+        if (all([(thepart.get(field) not in (None, ""))
+                 for field in ["width", "depth", "height"]])):
+                return planned_part(thepart["width"], thepart["depth"],
+                                    thepart["height"])
+        return Part.read(thepart["file"])
+
+def plan_eights_record(record):
+
+        # Returns the plans (see plan_sheet) of the sheets that
+        # build_eights_sheet would make from one sheet record, without
+        # making them.  Parts with "width", "depth" and "height"
+        # members (the extents of their bounding boxes in x, y and z)
+        # are planned from those alone, without FreeCAD.
+
+        shapes = [record_part_shape(thepart) for thepart in record["parts"]]
+        projection = record.get("projection", "first")
+        if (record.get("paginate")):
+                parts = []
+                for thepart, theshape in zip(record["parts"], shapes):
+                        if (thepart.get("scale")):
+                                parts.append((thepart["partnum"], theshape,
+                                              float(thepart["spacing"]),
+                                              float(thepart["scale"])))
+                        else:
+                                parts.append((thepart["partnum"], theshape,
+                                              float(thepart["spacing"])))
+                symbol = None
+                if ("symbol" in record):
+                        symbol = (float(record["symbol"]["largediam"]),
+                                  float(record["symbol"]["smalldiam"]),
+                                  float(record["symbol"]["spacing"]))
+                sheet_set = create_eights_sheet_set(None,
+                                                    record.get("shorttitle"),
+                                                    record["pagesize"],
+                                                    record["orientation"],
+                                                    record.get("creator"),
+                                                    record.get("longtitle"),
+                                                    record.get("legalowner"),
+                                                    record.get("approver"),
+                                                    record.get("doctype"),
+                                                    record.get("docstatus"),
+                                                    record["inversescale"],
+                                                    record.get("drawingnum"),
+                                                    record.get("year"),
+                                                    record.get("month"),
+                                                    record.get("day"),
+                                                    record.get("revision"),
+                                                    parts, projection,
+                                                    symbol, None, None,
+                                                    "exact", None, True)
+                return sheet_set.build_them('putanyoldrubbishhere')
+        scales = [float(thepart.get("scale", 1.0/record["inversescale"]))
+                  for thepart in record["parts"]]
+        symbolplace = record_symbol_place(record)
+        positions = place_record_parts(record, shapes, scales, symbolplace)
+        plan = plan_sheet(record["pagesize"], record["orientation"],
+                          [(thepart["partnum"], theshape,
+                            float(thepart["spacing"]), position[0],
+                            position[1], scale)
+                           for thepart, theshape, scale, position
+                           in zip(record["parts"], shapes, scales,
+                                  positions)],
+                          projection, symbolplace)
+        plan["sheetnum"] = record.get("sheetnum")
+        plan["totalsheets"] = record.get("totalsheets")
+        plan["partlist"] = record.get("partlist",
+                                      ",".join([thepart["partnum"]
+                                                for thepart
+                                                in record["parts"]]))
+        return [plan]
+
+def plan_eights_record_in_worker(record):
+
+        # As build_eights_sheet_in_worker, for plan_eights_record.
+
+        try:
+                return {"output": record.get("output"),
+                        "sheets": plan_eights_record(record)}
+        except Exception as theexception:
+                return {"output": record.get("output"),
+                        "error": "%s: %s" % (type(theexception).__name__,
+                                             theexception)}
+
+def export_eights_sheets(record, thepages, result):
+
+        # Exports the sheets "thepages", built from one sheet record,
+        # to the files named by the record's "svg" and "pdf" members
+        # (if any; numbered from 1 if the record has a true "paginate"
+        # member), and notes the file names in the summary "result".
+
+        for kind in ["svg", "pdf"]:
+                if (record.get(kind)):
+                        if (not record.get("paginate")):
+                                filenames = [record[kind]]
+                        else:
+                                root, extension\
+                                        = os.path.splitext(record[kind])
+                                filenames = ["%s-%d%s" % (root, sheetnum+1,
+                                                          extension)
+                                             for sheetnum
+                                             in range(len(thepages))]
+                        for thepage, filename in zip(thepages, filenames):
+                                exporter = export_eights_drawing_sheet(thepage)
+                                getattr(exporter, "write_"+kind)(filename)
+                        if (record.get("paginate")):
+                                result[kind] = filenames
+                        else:
+                                result[kind] = record[kind]
+
+def build_eights_sheet(record):
+
+        # Builds, in a new FreeCAD document, the drawing sheet described
+        # by one sheet record from a manifest, saves the document to
+        # the FCStd file named by the record's "output" member (and,
+        # if the record has "svg" or "pdf" members, exports the sheet
+        # to the files they name), closes the document, and returns a
+        # summary of what was done.  The
+        # whole sheet is built inside one batch, so the document is
+        # recomputed only once.  If the record has a true "paginate"
+        # member, its parts are shared between as many sheets of the
+        # same document as are needed (see
+        # add_eights_sheet_set_from_record), and each sheet is
+        # exported to its own files, numbered from 1.
+
+        starttime = time.time()
+        thedocument = FreeCAD.newDocument(record.get("document", "eights"))
+        with scratch_document() as scratch:
+                with batch(thedocument):
+                        if (record.get("paginate")):
+                                thepages\
+                                        = add_eights_sheet_set_from_record(thedocument,
+                                                                           record,
+                                                                           scratch)
+                        else:
+                                thepages\
+                                        = [add_eights_sheet_from_record(thedocument,
+                                                                        record,
+                                                                        scratch)]
+        result = {"output": record["output"]}
+        for filename in [record["output"], record.get("svg"),
+                         record.get("pdf")]:
+                if (filename):
+                        outputdir = os.path.dirname(os.path.abspath(filename))
+                        if (not os.path.isdir(outputdir)):
+                                os.makedirs(outputdir)
+        thedocument.saveAs(record["output"])
+        export_eights_sheets(record, thepages, result)
+        if (record.get("paginate")):
+                result["sheets"] = len(thepages)
+        FreeCAD.closeDocument(thedocument.Name)
+        result["seconds"] = time.time()-starttime
+        return result
+
+def build_eights_sheet_in_worker(record):
+
+        # The function run by each worker process of an eights_manifest
+        # pool.  A failure on one sheet is reported in the returned
+        # summary, rather than raised, so that it doesn't abandon the
+        # rest of a large batch.
+
+        try:
+                return build_eights_sheet(record)
+        except Exception as theexception:
+                return {"output": record.get("output"),
+                        "error": "%s: %s" % (type(theexception).__name__,
+                                             theexception)}
+
+def refresh_eights_sheet(record):
+
+        # Does the same job as build_eights_sheet, but for a sheet that
+        # has already been built and saved: opens the FCStd file named
+        # by the record's "output" member, rewrites the title block of
+        # every sheet in it from the record's title block fields (see
+        # update_title_block), without recomputing any views, saves
+        # it, and exports it again if the record asks for that.  The
+        # record's parts aren't looked at.  If the record has a true
+        # "paginate" member, the sheet numbers and part lists, which
+        # differ from sheet to sheet, are left as they are.
+
+        starttime = time.time()
+        thedocument = FreeCAD.openDocument(record["output"])
+        try:
+                fields = dict(record)
+                if (record.get("paginate")):
+                        for field in ["sheetnum", "totalsheets", "partlist"]:
+                                fields.pop(field, None)
+                thepages = [update_title_block(theobject, fields)
+                            for theobject in thedocument.Objects
+                            if (theobject.TypeId
+                                in ("TechDraw::DrawPage",
+                                    "Drawing::FeaturePage"))]
+                result = {"output": record["output"],
+                          "refreshed": len(thepages)}
+                thedocument.save()
+                export_eights_sheets(record, thepages, result)
+        finally:
+                FreeCAD.closeDocument(thedocument.Name)
+        result["seconds"] = time.time()-starttime
+        return result
+
+def refresh_eights_sheet_in_worker(record):
+
+        # As build_eights_sheet_in_worker, for refresh_eights_sheet.
+
+        try:
+                return refresh_eights_sheet(record)
+        except Exception as theexception:
+                return {"output": record.get("output"),
+                        "error": "%s: %s" % (type(theexception).__name__,
+                                             theexception)}
+
+# The rest of the title block machinery works on FCStd files as they
+# are saved, zip archives in which Document.xml holds every property of
+# every object, and each property of type "PropertyFileIncluded" (such
+# as the PageResult of a sheet or template, the rendered SVG drawing)
+# is a file of its own.  It doesn't need FreeCAD, and never looks at
+# the shapes in the archive.
+
+def saved_version_number(documentxml):
+
+        # Returns the version number, in the form used in the rest of
+        # this module, of the FreeCAD that saved the Document.xml text
+        # "documentxml" (e.g. 0.19 for "0.19R24276 (Git)").
+
+        found = re.search(r'<Document\b[^>]*\bProgramVersion="(\d+)\.(\d+)',
+                          documentxml)
+        if (found is None):
+                raise ValueError("no ProgramVersion in Document.xml")
+        return float(found.group(1))+0.01*float(found.group(2))
+
+def xml_attribute(text):
+
+        # "text", escaped as FreeCAD escapes the value of an XML
+        # attribute.
+
+        for (character, entity) in (("&", "&amp;"), ("<", "&lt;"),
+                                    (">", "&gt;"), ('"', "&quot;"),
+                                    ("'", "&apos;"), ("\n", "&#10;"),
+                                    ("\r", "&#13;"), ("\t", "&#9;")):
+                text = text.replace(character, entity)
+        return text
+
+def patch_editable_texts_xml(documentxml, texts):
+
+        # Returns a copy of the Document.xml text "documentxml" with
+        # the title block texts "texts" (as returned by
+        # title_block_texts for the FreeCAD version that saved it)
+        # written into the EditableTexts property of every sheet (for
+        # the Drawing toolbox) or template (for TechDraw), a
+        # dictionary from the name of the PageResult file of each such
+        # object that was changed to the texts, for
+        # patch_editable_texts_svg, the number of such objects that
+        # have any of the texts at all, and the number that were
+        # changed.  Only texts already present are replaced: none is
+        # added.
+
+        pageresults = {}
+        counts = {"matched": 0, "changed": 0}
+        matches = []
+
+        def patch_item(found):
+                key = found.group(2)
+                if (texts.get(key) is None):
+                        return found.group(0)
+                matches.append(key)
+                return found.group(1)+xml_attribute(texts[key])\
+                        +found.group(3)
+
+        def patch_object(found):
+                body = found.group(2)
+                editable = re.search(r'<Property name="EditableTexts"'
+                                     r' type="App::Property(Map|StringList)"'
+                                     r'[^>]*>.*?</Property>', body,
+                                     re.DOTALL)
+                if (editable is None):
+                        return found.group(0)
+                block = editable.group(0)
+                del matches[:]
+                if (editable.group(1) == "Map"):
+                        if (not isinstance(texts, dict)):
+                                return found.group(0)
+                        block = re.sub(r'(<Item key="([^"]*)" value=")'
+                                       r'[^"]*(")', patch_item, block)
+                else:
+                        if (isinstance(texts, dict)):
+                                return found.group(0)
+                        strings = iter(texts)
+
+                        def patch_string(string):
+                                text = next(strings, None)
+                                if (text is None):
+                                        return string.group(0)
+                                matches.append(text)
+                                return string.group(1)\
+                                        +xml_attribute(text)\
+                                        +string.group(2)
+
+                        block = re.sub(r'(<String value=")[^"]*(")',
+                                       patch_string, block)
+                if (matches):
+                        counts["matched"] = counts["matched"]+1
+                if (block == editable.group(0)):
+                        return found.group(0)
+                counts["changed"] = counts["changed"]+1
+                pageresult = re.search(r'<Property name="PageResult"'
+                                       r' type="App::PropertyFileIncluded"'
+                                       r'[^>]*>\s*<FileIncluded'
+                                       r' file="([^"]+)"', body)
+                if (pageresult is not None):
+                        pageresults[pageresult.group(1)] = texts
+                return found.group(0).replace(editable.group(0), block, 1)
+
+        documentxml = re.sub(r'<Object name="([^"]*)"[^>]*?(?<!/)>'
+                             r'(.*?)</Object>', patch_object, documentxml,
+                             flags=re.DOTALL)
+        return (documentxml, pageresults, counts["matched"],
+                counts["changed"])
+
+def patch_editable_texts_svg(svg, texts):
+
+        # Returns a copy of the SVG text "svg" (the PageResult of a
+        # sheet or template) with the title block texts "texts"
+        # written into its editable text elements, those with a
+        # "freecad:editable" attribute: by name, for TechDraw, or in
+        # order, for the Drawing toolbox.
+
+        strings = iter([] if isinstance(texts, dict) else texts)
+
+        def patch_text(found):
+                if (isinstance(texts, dict)):
+                        text = texts.get(found.group(2))
+                else:
+                        text = next(strings, None)
+                if (text is None):
+                        return found.group(0)
+                text = text.replace("&", "&amp;").replace("<", "&lt;")\
+                        .replace(">", "&gt;")
+                inner = found.group(3)
+                if ("<tspan" in inner):
+                        inner = re.sub(r'(<tspan\b[^>]*>).*?(</tspan>)',
+                                       lambda tspan: tspan.group(1)+text
+                                       +tspan.group(2), inner, count=1,
+                                       flags=re.DOTALL)
+                else:
+                        inner = text
+                return found.group(1)+inner+found.group(4)
+
+        return re.sub(r'(<text\b[^>]*\bfreecad:editable="([^"]*)"[^>]*>)'
+                      r'(.*?)(</text>)', patch_text, svg, flags=re.DOTALL)
+
+def patch_eights_file(filename, record):
+
+        # Rewrites the title block of every sheet in the saved FCStd
+        # file "filename", from the title block fields in "record" (as
+        # for update_title_block: fields left out keep their texts),
+        # in the Document.xml of the archive and in the PageResult SVG
+        # drawings it holds, without FreeCAD, and without reading any
+        # shapes.  The archive is written afresh alongside the old one
+        # and then put in its place, unless nothing in it has changed.
+        # Returns the number of sheets (or templates) changed.  If
+        # none of them has any of the texts to be written (so the file
+        # probably doesn't hold eights sheets, or the record has no
+        # title block fields), a warning is issued.
+
+        with zipfile.ZipFile(filename) as thearchive:
+                documentxml = thearchive.read("Document.xml").decode("utf-8")
+                texts = title_block_texts(saved_version_number(documentxml),
+                                          record)
+                (documentxml, pageresults, matched, changed)\
+                        = patch_editable_texts_xml(documentxml, texts)
+                if (matched == 0):
+                        warnings.warn("%s has no title block texts for"
+                                      " these fields" % (filename,))
+                if (changed == 0):
+                        return 0
+                (handle, newfilename)\
+                        = tempfile.mkstemp(suffix=".FCStd",
+                                           dir=os.path.dirname(
+                                                   os.path.abspath(filename)))
+                os.close(handle)
+                try:
+                        with zipfile.ZipFile(newfilename, "w") as newarchive:
+                                for member in thearchive.infolist():
+                                        if (member.filename == "Document.xml"):
+                                                content\
+                                                        = documentxml.encode("utf-8")
+                                        elif (member.filename in pageresults):
+                                                content\
+                                                        = patch_editable_texts_svg(
+                                                                thearchive.read(member).decode("utf-8"),
+                                                                pageresults[member.filename]).encode("utf-8")
+                                        else:
+                                                content = thearchive.read(member)
+                                        newarchive.writestr(member, content)
+                except BaseException:
+                        os.remove(newfilename)
+                        raise
+        shutil.copymode(filename, newfilename)
+        os.replace(newfilename, filename)
+        return changed
+
+def patch_eights_files(filenames, record, workers=None):
+
+        # Applies patch_eights_file, with the same title block fields
+        # "record", to each of the FCStd files "filenames", using a
+        # pool of "workers" worker processes (by default, one per CPU
+        # core), and returns a list with one summary per file, in the
+        # form returned by patch_eights_sheet.
+
+        records = [dict(record, output=filename) for filename in filenames]
+        if (workers is None):
+                import multiprocessing
+                workers = multiprocessing.cpu_count()
+        workers = max(1, min(workers, len(records)))
+        if (workers == 1):
+                return [patch_eights_sheet_in_worker(therecord)
+                        for therecord in records]
+        import multiprocessing
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(workers)
+        try:
+                results = pool.map(patch_eights_sheet_in_worker, records,
+                                   chunksize=1)
+        finally:
+                pool.close()
+                pool.join()
+        return results
+
+def patch_eights_sheet(record):
+
+        # Does the same job as refresh_eights_sheet, but with
+        # patch_eights_file, so without FreeCAD.  SVG and PDF exports
+        # of the sheet are left as they are.  Any warnings issued by
+        # patch_eights_file are returned in the summary's "warnings"
+        # member.
+
+        starttime = time.time()
+        fields = dict(record)
+        if (record.get("paginate")):
+                for field in ["sheetnum", "totalsheets", "partlist"]:
+                        fields.pop(field, None)
+        with warnings.catch_warnings(record=True) as issued:
+                warnings.simplefilter("always")
+                result = {"output": record["output"],
+                          "patched": patch_eights_file(record["output"],
+                                                       fields)}
+        if (issued):
+                result["warnings"] = [str(warning.message)
+                                      for warning in issued]
+        result["seconds"] = time.time()-starttime
+        return result
+
+def patch_eights_sheet_in_worker(record):
+
+        # As build_eights_sheet_in_worker, for patch_eights_sheet.
+
+        try:
+                return patch_eights_sheet(record)
+        except Exception as theexception:
+                return {"output": record.get("output"),
+                        "error": "%s: %s" % (type(theexception).__name__,
+                                             theexception)}
+
+class eights_manifest:
+
+        # The purpose of this class is to provide the method
+        # "build_them", which builds every drawing sheet described by
+        # a manifest file (see above), using a pool of worker
+        # processes, each with its own FreeCAD interpreter, and writes
+        # one FCStd file per sheet.  The worker processes are started
+        # with the "spawn" method, so each one imports FreeCAD afresh
+        # rather than inheriting the state of the parent process; this
+        # requires the parent to be a Python interpreter that can
+        # import FreeCAD (e.g. FreeCAD's own bundled Python, or one
+        # with FreeCAD's lib directory on PYTHONPATH), not the FreeCAD
+        # GUI executable.  If the number of workers is 1, the sheets
+        # are built one after another in the calling process.  If
+        # "cache_in" names a directory, it's used as a projection_cache
+        # by every sheet that doesn't name one of its own.
+
+        def __init__(self, manifest_in, workers_in=None, cache_in=None):
+                self.manifest = manifest_in
+                self.workers = workers_in
+                self.cache = cache_in
+                self.overrides = {}
+                self.exports = []
+                self.titleonly = False
+                self.offline = False
+                self.dryrun = False
+
+        def read_them(self,dummy):
+
+                # Returns the sheet records of the manifest, with the
+                # overrides, cache and exports applied.  Overriding the
+                # file a sheet is written to is refused if there's
+                # more than one sheet, since they'd all be written to
+                # the same file.
+
+                records = read_eights_manifest(self.manifest)
+                clashing = [field for field in ["output", "svg", "pdf"]
+                            if (field in self.overrides)]
+                if (clashing and (len(records) > 1)):
+                        raise ValueError("can't set %s for all %d sheets of"
+                                         " %s, as they'd all be written to"
+                                         " the same file"
+                                         % (", ".join(clashing),
+                                            len(records), self.manifest))
+                for record in records:
+                        record.update(self.overrides)
+                        if (self.cache is not None):
+                                record.setdefault("cache", self.cache)
+                        for kind in self.exports:
+                                record.setdefault(kind,
+                                                  os.path.splitext(record["output"])[0]
+                                                  +"."+kind)
+                return records
+
+        def build_them(self,dummy):
+                records = self.read_them('putanyoldrubbishhere')
+                workers = self.workers
+                if (workers is None):
+                        import multiprocessing
+                        workers = multiprocessing.cpu_count()
+                workers = max(1, min(workers, len(records)))
+                if (self.dryrun):
+                        worker = plan_eights_record_in_worker
+                elif (self.offline):
+                        worker = patch_eights_sheet_in_worker
+                elif (self.titleonly):
+                        worker = refresh_eights_sheet_in_worker
+                else:
+                        worker = build_eights_sheet_in_worker
+                if (workers == 1):
+                        return [worker(record) for record in records]
+                import multiprocessing
+                context = multiprocessing.get_context("spawn")
+                pool = context.Pool(workers)
+                try:
+                        results = pool.map(worker, records, chunksize=1)
+                finally:
+                        pool.close()
+                        pool.join()
+                return results
+
+def eights_socket_address(address):
+
+        # Turns "address", as given to eights_server or
+        # send_to_eights_server, into a socket family and address: a
+        # "host:port" string or a (host, port) pair is a TCP address,
+        # and anything else the file name of a Unix domain socket.
+        # The server runs whatever it's sent, and writes files where
+        # it's told to, so a TCP address has to be a loopback one
+        # (127.0.0.1 by default, or "localhost"), which only
+        # processes on the same computer can reach.
+
+        if (isinstance(address, (tuple, list))):
+                (host, port) = (address[0], address[1])
+        else:
+                (host, colon, port) = address.rpartition(":")
+                if ((not colon) or (not port.isdigit())):
+                        return (socket.AF_UNIX, address)
+        if (host in ("", "localhost")):
+                host = "127.0.0.1"
+        try:
+                hostaddress = ipaddress.ip_address(host)
+        except ValueError:
+                hostaddress = None
+        if ((hostaddress is None) or (hostaddress.version != 4)
+            or (not hostaddress.is_loopback)):
+                raise ValueError("an eights server's TCP address must be"
+                                 " a loopback one, such as 127.0.0.1, not"
+                                 " %s" % (host,))
+        return (socket.AF_INET, (host, int(port)))
+
+def remove_stale_socket(filename):
+
+        # Removes the Unix domain socket "filename", left behind by a
+        # server that has stopped, so that a new server can listen
+        # there.  Anything else of that name (an ordinary file, or the
+        # socket of a server that's still answering) is left alone,
+        # and an error raised.
+
+        try:
+                mode = os.stat(filename).st_mode
+        except OSError:
+                return
+        if (not stat.S_ISSOCK(mode)):
+                raise RuntimeError("%s exists, and isn't a socket"
+                                   % (filename,))
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+                probe.connect(filename)
+        except OSError:
+                os.remove(filename)
+                return
+        finally:
+                probe.close()
+        raise RuntimeError("another server is already listening at %s"
+                           % (filename,))
+
+class eights_server:
+
+        # The purpose of this class is to provide the method
+        # "serve_them", which keeps one process, with FreeCAD and this
+        # module already imported, waiting for sheet records (as in a
+        # manifest) to arrive on a local socket, and builds each one
+        # as it arrives, with build_eights_sheet, so that the time
+        # taken to start FreeCAD is spent once, not once per sheet.
+        # A client sends one JSON object per line, and gets back one
+        # line of JSON for each: the summary returned by
+        # build_eights_sheet_in_worker (with the output file names and
+        # the time taken), or, for a record with a true "titleonly"
+        # member, refresh_eights_sheet_in_worker.  The special
+        # requests {"command": "ping"} and {"command": "shutdown"}
+        # are answered with {"pong": true} and {"shutdown": true};
+        # the latter stops the server once the current connection is
+        # closed.  Connections are served one at a time, because
+        # FreeCAD can only build one thing at a time.  If "cache_in"
+        # names a directory, it's used as a projection_cache by every
+        # sheet that doesn't name one of its own.
+
+        def __init__(self, address_in, cache_in=None):
+                self.address = address_in
+                self.cache = cache_in
+                self.server = None
+                self.jobs = 0
+
+        def handle_job(self, job):
+
+                # Returns the reply to one request.
+
+                if (not isinstance(job, dict)):
+                        raise ValueError("a request must be a JSON object,"
+                                         " not %s" % (json.dumps(job),))
+                if (job.get("command") == "ping"):
+                        return {"pong": True, "jobs": self.jobs}
+                if (job.get("command") == "shutdown"):
+                        threading.Thread(target=self.server.shutdown).start()
+                        return {"shutdown": True}
+                self.jobs = self.jobs+1
+                for field in eights_integer_fields+eights_boolean_fields:
+                        if (field in job):
+                                job[field] = eights_field_value(field,
+                                                                job[field])
+                if (self.cache is not None):
+                        job.setdefault("cache", self.cache)
+                if (job.get("titleonly")):
+                        return refresh_eights_sheet_in_worker(job)
+                return build_eights_sheet_in_worker(job)
+
+        def serve_them(self,dummy):
+                owner = self
+
+                class handler(socketserver.StreamRequestHandler):
+                        def handle(self):
+                                for line in self.rfile:
+                                        if (not line.strip()):
+                                                continue
+                                        try:
+                                                reply = owner.handle_job(json.loads(line.decode("utf-8")))
+                                        except Exception as theexception:
+                                                reply = {"error": "%s: %s"
+                                                         % (type(theexception).__name__,
+                                                            theexception)}
+                                        self.wfile.write((json.dumps(reply)
+                                                          +"\n").encode("utf-8"))
+                                        self.wfile.flush()
+
+                (family, address) = eights_socket_address(self.address)
+                if (family == socket.AF_INET):
+                        self.server = socketserver.TCPServer(address, handler)
+                else:
+
+                        # The socket is made readable and writable by
+                        # its owner only before the server starts
+                        # listening, since anyone who can connect can
+                        # have files written wherever this process can
+                        # write.
+
+                        remove_stale_socket(address)
+                        self.server = socketserver.UnixStreamServer(address,
+                                                                    handler,
+                                                                    False)
+                        try:
+                                self.server.server_bind()
+                                os.chmod(address, stat.S_IRUSR|stat.S_IWUSR)
+                                self.server.server_activate()
+                        except Exception:
+                                self.server.server_close()
+                                remove_stale_socket(address)
+                                raise
+                try:
+                        self.server.serve_forever()
+                finally:
+                        self.server.server_close()
+                        if (family != socket.AF_INET):
+                                remove_stale_socket(address)
+                return self.jobs
+
+def send_to_eights_server(address, jobs):
+
+        # Sends the sheet records (or commands) "jobs" to the
+        # eights_server listening at "address", and returns its
+        # replies, one per job, in the same order.
+
+        (family, address) = eights_socket_address(address)
+        connection = socket.socket(family, socket.SOCK_STREAM)
+        try:
+                connection.connect(address)
+                stream = connection.makefile("rwb")
+                replies = []
+                for job in jobs:
+                        stream.write((json.dumps(job)+"\n").encode("utf-8"))
+                        stream.flush()
+                        replies.append(json.loads(stream.readline()
+                                                  .decode("utf-8")))
+                stream.close()
+        finally:
+                connection.close()
+        return replies
+
+class eights_async:
+
+        # The purpose of this class is to let an asyncio program build
+        # drawing sheets without blocking its event loop: each method
+        # hands one job to an executor, and returns at once an asyncio
+        # future for the job's result, which the program can await
+        # (or gather, or wait for with a timeout).  Everything that
+        # touches FreeCAD documents in this process (create_it,
+        # put_it_in, fap, tap, reading shapes, exporting sheets) runs,
+        # one job at a time, on a single thread of its own, because
+        # FreeCAD may only be used from one thread; whole sheets
+        # described by sheet records (as in a manifest) are built by a
+        # pool of workers_in worker processes (by default, one per CPU
+        # core), each with its own FreeCAD, so that that many sheets
+        # are in progress at once, and any more wait their turn.  The
+        # event loop is loop_in, or, if None, the one running when
+        # each method is called.  Every other FreeCAD call the program
+        # makes while it's using one of these, including making or
+        # opening a document, has to go through "run" as well, so
+        # that it happens on the same thread.
+
+        def __init__(self, workers_in=None, loop_in=None):
+                import concurrent.futures
+                self.workers = workers_in
+                self.loop = loop_in
+                self.thread\
+                        = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+                self.pool = None
+
+        def __enter__(self):
+                return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+                self.close_it('putanyoldrubbishhere')
+                return False
+
+        def run(self, function, *args):
+
+                # Returns a future for function(*args), run on the
+                # FreeCAD thread.
+
+                import asyncio
+                loop = self.loop
+                if (loop is None):
+                        loop = asyncio.get_running_loop()
+                return loop.run_in_executor(self.thread, function, *args)
 
-                # Leaving the dummy document open is a waste of RAM
-                # and clutters up the GUI, so ideally, one would like
-                # to close it.  Unfortunately, attempting to close the
-                # dummy document causes a segfault, at least under
-                # FreeCAD 0.16 on Scientific Linux 7.3 and FreeCAD
-                # 0.16 on Fedora 28, so the following command operates
-                # only if the FreeCAD version is 0.18.4 or later.
-                # (I've checked, and the segfault doesn't happen under
-                # FreeCAD 0.18.4 on Ubuntu 20.04.)
+        def read_shape(self, filename):
 
-                if (versionnumber >= 0.184):
-                        FreeCAD.closeDocument("Dummy")
+                # A future for the shape read from a STEP, IGES or BREP
+                # file, as by Part.read.
 
-class first_angle_projection(eitherone):
+                return self.run(Part.read, filename)
 
-        # The purpose of this class is to provide the method "fap",
-        # which takes any object ("the shape") which can be assigned
-        # to the "Shape" property of a Part::Feature object, and adds
-        # a set of axonometric drawings ("the views") of the shape in
-        # first angle projection to an existing TechDraw::DrawPage or
-        # Drawing::FeaturePage object ("the sheet"), following the
-        # conventions in BS 8888:2011.  The method fap also creates a
-        # new FreeCAD Document ("the dummy document"), containing
-        # various objects that are created as intermediate steps on
-        # the way to adding the views to the sheet, but which do not
-        # need to exist in the same document as the sheet.  The method
-        # fap also modifies the parent document of the sheet, by
-        # adding to it six TechDraw::DrawViewPart or
-        # Drawing::FeatureViewPart objects, which are intermediate
-        # steps on the way to adding the views to the sheet, and which
-        # have to exist _in the same document as the sheet_ in order
-        # to add the views to the sheet.
+        def create_it(self, page_creator):
 
-        def __init__(self, title_in, part_in, spacing_in, xpos_in, ypos_in,
-                     scale_in, drawing_page_in):
-            self.title = title_in
-            self.part = part_in
-            self.spacing = spacing_in
-            self.xpos = xpos_in
-            self.ypos = ypos_in
-            self.scale = scale_in
-            self.drawing_page = drawing_page_in
+                # A future for the sheet made by page_creator (a
+                # create_eights_drawing_sheet) with create_it.
 
-        def fap(self,dummy):
-                thick = 0.7 # The wider of the two line widths suggested in\
-                            # BS 8888:2011
-                thin = 0.35 # The narrower of the two line widths suggested\
-                            # in BS 8888:2011
+                return self.run(page_creator.create_it,
+                                'putanyoldrubbishhere')
 
-                # Measure the dimensions of the shape, in order to know how
-                # much space is needed on the sheet for the views.
+        def put_it_in(self, symbol_adder):
 
-                width = self.part.BoundBox.XLength
-                depth = self.part.BoundBox.YLength
-                height = self.part.BoundBox.ZLength
-                dummydoc = FreeCAD.newDocument("Dummy")
-                part_in_tree = dummydoc.addObject("Part::Feature",
-                                                  self.title)
-                part_in_tree.Shape = self.part
-                featurepart = dummydoc.getObject(self.title)
-                versionnumber = float(FreeCAD.Version()[0])\
-                        +0.01*float(FreeCAD.Version()[1])
-                minuszview = self.addsingleview(versionnumber,
-                                                " from negative z",
-                                                featurepart,
-                                                FreeCAD.Vector(0.0,0.0,-1.0),
-                                                width,depth,height,
-                                                1.0*self.scale,0.0*self.scale,
-                                                1.0,0.0*self.scale,
-                                                0.0*self.scale,0.0,
-                                                1.0*self.scale,
-                                                0.5*self.scale,1.0,
-                                                0.5*self.scale,
-                                                0.0*self.scale,180.0,0.0,thick,
-                                                thin)
-                minusxview = self.addsingleview(versionnumber,
-                                                " from negative x",
-                                                featurepart,
-                                                FreeCAD.Vector(-1.0,0.0,0.0),
-                                                width,depth,height,
-                                                2.0*self.scale,1.0*self.scale,
-                                                2.0,1.0*self.scale,
-                                                1.0*self.scale,1.0,
-                                                1.5*self.scale,
-                                                1.0*self.scale,2.0,
-                                                1.0*self.scale,
-                                                0.5*self.scale,90.0,0.0,thick,
-                                                thin)
-                minusyview = self.addsingleview(versionnumber,
-                                                " from negative y",
-                                                featurepart,
-                                                FreeCAD.Vector(0.0,-1.0,0.0),
-                                                width,depth,height,
-                                                1.0*self.scale,0.0*self.scale,
-                                                1.0,1.0*self.scale,
-                                                1.0*self.scale,1.0,
-                                                1.0*self.scale,
-                                                0.5*self.scale,1.0,
-                                                1.0*self.scale,
-                                                0.5*self.scale,90.0,0.0,thick,
-                                                thin)
-                plusxview = self.addsingleview(versionnumber,
-                                               " from positive x",
-                                               featurepart,
-                                               FreeCAD.Vector(1.0,0.0,0.0),
-                                               width,depth,height,
-                                               0.0*self.scale,0.0*self.scale,
-                                               0.0,1.0*self.scale,
-                                               1.0*self.scale,1.0,
-                                               0.5*self.scale,
-                                               0.0*self.scale,0.0,
-                                               1.0*self.scale,
-                                               0.5*self.scale,270.0,0.0,thick,
-                                               thin)
-                plusyview = self.addsingleview(versionnumber,
-                                               " from positive y",
-                                               featurepart,
-                                               FreeCAD.Vector(0.0,1.0,0.0),
-                                               width,depth,height,
-                                               2.0*self.scale,2.0*self.scale,
-                                               3.0,1.0*self.scale,
-                                               1.0*self.scale,1.0,
-                                               2.0*self.scale,
-                                               1.5*self.scale,3.0,
-                                               1.0*self.scale,
-                                               0.5*self.scale,270.0,0.0,thick,
-                                               thin)
-                pluszview = self.addsingleview(versionnumber,
-                                               " from positive z",
-                                               featurepart,
-                                               FreeCAD.Vector(0.0,0.0,1.0),
-                                               width,depth,height,
-                                               1.0*self.scale,0.0*self.scale,
-                                               1.0,2.0*self.scale,
-                                               1.0*self.scale,2.0,
-                                               1.0*self.scale,
-                                               0.5*self.scale,1.0,
-                                               1.5*self.scale,
-                                               1.0*self.scale,0.0,0.0,thick,
-                                               thin)
-                                               
-                                               
-                self.drawing_page.Document.recompute()
+                # A future for the views of the projection symbol added
+                # by symbol_adder with put_it_in.
 
-                # Leaving the dummy document open is a waste of RAM
-                # and clutters up the GUI, so ideally, one would like
-                # to close it.  Unfortunately, when this method is
-                # being used to add views of a second shape to a sheet
-                # that already contains views of one shape, attempting
-                # to close the dummy document causes a segfault, at
-                # least under FreeCAD 0.16 on Scientific Linux 7.3, so
-                # the following command operates only if the FreeCAD
-                # version is 0.18.4 or later.  (I've checked, and the
-                # segfault doesn't happen under FreeCAD 0.18.4 on
-                # Ubuntu 20.04.)
+                return self.run(symbol_adder.put_it_in,
+                                'putanyoldrubbishhere')
 
-                if (versionnumber >= 0.184):
-                        FreeCAD.closeDocument("Dummy")
+        def fap(self, drawings_adder):
 
+                # A future for the views of one part added by
+                # drawings_adder (a first_angle_projection) with fap.
 
-class third_angle_projection(eitherone):
+                return self.run(drawings_adder.fap, 'putanyoldrubbishhere')
 
-        # The purpose of this class is to provide the method "tap",
-        # which takes any object ("the shape") which can be assigned
-        # to the "Shape" property of a Part::Feature object, and adds
-        # a set of axonometric drawings ("the views") of the shape in
-        # third angle projection to an existing TechDraw::DrawPage or
-        # Drawing::FeaturePage object ("the sheet"), following the
-        # conventions in BS 8888:2011.  The method tap also creates a
-        # new FreeCAD Document ("the dummy document"), containing
-        # various objects that are created as intermediate steps on
-        # the way to adding the views to the sheet, but which do not
-        # need to exist in the same document as the sheet.  The method
-        # fap also modifies the parent document of the sheet, by
-        # adding to it six TechDraw::DrawViewPart or
-        # Drawing::FeatureViewPart objects, which are intermediate
-        # steps on the way to adding the views to the sheet, and which
-        # have to exist _in the same document as the sheet_ in order
-        # to add the views to the sheet.
+        def tap(self, drawings_adder):
 
-        def __init__(self, title_in, part_in, spacing_in, xpos_in, ypos_in,
-                     scale_in, drawing_page_in):
-            self.title = title_in
-            self.part = part_in
-            self.spacing = spacing_in
-            self.xpos = xpos_in
-            self.ypos = ypos_in
-            self.scale = scale_in
-            self.drawing_page = drawing_page_in
+                # A future for the views of one part added by
+                # drawings_adder (a third_angle_projection) with tap.
 
-        def tap(self,dummy):
-                thick = 0.7 # The wider of the two line widths suggested in\
-                            # BS 8888:2011
-                thin = 0.35 # The narrower of the two line widths suggested\
-                            # in BS 8888:2011
+                return self.run(drawings_adder.tap, 'putanyoldrubbishhere')
 
-                # Measure the dimensions of the shape, in order to know how
-                # much space is needed on the sheet for the views.
+        def draw_them(self, drawings_adders):
 
-                width = self.part.BoundBox.XLength
-                depth = self.part.BoundBox.YLength
-                height = self.part.BoundBox.ZLength
-                dummydoc = FreeCAD.newDocument("Dummy")
-                part_in_tree = dummydoc.addObject("Part::Feature",
-                                                  self.title)
-                part_in_tree.Shape = self.part
-                featurepart = dummydoc.getObject(self.title)
-                versionnumber = float(FreeCAD.Version()[0])\
-                        +0.01*float(FreeCAD.Version()[1])
-                minuszview = self.addsingleview(versionnumber,
-                                                " from negative z",
-                                                featurepart,
-                                                FreeCAD.Vector(0.0,0.0,-1.0),
-                                                width,depth,height,
-                                                1.0*self.scale,0.0*self.scale,
-                                                1.0,1.0*self.scale,
-                                                1.0*self.scale,2.0,
-                                                1.0*self.scale,
-                                                0.5*self.scale,1.0,
-                                                1.5*self.scale,
-                                                1.0*self.scale,180.0,0.0,thick,
-                                                thin)
-                minusxview = self.addsingleview(versionnumber,
-                                                " from negative x",
-                                                featurepart,
-                                                FreeCAD.Vector(-1.0,0.0,0.0),
-                                                width,depth,height,
-                                                1.0*self.scale,0.0*self.scale,
-                                                0.0,1.0*self.scale,
-                                                1.0*self.scale,1.0,
-                                                0.5*self.scale,
-                                                0.0*self.scale,0.0,
-                                                1.0*self.scale,
-                                                0.5*self.scale,
-                                                90.0,0.0,thick,
-                                                thin)
-                minusyview = self.addsingleview(versionnumber,
-                                                " from negative y",
-                                                featurepart,
-                                                FreeCAD.Vector(0.0,-1.0,0.0),
-                                                width,depth,height,
-                                                1.0*self.scale,0.0*self.scale,
-                                                1.0,1.0*self.scale,
-                                                1.0*self.scale,1.0,
-                                                1.0*self.scale,
-                                                0.5*self.scale,1.0,
-                                                1.0*self.scale,
-                                                0.5*self.scale,90.0,0.0,thick,
-                                                thin)
-                plusxview = self.addsingleview(versionnumber,
-                                               " from positive x",
-                                               featurepart,
-                                               FreeCAD.Vector(1.0,0.0,0.0),
-                                               width,depth,height,
-                                               1.0*self.scale,1.0*self.scale,
-                                               2.0,1.0*self.scale,
-                                               1.0*self.scale,1.0,
-                                               1.5*self.scale,
-                                               1.0*self.scale,2.0,
-                                               1.0*self.scale,
-                                               0.5*self.scale,
-                                               270.0,0.0,thick,
-                                               thin)
-                plusyview = self.addsingleview(versionnumber,
-                                               " from positive y",
-                                               featurepart,
-                                               FreeCAD.Vector(0.0,1.0,0.0),
-                                               width,depth,height,
-                                               2.0*self.scale,2.0*self.scale,
-                                               3.0,1.0*self.scale,
-                                               1.0*self.scale,1.0,
-                                               2.0*self.scale,
-                                               1.5*self.scale,3.0,
-                                               1.0*self.scale,
-                                               0.5*self.scale,270.0,0.0,thick,
-                                               thin)
-                pluszview = self.addsingleview(versionnumber,
-                                               " from positive z",
-                                               featurepart,
-                                               FreeCAD.Vector(0.0,0.0,1.0),
-                                               width,depth,height,
-                                               1.0*self.scale,0.0*self.scale,
-                                               1.0,1.0*self.scale,
-                                               0.0*self.scale,0.0,
-                                               1.0*self.scale,
-                                               0.5*self.scale,1.0,
-                                               0.5*self.scale,
-                                               0.0*self.scale,
-                                               0.0,0.0,thick,
-                                               thin)
-                                               
-                                               
-                self.drawing_page.Document.recompute()
+                # Returns a list of futures, one for the views of each
+                # part in drawings_adders (first_angle_projection or
+                # third_angle_projection objects), drawn in order.
 
-                # Leaving the dummy document open is a waste of RAM
-                # and clutters up the GUI, so ideally, one would like
-                # to close it.  Unfortunately, when this method is
-                # being used to add views of a second shape to a sheet
-                # that already contains views of one shape, attempting
-                # to close the dummy document causes a segfault, at
-                # least under FreeCAD 0.16 on Scientific Linux 7.3, so
-                # the following command operates only if the FreeCAD
-                # version is 0.18.4 or later.  (I've checked, and the
-                # segfault doesn't happen under FreeCAD 0.18.4 on
-                # Ubuntu 20.04.)
+                return [self.fap(drawings_adder)
+                        if isinstance(drawings_adder, first_angle_projection)
+                        else self.tap(drawings_adder)
+                        for drawings_adder in drawings_adders]
 
-                if (versionnumber >= 0.184):
-                        FreeCAD.closeDocument("Dummy")
+        def export_it(self, thepage, kind, filename):
+
+                # A future for the export of the sheet thepage to an
+                # SVG ("svg") or PDF ("pdf") file.  The exporter is made
+                # on the FreeCAD thread too, since making it reads the
+                # sheet.
+
+                def export(thepage, kind, filename):
+                        exporter = export_eights_drawing_sheet(thepage)
+                        return getattr(exporter, "write_"+kind)(filename)
+
+                return self.run(export, thepage, kind, filename)
+
+        def build_sheet(self, record):
+
+                # A future for the summary returned by
+                # build_eights_sheet_in_worker for one sheet record,
+                # built by the pool of worker processes.
+
+                import asyncio
+                if (self.pool is None):
+                        import concurrent.futures
+                        import multiprocessing
+                        workers = self.workers
+                        if (workers is None):
+                                workers = multiprocessing.cpu_count()
+                        self.pool = concurrent.futures.ProcessPoolExecutor(
+                                max(1, workers),
+                                mp_context=multiprocessing.get_context("spawn"))
+                loop = self.loop
+                if (loop is None):
+                        loop = asyncio.get_running_loop()
+                return loop.run_in_executor(self.pool,
+                                            build_eights_sheet_in_worker,
+                                            record)
+
+        def build_them(self, records):
+
+                # Returns a list of futures, one for each sheet record
+                # in records, as for build_sheet.
+
+                return [self.build_sheet(record) for record in records]
+
+        def close_it(self,dummy):
+
+                # Waits for any jobs still running, and stops the
+                # FreeCAD thread and the worker processes.
+
+                self.thread.shutdown(wait=True)
+                if (self.pool is not None):
+                        self.pool.shutdown(wait=True)
+                        self.pool = None
+
+def main(argv=None):
+
+        # The command-line entry point, for building sheets without
+        # the FreeCAD GUI:
+        #
+        #     python -m eights [options] <manifest>...
+        #
+        # (with a Python interpreter that can import FreeCAD), or,
+        # from FreeCAD's own command-line executable, which doesn't
+        # pass arguments through to scripts,
+        #
+        #     FreeCADCmd -c "import eights; eights.main(['<manifest>'])"
+        #
+        # Each manifest (or single-sheet config file) is read as
+        # described above, any "--set field=value" options override
+        # the corresponding sheet-level field of every sheet, and
+        # the sheets are built, recomputed and saved (and, with "--svg"
+        # or "--pdf", exported alongside the FCStd files), or, with
+        # "--title-only", just have their title blocks rewritten (with
+        # "--offline", without FreeCAD, which also allows FCStd files
+        # to be named in place of manifests).  With "--server", the
+        # sheets are built by an eights_server already running, and
+        # with "--serve", this process becomes one.  With
+        # "--dry-run", nothing is built, and the plan of each sheet is
+        # written instead (see plan_eights_record).  One line of
+        # JSON is written to standard output for each sheet, and the
+        # return value (the exit status) is 1 if any sheet failed.
+
+        import argparse
+        parser = argparse.ArgumentParser(prog="eights",
+                                         description="Build BS 8888:2011"
+                                         " drawing sheets without the"
+                                         " FreeCAD GUI.")
+        parser.add_argument("manifests", nargs="*", metavar="manifest",
+                            help="JSON or CSV manifest, or JSON config"
+                            " file for a single sheet")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="number of worker processes (default 1;"
+                            " 0 means one per CPU core)")
+        parser.add_argument("--cache", default=None,
+                            help="directory of a projection cache")
+        parser.add_argument("--svg", action="store_true",
+                            help="also export each sheet as SVG, next to"
+                            " its FCStd file")
+        parser.add_argument("--pdf", action="store_true",
+                            help="also export each sheet as PDF, next to"
+                            " its FCStd file")
+        parser.add_argument("--set", action="append", default=[],
+                            metavar="FIELD=VALUE",
+                            help="override a sheet-level field")
+        parser.add_argument("--title-only", action="store_true",
+                            help="only rewrite the title blocks of sheets"
+                            " already built and saved, without"
+                            " recomputing their views")
+        parser.add_argument("--offline", action="store_true",
+                            help="as --title-only, but by editing the"
+                            " FCStd files directly, without FreeCAD; an"
+                            " FCStd file may be given in place of a"
+                            " manifest, to be patched with the --set"
+                            " fields")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="build nothing, but write the plan of"
+                            " each sheet (view positions and rotations)"
+                            " as JSON")
+        parser.add_argument("--serve", default=None, metavar="ADDRESS",
+                            help="instead of building anything, wait for"
+                            " sheet records on a local socket (a Unix"
+                            " socket file name, or host:port)")
+        parser.add_argument("--server", default=None, metavar="ADDRESS",
+                            help="send the sheets to the eights server"
+                            " at ADDRESS to be built, rather than"
+                            " building them here")
+        arguments = parser.parse_args(argv)
+        if (arguments.serve is not None):
+                eights_server(arguments.serve,
+                              arguments.cache).serve_them('putanyoldrubbishhere')
+                return 0
+        if (not arguments.manifests):
+                parser.error("no manifests given")
+        overrides = {}
+        for setting in arguments.set:
+                (field, equals, value) = setting.partition("=")
+                if ((not equals) or (not field)):
+                        parser.error("--set %s: expected FIELD=VALUE"
+                                     % (setting,))
+                try:
+                        overrides[field] = eights_field_value(field, value)
+                except ValueError as theexception:
+                        parser.error("--set %s: %s" % (setting, theexception))
+        clashing = [field for field in ["output", "svg", "pdf"]
+                    if (field in overrides)]
+        if (clashing):
+                sheets = 0
+                for manifest in arguments.manifests:
+                        if (arguments.offline
+                            and manifest.lower().endswith(".fcstd")):
+                                sheets = sheets+1
+                        else:
+                                sheets = sheets\
+                                        +len(read_eights_manifest(manifest))
+                if (sheets > 1):
+                        parser.error("--set %s: there are %d sheets, which"
+                                     " would all be written to the same"
+                                     " file" % (clashing[0], sheets))
+        failed = False
+        if (arguments.offline):
+                filenames = [manifest for manifest in arguments.manifests
+                             if manifest.lower().endswith(".fcstd")]
+                arguments.manifests = [manifest for manifest
+                                       in arguments.manifests
+                                       if (manifest not in filenames)]
+                for result in patch_eights_files(filenames, overrides,
+                                                 arguments.workers or None):
+                        sys.stdout.write(json.dumps(result)+"\n")
+                        if ("error" in result):
+                                failed = True
+        for manifest in arguments.manifests:
+                builder = eights_manifest(manifest,
+                                          arguments.workers or None,
+                                          arguments.cache)
+                builder.overrides = overrides
+                builder.exports = [kind for kind in ["svg", "pdf"]
+                                   if getattr(arguments, kind)]
+                builder.titleonly = arguments.title_only
+                builder.offline = arguments.offline
+                builder.dryrun = arguments.dry_run
+                if ((arguments.server is not None)
+                    and (not arguments.offline)
+                    and (not arguments.dry_run)):
+                        records = builder.read_them('putanyoldrubbishhere')
+                        for record in records:
+                                if (arguments.title_only):
+                                        record["titleonly"] = True
+                        results = send_to_eights_server(arguments.server,
+                                                        records)
+                else:
+                        results = builder.build_them('putanyoldrubbishhere')
+                for result in results:
+                        sys.stdout.write(json.dumps(result)+"\n")
+                        if ("error" in result):
+                                failed = True
+        return int(failed)
+
+if __name__ == "__main__":
+
+        # Run via the importable "eights" module, rather than this
+        # "__main__" copy of it, so that worker processes and callers
+        # see one and the same set of classes.
+
+        import eights
+        sys.exit(eights.main())
@@ -0,0 +1,155 @@
+# This is file test_lay_out_projections.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# Automatic layout of sets of views by eights.lay_out_projections,
+# with parts given as eights.planned_part bounding boxes, so that no
+# FreeCAD is needed, e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+def overlap(first, second):
+        (x, y, w, h) = first
+        (ox, oy, ow, oh) = second
+        return (x < ox+ow and ox < x+w and y < oy+oh and oy < y+h)
+
+def title_block(pagesize, orientation):
+        (sheetwidth, sheetheight)\
+                = eights.sheet_dimensions(pagesize, orientation)
+        return (sheetwidth-eights.sheet_margins[2]
+                -eights.title_block_size[0],
+                sheetheight-eights.sheet_margins[3]
+                -eights.title_block_size[1])+eights.title_block_size
+
+def grown(rectangle, gap):
+        (x, y, w, h) = rectangle
+        return (x-gap, y-gap, w+2.0*gap, h+2.0*gap)
+
+class lay_out_projections_tests(unittest.TestCase):
+
+        def footprints(self, parts, positions):
+                return [position+eights.projection_footprint(*part)
+                        for part, position in zip(parts, positions)]
+
+        def assert_clear(self, pagesize, orientation, parts, positions,
+                         obstacles, gap=10.0):
+
+                # Checks that every set of views lies inside the frame,
+                # clear of the title block, the obstacles and each
+                # other by at least the gap.
+
+                (sheetwidth, sheetheight)\
+                        = eights.sheet_dimensions(pagesize, orientation)
+                (left, top, right, bottom) = eights.sheet_margins
+                footprints = self.footprints(parts, positions)
+                for i, (x, y, w, h) in enumerate(footprints):
+                        self.assertGreaterEqual(x, left+gap)
+                        self.assertGreaterEqual(y, top+gap)
+                        self.assertLessEqual(x+w, sheetwidth-right-gap)
+                        self.assertLessEqual(y+h, sheetheight-bottom-gap)
+                        for obstacle in [title_block(pagesize, orientation)]\
+                            +obstacles+footprints[:i]:
+                                self.assertFalse(overlap(grown((x, y, w, h),
+                                                               gap),
+                                                         obstacle),
+                                                 (i, obstacle))
+
+        def test_parts_are_kept_apart(self):
+                parts = [(eights.planned_part(100.0, 50.0, 30.0), 5.0, 0.5),
+                         (eights.planned_part(200.0, 100.0, 80.0), 5.0, 0.25),
+                         (eights.planned_part(40.0, 40.0, 40.0), 5.0, 0.5),
+                         (eights.planned_part(10.0, 20.0, 30.0), 2.0, 1.0)]
+                symbolxpos, symbolypos\
+                        = eights.symbol_position("A3", "Landscape", 10.0, 3.0)
+                symbol = (10.0, 3.0, symbolxpos, symbolypos)
+                positions = eights.lay_out_projections("A3", "Landscape",
+                                                       parts, symbol)\
+                                  .lay_them_out('putanyoldrubbishhere')
+                self.assertEqual(len(positions), len(parts))
+                self.assertNotIn(None, positions)
+                self.assert_clear("A3", "Landscape", parts, positions,
+                                  [eights.symbol_footprint(*symbol)])
+
+        def test_largest_goes_top_left(self):
+                parts = [(eights.planned_part(10.0, 10.0, 10.0), 5.0, 1.0),
+                         (eights.planned_part(100.0, 50.0, 60.0), 5.0, 1.0)]
+                positions = eights.lay_out_projections("A2", "Landscape",
+                                                       parts)\
+                                  .lay_them_out('putanyoldrubbishhere')
+                self.assertEqual(positions[1],
+                                 (eights.sheet_margins[0]+10.0,
+                                  eights.sheet_margins[1]+10.0))
+
+        def test_reserved_areas_are_avoided(self):
+                parts = [(eights.planned_part(30.0, 20.0, 10.0), 5.0, 1.0)
+                         for i in range(3)]
+                reserved = [(20.0, 10.0, 200.0, 100.0)]
+                positions = eights.lay_out_projections("A3", "Landscape",
+                                                       parts, None,
+                                                       reserved, 5.0)\
+                                  .lay_them_out('putanyoldrubbishhere')
+                self.assertNotIn(None, positions)
+                self.assert_clear("A3", "Landscape", parts, positions,
+                                  reserved, 5.0)
+
+        def test_too_big(self):
+                parts = [(eights.planned_part(10.0, 10.0, 10.0), 5.0, 1.0),
+                         (eights.planned_part(1000.0, 1000.0, 1000.0), 5.0,
+                          1.0)]
+                positions = eights.lay_out_projections("A4", "Portrait",
+                                                       parts)\
+                                  .lay_them_out('putanyoldrubbishhere')
+                self.assertIsNotNone(positions[0])
+                self.assertIsNone(positions[1])
+
+        def test_symbol_position_in_frame(self):
+                for pagesize in sorted(eights.sheet_sizes):
+                        for orientation in ["Landscape", "Portrait"]:
+                                (xpos, ypos)\
+                                        = eights.symbol_position(pagesize,
+                                                                 orientation,
+                                                                 10.0, 3.0)
+                                (x, y, w, h)\
+                                        = eights.symbol_footprint(10.0, 3.0,
+                                                                  xpos, ypos)
+                                (sheetwidth, sheetheight)\
+                                        = eights.sheet_dimensions(pagesize,
+                                                                  orientation)
+                                self.assertGreaterEqual(x,
+                                                        eights.sheet_margins[0])
+                                self.assertLessEqual(x+w, sheetwidth
+                                                     -eights.sheet_margins[2])
+                                self.assertLessEqual(y+h, sheetheight
+                                                     -eights.sheet_margins[3])
+                                self.assertFalse(overlap((x, y, w, h),
+                                                         title_block(
+                                                                 pagesize,
+                                                                 orientation)),
+                                                 (pagesize, orientation))
+
+if __name__ == "__main__":
+        unittest.main()
@@ -0,0 +1,106 @@
+# This is file test_paginate_projections.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# Sharing parts between sheets with eights.paginate_projections, and
+# the numbering and part lists of the sheets that
+# eights.create_eights_sheet_set plans with them (with dry_run_in
+# set, which needs no FreeCAD), e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+def parts_of(count, size=100.0, scale=1.0):
+        return [(eights.planned_part(size, size, size), 5.0, scale)
+                for i in range(count)]
+
+class paginate_projections_tests(unittest.TestCase):
+
+        def test_one_sheet(self):
+                parts = parts_of(3, 20.0)
+                sheets = eights.paginate_projections("A3", "Landscape",
+                                                     parts)
+                self.assertEqual(len(sheets), 1)
+                self.assertEqual([i for i, position in sheets[0]],
+                                 [0, 1, 2])
+
+        def test_every_part_once(self):
+                parts = parts_of(7, 30.0)
+                symbol = (10.0, 3.0)+eights.symbol_position("A4", "Landscape",
+                                                            10.0, 3.0)
+                sheets = eights.paginate_projections("A4", "Landscape",
+                                                     parts, symbol)
+                self.assertGreater(len(sheets), 1)
+                placed = sorted([i for sheet in sheets
+                                 for i, position in sheet])
+                self.assertEqual(placed, list(range(len(parts))))
+                for sheet in sheets:
+                        self.assertTrue(sheet)
+
+                        # Each sheet is as lay_out_projections would
+                        # pack its parts.
+
+                        layout = eights.lay_out_projections(
+                                "A4", "Landscape",
+                                [parts[i] for i, position in sheet], symbol)
+                        self.assertEqual(layout.lay_them_out(
+                                'putanyoldrubbishhere'),
+                                         [position
+                                          for i, position in sheet])
+
+        def test_too_big(self):
+                parts = parts_of(2, 10.0)+parts_of(1, 1000.0)
+                with self.assertRaises(ValueError) as raised:
+                        eights.paginate_projections("A4", "Portrait", parts)
+                self.assertIn("part 2 is too big", str(raised.exception))
+
+        def test_sheet_set_plan(self):
+                parts = [("P%d" % (i), part, spacing)
+                         for i, (part, spacing, scale)
+                         in enumerate(parts_of(5, 30.0))]
+                sheet_set = eights.create_eights_sheet_set(
+                        None, "S", "A4", "Landscape", "c", "l", "o", "a",
+                        "t", "s", 1, "N", 2020, 1, 2, "A", parts, "third",
+                        (10.0, 5.0, 3.0), None, None, "exact", None, True)
+                plans = sheet_set.build_them('putanyoldrubbishhere')
+                self.assertGreater(len(plans), 1)
+                partnums = []
+                for sheetnum, plan in enumerate(plans):
+                        self.assertEqual(plan["sheetnum"], sheetnum+1)
+                        self.assertEqual(plan["totalsheets"], len(plans))
+                        self.assertEqual(plan["partlist"],
+                                         ",".join([thepart["partnum"]
+                                                   for thepart
+                                                   in plan["parts"]]))
+                        self.assertIsNotNone(plan["symbol"])
+                        self.assertEqual(plan["problems"], [])
+                        partnums = partnums+[thepart["partnum"]
+                                             for thepart in plan["parts"]]
+                self.assertEqual(sorted(partnums),
+                                 ["P0", "P1", "P2", "P3", "P4"])
+
+if __name__ == "__main__":
+        unittest.main()
@@ -0,0 +1,207 @@
+# This is file test_patch_eights_file.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# Round trips of eights.patch_eights_file on small FCStd archives,
+# made here, holding a TechDraw template (whose EditableTexts is a
+# map) or a Drawing sheet (whose EditableTexts is a list of strings).
+# These need neither FreeCAD nor anything outside the standard
+# library, e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import warnings
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+techdraw_xml = '''<?xml version='1.0' encoding='utf-8'?>
+<Document SchemaVersion="4" ProgramVersion="0.19R24276 (Git)" FileVersion="1">
+    <Objects Count="2">
+        <Object type="TechDraw::DrawPage" name="Page" id="1" />
+        <Object type="TechDraw::DrawSVGTemplate" name="Standard" id="2" />
+    </Objects>
+    <ObjectData Count="2">
+        <Object name="Page" Extensions="True">
+            <Properties Count="1">
+                <Property name="Template" type="App::PropertyLink">
+                    <Link value="Standard"/>
+                </Property>
+            </Properties>
+        </Object>
+        <Object name="Standard">
+            <Properties Count="2">
+                <Property name="EditableTexts" type="App::PropertyMap" status="1">
+                    <Map count="3">
+                        <Item key="AUTHOR_NAME" value="A. N. Other"/>
+                        <Item key="FC-REV" value="A"/>
+                        <Item key="SI-4" value="Document status: draft"/>
+                    </Map>
+                </Property>
+                <Property name="PageResult" type="App::PropertyFileIncluded">
+                    <FileIncluded file="PageResult.svg"/>
+                </Property>
+            </Properties>
+        </Object>
+    </ObjectData>
+</Document>
+'''
+
+techdraw_svg = '''<svg xmlns:freecad="http://www.freecadweb.org/wiki/index.php?title=Svg_Namespace">
+<text freecad:editable="AUTHOR_NAME" x="1"><tspan>A. N. Other</tspan></text>
+<text freecad:editable="FC-REV" x="2"><tspan>A</tspan></text>
+<text freecad:editable="SI-4" x="3"><tspan x="3">Document status: draft</tspan></text>
+</svg>
+'''
+
+drawing_xml = '''<?xml version='1.0' encoding='utf-8'?>
+<Document SchemaVersion="4" ProgramVersion="0.18R4 (Git)" FileVersion="1">
+    <Objects Count="1">
+        <Object type="Drawing::FeaturePage" name="Page" id="1" />
+    </Objects>
+    <ObjectData Count="1">
+        <Object name="Page">
+            <Properties Count="2">
+                <Property name="EditableTexts" type="App::PropertyStringList">
+                    <StringList count="15">
+%s
+                    </StringList>
+                </Property>
+                <Property name="PageResult" type="App::PropertyFileIncluded">
+                    <FileIncluded file="Page.svg"/>
+                </Property>
+            </Properties>
+        </Object>
+    </ObjectData>
+</Document>
+''' % ("\n".join(['                        <String value="old %d"/>' % (i)
+                  for i in range(15)]))
+
+drawing_svg = '''<svg xmlns:freecad="http://www.freecadweb.org/wiki/index.php?title=Svg_Namespace">
+%s
+</svg>
+''' % ("\n".join(['<text freecad:editable="field%d">old %d</text>'
+                  % (i, i) for i in range(15)]))
+
+class patch_eights_file_tests(unittest.TestCase):
+
+        def setUp(self):
+                self.directory = tempfile.mkdtemp()
+
+        def tearDown(self):
+                shutil.rmtree(self.directory)
+
+        def archive(self, name, members):
+
+                # Writes an FCStd (zip) archive with the given members,
+                # plus a shape that patch_eights_file mustn't touch,
+                # and returns its file name.
+
+                filename = os.path.join(self.directory, name)
+                with zipfile.ZipFile(filename, "w",
+                                     zipfile.ZIP_DEFLATED) as thearchive:
+                        for member, content in members:
+                                thearchive.writestr(member, content)
+                        thearchive.writestr("PartShape.brp", "shape "*100)
+                return filename
+
+        def read(self, filename, member):
+                with zipfile.ZipFile(filename) as thearchive:
+                        return thearchive.read(member).decode("utf-8")
+
+        def test_techdraw_map(self):
+                filename = self.archive("techdraw.FCStd",
+                                        [("Document.xml", techdraw_xml),
+                                         ("PageResult.svg", techdraw_svg)])
+                changed = eights.patch_eights_file(filename,
+                                                   {"revision": "B",
+                                                    "docstatus": "R&D"})
+                self.assertEqual(changed, 1)
+                documentxml = self.read(filename, "Document.xml")
+                self.assertIn('<Item key="FC-REV" value="B"/>', documentxml)
+                self.assertIn('<Item key="SI-4" value="Document status:'
+                              ' R&amp;D"/>', documentxml)
+                self.assertIn('<Item key="AUTHOR_NAME" value="A. N. Other"/>',
+                              documentxml)
+                svg = self.read(filename, "PageResult.svg")
+                self.assertIn('<tspan>B</tspan>', svg)
+                self.assertIn('<tspan x="3">Document status: R&amp;D</tspan>',
+                              svg)
+                self.assertIn('<tspan>A. N. Other</tspan>', svg)
+                self.assertEqual(self.read(filename, "PartShape.brp"),
+                                 "shape "*100)
+
+                # The same texts again change nothing.
+
+                self.assertEqual(eights.patch_eights_file(filename,
+                                                          {"revision": "B",
+                                                           "docstatus":
+                                                           "R&D"}), 0)
+
+        def test_drawing_string_list(self):
+                filename = self.archive("drawing.FCStd",
+                                        [("Document.xml", drawing_xml),
+                                         ("Page.svg", drawing_svg)])
+                changed = eights.patch_eights_file(filename,
+                                                   {"creator": "Me",
+                                                    "revision": "C"})
+                self.assertEqual(changed, 1)
+                strings = re.findall(r'<String value="([^"]*)"/>',
+                                     self.read(filename, "Document.xml"))
+                self.assertEqual(len(strings), 15)
+                self.assertEqual(strings[0], "Me")
+                self.assertEqual(strings[1], "old 1")
+                self.assertEqual(strings[6], " ")
+                self.assertEqual(strings[14], "C")
+                texts = re.findall(r'<text[^>]*>([^<]*)</text>',
+                                   self.read(filename, "Page.svg"))
+                self.assertEqual(texts[0], "Me")
+                self.assertEqual(texts[1], "old 1")
+                self.assertEqual(texts[14], "C")
+
+        def test_no_title_block(self):
+                documentxml = techdraw_xml.replace("EditableTexts",
+                                                   "OtherTexts")
+                filename = self.archive("other.FCStd",
+                                        [("Document.xml", documentxml)])
+                with open(filename, "rb") as thefile:
+                        before = thefile.read()
+                with warnings.catch_warnings(record=True) as issued:
+                        warnings.simplefilter("always")
+                        changed = eights.patch_eights_file(filename,
+                                                           {"revision": "B"})
+                self.assertEqual(changed, 0)
+                self.assertEqual(len(issued), 1)
+                with open(filename, "rb") as thefile:
+                        self.assertEqual(thefile.read(), before)
+                summary = eights.patch_eights_sheet({"output": filename,
+                                                     "revision": "B"})
+                self.assertEqual(summary["patched"], 0)
+                self.assertEqual(len(summary["warnings"]), 1)
+
+if __name__ == "__main__":
+        unittest.main()
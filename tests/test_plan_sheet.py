@@ -0,0 +1,191 @@
+# This is file test_plan_sheet.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# Planning sheets without FreeCAD: eights.plan_projection_views,
+# eights.plan_sheet, and "python -m eights --dry-run" on a manifest
+# whose parts are given by their bounding boxes, e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+class plan_projection_views_tests(unittest.TestCase):
+
+        def test_views(self):
+                part = eights.planned_part(100.0, 50.0, 30.0)
+                for projection in ["first", "third"]:
+                        views = eights.plan_projection_views(part, 5.0, 30.0,
+                                                             40.0, 0.5,
+                                                             projection,
+                                                             297.0)
+                        self.assertEqual(len(views), 6)
+                        json.dumps(views)
+
+                        # The rectangles are those the validation pass
+                        # checks, and together fill the footprint used
+                        # for layout.
+
+                        self.assertEqual(
+                                [(" "+view["legend"],
+                                  tuple(view["rectangle"]))
+                                 for view in views],
+                                eights.projection_view_rectangles(
+                                        part, 5.0, 30.0, 40.0, 0.5,
+                                        projection))
+                        (width, height)\
+                                = eights.projection_footprint(part, 5.0, 0.5)
+                        self.assertAlmostEqual(
+                                min([view["rectangle"][0] for view in views]),
+                                30.0)
+                        self.assertAlmostEqual(
+                                min([view["rectangle"][1] for view in views]),
+                                40.0)
+                        self.assertAlmostEqual(
+                                max([view["rectangle"][0]+view["rectangle"][2]
+                                     for view in views]), 30.0+width)
+                        self.assertAlmostEqual(
+                                max([view["rectangle"][1]+view["rectangle"][3]
+                                     for view in views]), 40.0+height)
+                        for view in views:
+                                self.assertEqual(view["techdraw"]["X"],
+                                                 view["centre"][0])
+                                self.assertEqual(view["techdraw"]["Y"],
+                                                 297.0-view["centre"][1])
+
+        def test_no_sheet_height(self):
+                views = eights.plan_projection_views(
+                        eights.planned_part(1.0, 2.0, 3.0), 5.0, 30.0, 40.0,
+                        1.0)
+                self.assertNotIn("Y", views[0]["techdraw"])
+                self.assertIn("Y", views[0]["drawing"])
+
+class plan_sheet_tests(unittest.TestCase):
+
+        def test_plan(self):
+                part = eights.planned_part(100.0, 50.0, 30.0)
+                symbol = (10.0, 3.0)+eights.symbol_position("A3", "Landscape",
+                                                            10.0, 3.0)
+                plan = eights.plan_sheet("A3", "Landscape",
+                                         [("P1", part, 5.0, 30.0, 30.0, 1.0),
+                                          ("P2", part, 5.0, 30.0, 190.0,
+                                           0.5)],
+                                         "third", symbol)
+                self.assertEqual((plan["width"], plan["height"]),
+                                 (420.0, 297.0))
+                self.assertEqual(plan["symbol"]["rectangle"],
+                                 list(eights.symbol_footprint(*symbol)))
+                self.assertEqual([thepart["partnum"]
+                                  for thepart in plan["parts"]],
+                                 ["P1", "P2"])
+                self.assertEqual(plan["parts"][1]["footprint"],
+                                 list(eights.projection_footprint(part, 5.0,
+                                                                  0.5)))
+                self.assertEqual(plan["problems"], [])
+                json.dumps(plan)
+
+        def test_problems(self):
+                part = eights.planned_part(100.0, 50.0, 30.0)
+                plan = eights.plan_sheet("A4", "Portrait",
+                                         [("P1", part, 5.0, 30.0, 30.0, 1.0),
+                                          ("P2", part, 5.0, 40.0, 40.0, 1.0)])
+                kinds = set([problem["problem"]
+                             for problem in plan["problems"]])
+                self.assertEqual(kinds, set(["overlap", "outside frame"]))
+
+class dry_run_tests(unittest.TestCase):
+
+        def setUp(self):
+                self.directory = tempfile.mkdtemp()
+
+        def tearDown(self):
+                shutil.rmtree(self.directory)
+
+        def dry_run(self, records):
+                manifest = os.path.join(self.directory, "manifest.json")
+                with open(manifest, "w") as thefile:
+                        json.dump(records, thefile)
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                        status = eights.main(["--dry-run", manifest])
+                return (status, [json.loads(line) for line
+                                 in output.getvalue().splitlines()])
+
+        def test_dry_run(self):
+                parts = [{"partnum": "P%d" % (i), "file": "missing.step",
+                          "spacing": 5, "width": 30, "depth": 30,
+                          "height": 30} for i in range(3)]
+                sheet = {"output": os.path.join(self.directory,
+                                                "one.FCStd"),
+                         "pagesize": "A3", "orientation": "Landscape",
+                         "inversescale": 1,
+                         "symbol": {"largediam": 10, "smalldiam": 5,
+                                    "spacing": 3},
+                         "parts": parts}
+                sheets = {"output": os.path.join(self.directory,
+                                                 "set.FCStd"),
+                          "pagesize": "A4", "orientation": "Landscape",
+                          "inversescale": 1, "paginate": True,
+                          "parts": parts}
+                (status, results) = self.dry_run([sheet, sheets])
+                self.assertEqual(status, 0)
+                self.assertEqual([result["output"] for result in results],
+                                 [sheet["output"], sheets["output"]])
+                self.assertEqual(len(results[0]["sheets"]), 1)
+                plan = results[0]["sheets"][0]
+                self.assertEqual(plan["partlist"], "P0,P1,P2")
+                self.assertEqual(plan["problems"], [])
+                self.assertEqual(len(results[1]["sheets"]), 3)
+                self.assertEqual([plan["sheetnum"]
+                                  for plan in results[1]["sheets"]],
+                                 [1, 2, 3])
+
+                # Nothing is built.
+
+                self.assertEqual(os.listdir(self.directory),
+                                 ["manifest.json"])
+
+        def test_no_room(self):
+                (status, results)\
+                        = self.dry_run({"output": "big.FCStd",
+                                        "pagesize": "A4",
+                                        "orientation": "Portrait",
+                                        "inversescale": 1,
+                                        "parts": [{"partnum": "P1",
+                                                   "file": "big.step",
+                                                   "spacing": 5,
+                                                   "width": 500,
+                                                   "depth": 500,
+                                                   "height": 500}]})
+                self.assertEqual(status, 1)
+                self.assertIn("no room", results[0]["error"])
+
+if __name__ == "__main__":
+        unittest.main()
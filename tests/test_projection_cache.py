@@ -0,0 +1,139 @@
+# This is file test_projection_cache.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# Keys, least-recently-used eviction and statistics of
+# eights.projection_cache, and the keys under which a projection set
+# looks its views up in one.  Parts are given as (points, facets)
+# meshes, whose fingerprints need no FreeCAD, e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+points = [(0, 0, 0), (10, 0, 0), (10, 20, 0), (0, 20, 0),
+          (0, 0, 5), (10, 0, 5), (10, 20, 5), (0, 20, 5)]
+facets = [(0, 2, 1), (0, 3, 2), (4, 5, 6), (4, 6, 7), (0, 1, 5), (0, 5, 4),
+          (1, 2, 6), (1, 6, 5), (2, 3, 7), (2, 7, 6), (3, 0, 4), (3, 4, 7)]
+
+class direction:
+        def __init__(self, x_in, y_in, z_in):
+                self.x = x_in
+                self.y = y_in
+                self.z = z_in
+
+class projection_cache_tests(unittest.TestCase):
+
+        def setUp(self):
+                self.directory = tempfile.mkdtemp()
+
+        def tearDown(self):
+                shutil.rmtree(self.directory)
+
+        def test_key(self):
+                cache = eights.projection_cache(self.directory)
+                key = cache.key("abc", (0.0, 0.0, 1.0), "HardHidden")
+                self.assertEqual(key, cache.key("abc", (0.0, 0.0, 1.0),
+                                                "HardHidden"))
+                self.assertNotEqual(key, cache.key("abd", (0.0, 0.0, 1.0),
+                                                   "HardHidden"))
+                self.assertNotEqual(key, cache.key("abc", (0.0, 1.0, 0.0),
+                                                   "HardHidden"))
+
+        def test_get_and_put(self):
+                cache = eights.projection_cache(self.directory)
+                edges = {"visible": [[[0.0, 0.0], [1.0, 1.0]]], "hidden": []}
+                self.assertIsNone(cache.get("one"))
+                cache.put("one", edges)
+                self.assertEqual(cache.get("one"), edges)
+
+                # Another cache on the same directory (as in a later
+                # session) finds the same entry.
+
+                self.assertEqual(eights.projection_cache(self.directory)
+                                 .get("one"), edges)
+                statistics = cache.statistics()
+                self.assertEqual(statistics["hits"], 1)
+                self.assertEqual(statistics["misses"], 1)
+                self.assertEqual(statistics["evictions"], 0)
+                self.assertEqual(statistics["entries"], 1)
+                self.assertEqual(statistics["bytes"],
+                                 os.path.getsize(os.path.join(self.directory,
+                                                              "one.json")))
+
+        def test_eviction(self):
+                edges = {"visible": [[[float(i), 0.0] for i in range(50)]],
+                         "hidden": []}
+                cache = eights.projection_cache(self.directory)
+                cache.put("probe", edges)
+                size = cache.statistics()["bytes"]
+                cache = eights.projection_cache(self.directory, 3*size)
+                cache.put("second", edges)
+                cache.put("third", edges)
+
+                # Make "probe" the most recently used, so that the next
+                # store evicts "second", the least recently used.
+
+                now = time.time()
+                cache.entries["second.json"][1] = now-2.0
+                cache.entries["third.json"][1] = now-1.0
+                cache.get("probe")
+                cache.put("fourth", edges)
+                self.assertEqual(cache.statistics()["evictions"], 2)
+                self.assertEqual(sorted(cache.entries),
+                                 ["fourth.json", "probe.json"])
+                self.assertFalse(os.path.exists(os.path.join(self.directory,
+                                                             "second.json")))
+                self.assertLessEqual(cache.statistics()["bytes"], 3*size)
+
+        def test_key_follows_part(self):
+                cache = eights.projection_cache(self.directory)
+                adder = eights.first_angle_projection("P", (points, facets),
+                                                      5.0, 30.0, 40.0, 1.0,
+                                                      None, None, cache)
+                viewdirection = direction(0.0, 0.0, 1.0)
+                key, tolerance = adder.cachekey(0.19, None, viewdirection,
+                                                0.35)
+                self.assertEqual(adder.cachekey(0.19, None, viewdirection,
+                                                0.35)[0], key)
+
+                # Setting the part to a new shape must not find the old
+                # shape's edges.
+
+                adder.part = ([(2*x, y, z) for (x, y, z) in points], facets)
+                newkey = adder.cachekey(0.19, None, viewdirection, 0.35)[0]
+                self.assertNotEqual(newkey, key)
+                self.assertEqual(newkey,
+                                 eights.first_angle_projection(
+                                         "Q", adder.part, 5.0, 30.0, 40.0,
+                                         1.0, None, None, cache)
+                                 .cachekey(0.19, None, viewdirection,
+                                           0.35)[0])
+
+if __name__ == "__main__":
+        unittest.main()
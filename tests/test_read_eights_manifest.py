@@ -0,0 +1,163 @@
+# This is file test_read_eights_manifest.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# Reading JSON and CSV manifests with eights.read_eights_manifest,
+# the conversion of their fields by eights.eights_field_value, and
+# the overrides applied by eights.eights_manifest, none of which
+# needs FreeCAD, e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+csv_manifest = '''output,shorttitle,inversescale,sheetnum,paginate,cache,svg,fidelity,partnum,file,spacing,xpos,ypos,scale,symbollargediam,symbolsmalldiam,symbolspacing,symbolasset
+a.FCStd,A,10,1,no,cachedir,a.svg,coarse,P1,p1.step,5,30,40,,10,5,3,false
+b.FCStd,B,5,2,yes,,,,Q1,q1.step,5,,,0.5,,,,
+a.FCStd,,,,,,,,P2,p2.step,6,,,,,,,
+a.FCStd,,,,,,,exact,P3,p3.step,7,,,,,,,
+'''
+
+class read_eights_manifest_tests(unittest.TestCase):
+
+        def setUp(self):
+                self.directory = tempfile.mkdtemp()
+
+        def tearDown(self):
+                shutil.rmtree(self.directory)
+
+        def manifest(self, name, content):
+                filename = os.path.join(self.directory, name)
+                with open(filename, "w") as thefile:
+                        if (isinstance(content, str)):
+                                thefile.write(content)
+                        else:
+                                json.dump(content, thefile)
+                return filename
+
+        def test_csv(self):
+                records = eights.read_eights_manifest(
+                        self.manifest("manifest.csv", csv_manifest))
+
+                # Rows are grouped by output, in the order each output
+                # first appears, taking the sheet-level columns from
+                # its first row.
+
+                self.assertEqual([record["output"] for record in records],
+                                 ["a.FCStd", "b.FCStd"])
+                (first, second) = records
+                self.assertEqual([thepart["partnum"]
+                                  for thepart in first["parts"]],
+                                 ["P1", "P2", "P3"])
+                self.assertEqual(first["shorttitle"], "A")
+                self.assertEqual(first["inversescale"], 10)
+                self.assertEqual(first["sheetnum"], 1)
+                self.assertIs(first["paginate"], False)
+                self.assertIs(second["paginate"], True)
+                self.assertEqual(first["cache"], "cachedir")
+                self.assertEqual(first["svg"], "a.svg")
+                self.assertNotIn("cache", second)
+                self.assertEqual(first["symbol"],
+                                 {"largediam": "10", "smalldiam": "5",
+                                  "spacing": "3", "xpos": None, "ypos": None,
+                                  "asset": False})
+                self.assertNotIn("symbol", second)
+
+                # A part's own fidelity goes with it; without one, it
+                # has the sheet's.
+
+                self.assertEqual(first["fidelity"], "coarse")
+                self.assertEqual([thepart.get("fidelity")
+                                  for thepart in first["parts"]],
+                                 ["coarse", None, "exact"])
+                self.assertEqual(first["parts"][0]["xpos"], "30")
+                self.assertEqual(first["parts"][1]["spacing"], "6")
+                self.assertNotIn("scale", first["parts"][0])
+                self.assertEqual(second["parts"][0]["scale"], "0.5")
+
+        def test_csv_bad_boolean(self):
+                filename = self.manifest("bad.csv",
+                                         "output,partnum,file,spacing,"
+                                         "validate\n"
+                                         "a.FCStd,P1,p1.step,5,perhaps\n")
+                with self.assertRaises(ValueError):
+                        eights.read_eights_manifest(filename)
+
+        def test_json_forms(self):
+                record = {"output": "a.FCStd", "inversescale": "10",
+                          "validate": "on", "parts": []}
+                for content in [[record], {"sheets": [record]}, record]:
+                        records = eights.read_eights_manifest(
+                                self.manifest("manifest.json", content))
+                        self.assertEqual(len(records), 1)
+                        self.assertEqual(records[0]["inversescale"], 10)
+                        self.assertIs(records[0]["validate"], True)
+
+        def test_overrides(self):
+                filename = self.manifest("manifest.csv", csv_manifest)
+                builder = eights.eights_manifest(filename, 1, "shared")
+                builder.overrides = {"revision": "C"}
+                builder.exports = ["pdf"]
+                records = builder.read_them('putanyoldrubbishhere')
+                self.assertEqual([record["revision"] for record in records],
+                                 ["C", "C"])
+                self.assertEqual([record["cache"] for record in records],
+                                 ["cachedir", "shared"])
+                self.assertEqual([record["pdf"] for record in records],
+                                 ["a.pdf", "b.pdf"])
+                builder.overrides = {"output": "one.FCStd"}
+                with self.assertRaises(ValueError):
+                        builder.read_them('putanyoldrubbishhere')
+
+class eights_field_value_tests(unittest.TestCase):
+
+        def test_integers(self):
+                self.assertEqual(eights.eights_field_value("sheetnum", "3"), 3)
+                self.assertEqual(eights.eights_field_value("year", 2020),
+                                 2020)
+                with self.assertRaises(ValueError):
+                        eights.eights_field_value("inversescale", "ten")
+
+        def test_booleans(self):
+                for value in ["1", "true", "Yes", " ON ", True]:
+                        self.assertIs(eights.eights_field_value("paginate",
+                                                                value), True)
+                for value in ["0", "False", "no", "off", "", False]:
+                        self.assertIs(eights.eights_field_value("validate",
+                                                                value), False)
+                with self.assertRaises(ValueError):
+                        eights.eights_field_value("titleonly", "maybe")
+
+        def test_others(self):
+                self.assertEqual(eights.eights_field_value("revision", "07"),
+                                 "07")
+                self.assertEqual(eights.eights_field_value("simplify", "0.5"),
+                                 "0.5")
+
+if __name__ == "__main__":
+        unittest.main()
@@ -0,0 +1,178 @@
+# This is file test_tessellated_edges.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# The tessellation-based projection engine (eights.tessellation_arrays,
+# eights.tessellated_edges and eights.chained_polylines) on meshes of
+# a box, given as (points, facets) pairs, which need no FreeCAD.  The
+# engine itself needs NumPy, without which those tests are skipped,
+# e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+points = [(0, 0, 0), (10, 0, 0), (10, 20, 0), (0, 20, 0),
+          (0, 0, 5), (10, 0, 5), (10, 20, 5), (0, 20, 5)]
+facets = [(0, 2, 1), (0, 3, 2), (4, 5, 6), (4, 6, 7), (0, 1, 5), (0, 5, 4),
+          (1, 2, 6), (1, 6, 5), (2, 3, 7), (2, 7, 6), (3, 0, 4), (3, 4, 7)]
+
+class direction:
+        def __init__(self, x_in, y_in, z_in):
+                self.x = x_in
+                self.y = y_in
+                self.z = z_in
+
+class mesh:
+
+        # Enough of a Mesh.Mesh object for tessellation_arrays.
+
+        def __init__(self, points_in, facets_in):
+                self.Topology = (points_in, facets_in)
+
+def separate_faces():
+
+        # The box with every triangle having vertices of its own, as
+        # a shape's tessellation repeats them along its face
+        # boundaries, plus a degenerate triangle.
+
+        repeated = []
+        triangles = []
+        for facet in facets:
+                triangles.append((len(repeated), len(repeated)+1,
+                                  len(repeated)+2))
+                repeated = repeated+[points[i] for i in facet]
+        repeated.append((10.0, 20.0, 5.0+1.0e-13))
+        triangles.append((len(repeated)-1, 6, 6))
+        return (repeated, triangles)
+
+def segment_set(polylines):
+        found = set()
+        for polyline in polylines:
+                for start, finish in zip(polyline, polyline[1:]):
+                        found.add(frozenset([tuple(start), tuple(finish)]))
+        return found
+
+def outline(corners):
+        return set([frozenset([corners[i], corners[(i+1) % len(corners)]])
+                    for i in range(len(corners))])
+
+@unittest.skipIf(eights.numpy is None, "needs NumPy")
+class tessellation_tests(unittest.TestCase):
+
+        def test_vertices_merged(self):
+                (merged, triangles)\
+                        = eights.tessellation_arrays(separate_faces(), 0.1)
+                self.assertEqual(merged.shape, (8, 3))
+                self.assertEqual(triangles.shape, (12, 3))
+                (fromobject, objecttriangles)\
+                        = eights.tessellation_arrays(mesh(points, facets), 0.1)
+                self.assertEqual(fromobject.shape, (8, 3))
+                self.assertEqual(objecttriangles.shape, (12, 3))
+
+        def test_view_along_z(self):
+                tessellation = eights.tessellation_arrays(separate_faces(),
+                                                          0.1)
+                edges = eights.tessellated_edges(tessellation,
+                                                 direction(0.0, 0.0, 1.0))
+
+                # The top face's outline is visible, and the bottom
+                # face's, lying under it, is hidden; the vertical edges
+                # are seen end on, so not drawn.
+
+                rectangle = outline([(0.0, 0.0), (10.0, 0.0), (10.0, 20.0),
+                                     (0.0, 20.0)])
+                self.assertEqual(segment_set(edges["visible"]), rectangle)
+                self.assertEqual(segment_set(edges["hidden"]), rectangle)
+                self.assertEqual(len(edges["visible"]), 1)
+                self.assertEqual(edges["visible"][0][0],
+                                 edges["visible"][0][-1])
+
+        def test_view_along_x(self):
+                edges = eights.tessellated_edges(
+                        eights.tessellation_arrays((points, facets), 0.1),
+                        direction(1.0, 0.0, 0.0))
+                (xaxis, yaxis) = eights.view_axes((1.0, 0.0, 0.0))
+                corners = [(sum([a*b for a, b in zip(point, xaxis)]),
+                            sum([a*b for a, b in zip(point, yaxis)]))
+                           for point in [points[0], points[3], points[7],
+                                         points[4]]]
+                self.assertEqual(segment_set(edges["visible"]),
+                                 outline([(float(x), float(y))
+                                          for (x, y) in corners]))
+
+        def test_isometric(self):
+                edges = eights.tessellated_edges(
+                        eights.tessellation_arrays((points, facets), 0.1),
+                        direction(1.0, 1.0, 1.0))
+
+                # Nine edges of a box are seen from a corner, and the
+                # three meeting at the far corner are hidden; the
+                # diagonals of the faces' triangles are never drawn.
+
+                self.assertEqual(len(segment_set(edges["visible"])), 9)
+                self.assertEqual(len(segment_set(edges["hidden"])), 3)
+
+        def test_flat_sheet(self):
+                square = ([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)],
+                          [(0, 1, 2), (0, 2, 3)])
+                edges = eights.tessellated_edges(
+                        eights.tessellation_arrays(square, 0.1),
+                        direction(0.0, 0.0, 1.0))
+                self.assertEqual(segment_set(edges["visible"]),
+                                 outline([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0),
+                                          (0.0, 1.0)]))
+                self.assertEqual(edges["hidden"], [])
+
+class chained_polylines_tests(unittest.TestCase):
+
+        def test_chains(self):
+                coordinates = [(0, 0), (1, 0), (1, 1), (5, 5), (6, 6), (0, 1)]
+                polylines = eights.chained_polylines([(0, 1), (2, 1), (3, 4),
+                                                      (5, 0)], coordinates)
+                self.assertEqual(polylines,
+                                 [[[0.0, 1.0], [0.0, 0.0], [1.0, 0.0],
+                                   [1.0, 1.0]],
+                                  [[5.0, 5.0], [6.0, 6.0]]])
+                self.assertEqual(eights.chained_polylines([], coordinates), [])
+
+        def test_view_axes(self):
+                for viewdirection in [(0.0, 0.0, 1.0), (1.0, 0.0, 0.0),
+                                      (0.0, -1.0, 0.0), (0.6, 0.0, 0.8)]:
+                        (xaxis, yaxis) = eights.view_axes(viewdirection)
+                        for first, second in [(xaxis, xaxis),
+                                              (yaxis, yaxis)]:
+                                self.assertAlmostEqual(
+                                        sum([a*b for a, b
+                                             in zip(first, second)]), 1.0)
+                        for first, second in [(xaxis, yaxis),
+                                              (xaxis, viewdirection),
+                                              (yaxis, viewdirection)]:
+                                self.assertAlmostEqual(
+                                        sum([a*b for a, b
+                                             in zip(first, second)]), 0.0)
+
+if __name__ == "__main__":
+        unittest.main()
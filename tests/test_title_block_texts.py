@@ -0,0 +1,109 @@
+# This is file test_title_block_texts.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# The title block texts made by eights.title_block_texts for each
+# layout of FreeCAD's EditableTexts, and how eights.write_title_block
+# puts them into a sheet (stood in for here by an object with the
+# same property), none of which needs FreeCAD, e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+record = {"creator": "A. N. Other", "longtitle": "Widget",
+          "legalowner": "Widgets Ltd", "approver": "J. Bloggs",
+          "doctype": "Assembly", "docstatus": "for review",
+          "pagesize": "A3", "sheetnum": "2", "totalsheets": 5,
+          "inversescale": "10", "partlist": "P1,P2", "drawingnum": "D-1",
+          "year": "2020", "month": 3, "day": "7", "revision": "B"}
+
+class stand_in:
+        def __init__(self, **members):
+                self.__dict__.update(members)
+
+class title_block_texts_tests(unittest.TestCase):
+
+        def test_techdraw(self):
+                texts = eights.title_block_texts(0.19, record)
+                self.assertEqual(texts,
+                                 {"AUTHOR_NAME": "A. N. Other",
+                                  "DRAWING_TITLE": "Widget",
+                                  "SI-1": "Legal owner: Widgets Ltd",
+                                  "SI-2": "To be approved by: J. Bloggs",
+                                  "FreeCAD_DRAWING": "Document type: Assembly",
+                                  "SI-4": "Document status: for review",
+                                  "FC-SI": "A3",
+                                  "FC-SH": "2 / 5",
+                                  "FC-SC": "1 : 10",
+                                  "PN": "P1,P2",
+                                  "DN": "D-1",
+                                  "FC-DATE": "2020-03-07",
+                                  "FC-REV": "B"})
+
+        def test_drawing(self):
+                texts = eights.title_block_texts(0.18, record)
+                self.assertEqual(len(texts), 15)
+                self.assertEqual(texts[0], "A. N. Other")
+                self.assertEqual(texts[6:8], [" ", " "])
+                self.assertEqual(texts[9], "2 / 5")
+                self.assertEqual(texts[14], "B")
+                oldtexts = eights.title_block_texts(0.15, record)
+                self.assertEqual(len(oldtexts), 13)
+                self.assertEqual(oldtexts, texts[:6]+texts[8:])
+
+        def test_missing_fields(self):
+                texts = eights.title_block_texts(0.19,
+                                                 {"revision": "C",
+                                                  "sheetnum": 1,
+                                                  "year": 2020,
+                                                  "month": 1})
+                self.assertEqual(texts["FC-REV"], "C")
+                self.assertEqual([key for key in sorted(texts)
+                                  if (texts[key] is not None)], ["FC-REV"])
+
+class write_title_block_tests(unittest.TestCase):
+
+        def test_techdraw(self):
+                template = stand_in(EditableTexts={"FC-REV": "A",
+                                                   "AUTHOR_NAME": "Me",
+                                                   "OTHER": "kept"})
+                thesheet = stand_in(Template=template)
+                eights.write_title_block(thesheet, 0.19,
+                                         eights.title_block_texts(
+                                                 0.19, {"revision": "B"}))
+                self.assertEqual(template.EditableTexts,
+                                 {"FC-REV": "B", "AUTHOR_NAME": "Me",
+                                  "OTHER": "kept"})
+
+        def test_drawing(self):
+                thesheet = stand_in(EditableTexts=["old %d" % (i)
+                                                   for i in range(15)])
+                eights.write_title_block(thesheet, 0.18,
+                                         eights.title_block_texts(
+                                                 0.18, {"creator": "You"}))
+                self.assertEqual(thesheet.EditableTexts[0], "You")
+                self.assertEqual(thesheet.EditableTexts[1], "old 1")
+                self.assertEqual(thesheet.EditableTexts[6], " ")
+                self.assertEqual(thesheet.EditableTexts[14], "old 14")
+
+if __name__ == "__main__":
+        unittest.main()
@@ -0,0 +1,170 @@
+# This is file test_view_index.py
+
+# This is a test script intended to be distributed as part of a
+# software library centred on file eights.py
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation: version 3 of the
+# License.
+
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License, and the GNU General Public License
+# which it incorporates, for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License [in file ../LICENSE] along with this program.  If not,
+# see <https://www.gnu.org/licenses/>.
+
+# The spatial index of views on a sheet, eights.view_index, and the
+# validation pass built on it, eights.check_projections.  The latter
+# asks FreeCAD for its version and its open documents, and the sheet
+# for its size, so those are stood in for here by the least that
+# will answer, e.g.
+#
+#     python3 -m unittest discover tests
+
+import sys
+import os
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eights
+
+class stand_in:
+        def __init__(self, **members):
+                self.__dict__.update(members)
+
+class view_index_tests(unittest.TestCase):
+
+        def test_query(self):
+                index = eights.view_index(10.0)
+                index.add((0.0, 0.0, 5.0, 5.0), "a")
+                index.add((5.0, 0.0, 5.0, 5.0), "b")
+                index.add((100.0, 100.0, 30.0, 30.0), "c")
+
+                # Rectangles that only touch don't overlap.
+
+                self.assertEqual(index.query((4.0, 1.0, 0.5, 0.5)),
+                                 [((0.0, 0.0, 5.0, 5.0), "a")])
+                self.assertEqual([label for rectangle, label
+                                  in index.query((4.0, 1.0, 2.0, 2.0))],
+                                 ["a", "b"])
+                self.assertEqual(index.query((10.0, 0.0, 5.0, 5.0)), [])
+
+                # A rectangle spanning many cells is found from any of
+                # them, once.
+
+                self.assertEqual([label for rectangle, label
+                                  in index.query((125.0, 101.0, 50.0, 1.0))],
+                                 ["c"])
+
+        def test_remove_part(self):
+                index = eights.view_index()
+                index.add((0.0, 0.0, 60.0, 60.0), ("P1", " from positive z"))
+                index.add((10.0, 10.0, 5.0, 5.0), ("P2", " from positive z"))
+                index.add((20.0, 20.0, 5.0, 5.0), ("P1", " from negative z"))
+                index.remove_part("P1")
+                self.assertEqual(index.query((0.0, 0.0, 100.0, 100.0)),
+                                 [((10.0, 10.0, 5.0, 5.0),
+                                   ("P2", " from positive z"))])
+                self.assertEqual(sum([len(keys) for keys
+                                      in index.cells.values()]), 1)
+
+        def test_problems(self):
+                (sheetwidth, sheetheight) = eights.sheet_dimensions("A3",
+                                                                    "Landscape")
+                index = eights.view_index()
+                index.add((30.0, 30.0, 50.0, 50.0), "a")
+                index.add((70.0, 70.0, 20.0, 20.0), "b")
+                index.add((5.0, 30.0, 20.0, 20.0), "outside")
+                index.add((sheetwidth-50.0, sheetheight-40.0, 10.0, 10.0),
+                          "title")
+                problems = index.problems(sheetwidth, sheetheight)
+                self.assertIn({"problem": "overlap", "labels": ["a", "b"]},
+                              problems)
+                self.assertIn({"problem": "outside frame",
+                               "labels": ["outside"]}, problems)
+                self.assertIn({"problem": "title block", "labels": ["title"]},
+                              problems)
+                self.assertEqual(len(problems), 3)
+
+                # Rectangles given separately are checked against the
+                # index and each other, without being added to it.
+
+                problems = index.problems(sheetwidth, sheetheight,
+                                          [((200.0, 30.0, 10.0, 10.0), "c"),
+                                           ((205.0, 35.0, 10.0, 10.0), "d"),
+                                           ((35.0, 35.0, 5.0, 5.0), "e")])
+                self.assertEqual(problems,
+                                 [{"problem": "overlap",
+                                   "labels": ["c", "d"]},
+                                  {"problem": "overlap",
+                                   "labels": ["a", "e"]}])
+                self.assertEqual(len(index.entries), 4)
+
+class check_projections_tests(unittest.TestCase):
+
+        def setUp(self):
+                self.document = stand_in(Name="test_view_index")
+                (width, height) = eights.sheet_dimensions("A3", "Landscape")
+                self.sheet = stand_in(Name="Page", Document=self.document,
+                                      Template=stand_in(Width=width,
+                                                        Height=height))
+                freecad = stand_in(Version=lambda: ["0", "21"],
+                                   listDocuments=lambda:
+                                   {self.document.Name: self.document})
+                self.patch = mock.patch.object(eights, "FreeCAD", freecad)
+                self.patch.start()
+
+        def tearDown(self):
+                self.patch.stop()
+                eights.view_indexes.clear()
+
+        def test_clear_sheet(self):
+                part = eights.planned_part(100.0, 50.0, 30.0)
+                self.assertEqual(eights.check_projections(
+                        self.sheet,
+                        [("P1", part, 5.0, 30.0, 30.0, 1.0, "first"),
+                         ("P2", part, 5.0, 30.0, 190.0, 0.5, "third")]), [])
+
+        def test_overlaps(self):
+                part = eights.planned_part(100.0, 50.0, 30.0)
+                problems = eights.check_projections(
+                        self.sheet,
+                        [("P1", part, 5.0, 30.0, 30.0, 1.0, "first"),
+                         ("P2", part, 5.0, 60.0, 40.0, 1.0, "first")])
+                self.assertTrue(problems)
+                for problem in problems:
+                        self.assertEqual(problem["problem"], "overlap")
+                        self.assertEqual(problem["labels"][0][0], "P1")
+                        self.assertEqual(problem["labels"][1][0], "P2")
+
+        def test_views_already_on_the_sheet(self):
+                index = eights.view_index_of(self.sheet)
+                index.add((100.0, 100.0, 50.0, 50.0), ("P0", " symbol"))
+                problems = eights.check_projections(
+                        self.sheet,
+                        [("P1", eights.planned_part(10.0, 10.0, 10.0), 5.0,
+                          110.0, 110.0, 1.0, "first"),
+                         ("P2", eights.planned_part(10.0, 10.0, 10.0), 5.0,
+                          390.0, 30.0, 1.0, "first")])
+                self.assertEqual(set([problem["problem"]
+                                      for problem in problems]),
+                                 set(["overlap", "outside frame"]))
+                self.assertTrue(all([problem["labels"][0] == ("P0",
+                                                              " symbol")
+                                     for problem in problems
+                                     if (problem["problem"] == "overlap")]))
+
+                # Checking adds nothing to the sheet's index.
+
+                self.assertIs(eights.view_index_of(self.sheet), index)
+                self.assertEqual(len(index.entries), 1)
+
+if __name__ == "__main__":
+        unittest.main()